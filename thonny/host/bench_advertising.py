@@ -0,0 +1,78 @@
+"""
+Advertising Benchmark - Supervisor vs blind periodic re-advertising
+
+Simulates an hour of a key fob against the emulated module on a fake
+clock. The module stops advertising eight times at scattered moments,
+alternately silently and with an unsolicited '+ADVEN=0' line.
+"""
+
+import hostenv
+hostenv.install()
+
+import ryb080i_simple
+from machine import UART
+from ryb080i_emulator import RYB080IEmulator
+from ryb080i_simple import SimpleBLE, AdvertisingSupervisor
+
+DURATION_MS = 3600000
+STEP_MS = 50                 # Main loop period
+LEGACY_INTERVAL = 15000      # Old transmitter: AT+ADVEN=1 this often
+DROPS = ((257000, False), (356000, True), (677000, False), (1386000, True),
+         (1677000, False), (2254000, True), (2726000, False), (3423000, True))  # (time, module reports it)
+
+class LegacyAdvertiser:
+    """Previous transmitter loop: re-enable on a fixed timer"""
+
+    def __init__(self, ble, clock):
+        self.ble = ble
+        self.clock = clock
+        self.last = None
+        self.enable_count = 0
+
+    def start(self):
+        pass
+
+    def update(self):
+        now = self.clock()
+        if self.last is None or now - self.last >= LEGACY_INTERVAL:
+            self.ble.start_advertising_async()
+            self.enable_count += 1
+            self.last = now
+
+def simulate(make_advertiser, check_ms=None):
+    with hostenv.sim_time(ryb080i_simple) as clock:
+        emulator = RYB080IEmulator(clock=clock.ticks_us)
+        ble = SimpleBLE(UART(1, device=emulator))
+        advertiser = make_advertiser(ble, clock.ticks_ms)
+        advertiser.start()
+        drops = list(DROPS)
+        while clock.now < DURATION_MS:
+            if drops and clock.now >= drops[0][0]:
+                emulator.stop_advertising(notify=drops.pop(0)[1])
+            ble.process_uart_data()
+            advertiser.update()
+            ble.process_command_queue()
+            clock.now += STEP_MS
+        enables = sum(1 for c in emulator.commands if c == "AT+ADVEN=1")
+        return {
+            'commands': len(emulator.commands),
+            'enables': enables,
+            'uart_bytes': emulator.rx_bytes + emulator.tx_bytes,
+            'off_ms': emulator.advertising_off_us() // 1000,
+        }
+
+def run():
+    results = [('legacy 15s', simulate(LegacyAdvertiser))]
+    for check_ms in (15000, 25000, 60000, 0):
+        results.append((f"supervisor {check_ms // 1000}s",
+                        simulate(lambda ble, clock: AdvertisingSupervisor(ble, check_ms, clock=clock))))
+    return results
+
+def main():
+    print(f"Advertising benchmark ({DURATION_MS // 60000} min, {len(DROPS)} drops)")
+    print("policy          commands enables uart_bytes  off_ms")
+    for name, r in run():
+        print(f"{name:<15} {r['commands']:8d} {r['enables']:7d} {r['uart_bytes']:10d} {r['off_ms']:7d}")
+
+if __name__ == "__main__":
+    main()
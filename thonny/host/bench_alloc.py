@@ -0,0 +1,85 @@
+"""
+Allocation Check - SSD1306 flush path must not allocate
+"""
+
+try:
+    import hostenv
+    hostenv.install()
+except ImportError:
+    pass  # On the board, copied next to the thonny/minimal files
+
+import gc
+import sys
+from machine import I2C, SPI, Pin
+from ssd1306 import SSD1306_I2C, SSD1306_SPI
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+FRAMES = 20
+HOST_PEAK_BYTES = 1024  # CPython: transient objects only, a frame buffer copy goes over
+
+def measure(func):
+    """Bytes allocated while running func()"""
+    gc.collect()
+    if hasattr(gc, 'mem_alloc'):
+        # MicroPython: heap usage with the collector stopped
+        gc.disable()
+        before = gc.mem_alloc()
+        func()
+        used = gc.mem_alloc() - before
+        gc.enable()
+        return used
+
+    # CPython: peak traced memory during the call
+    tracemalloc.start()
+    func()
+    used = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return used
+
+def _flush_frames(display):
+    """Change a few columns per frame and flush"""
+    for i in range(FRAMES):
+        display.pixel(i * 5, i % 64, 1)
+        display.pixel(127 - i, 63 - i, 1)
+        display.show()
+
+def run():
+    """Return bytes allocated by FRAMES partial flushes per driver"""
+    # Receiver OLED wiring; the SPI pins need no panel attached
+    i2c = I2C(0, sda=Pin(8), scl=Pin(9), freq=400000)
+    displays = {
+        'i2c_fast': SSD1306_I2C(128, 64, i2c),
+        'i2c_safe': SSD1306_I2C(128, 64, i2c),
+        'spi': SSD1306_SPI(128, 64, SPI(0, baudrate=10000000), Pin(20, Pin.OUT),
+                           Pin(21, Pin.OUT), Pin(17, Pin.OUT)),
+    }
+    displays['i2c_safe'].enable_safe_mode()
+
+    results = {}
+    for name, display in displays.items():
+        display.show()  # Warm up
+        results[name] = measure(lambda: _flush_frames(display))
+    return results
+
+def main():
+    print(f"Allocation check ({FRAMES} frames per driver)")
+
+    # CPython allocates small objects on its own, so the host gets a bound
+    strict = hasattr(gc, 'mem_alloc')
+    limit = 0 if strict else HOST_PEAK_BYTES
+    failed = False
+    for name, used in run().items():
+        ok = used <= limit
+        failed = failed or not ok
+        print(f"{name:<10} {used:6d} bytes  {'OK' if ok else 'FAIL'}{'' if strict else f' (host peak, limit {limit})'}")
+
+    if failed:
+        print("❌ Flush path allocates")
+    return not failed
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
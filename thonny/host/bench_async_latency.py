@@ -0,0 +1,48 @@
+"""
+asyncio Latency Benchmark - Scan line to state change (host, CPython)
+
+Needs CPython asyncio (StreamReader.feed_data) and host stand-ins for the
+hardware modules.
+"""
+
+import asyncio
+
+import hostenv
+hostenv.install()
+
+import receiver
+from fakes import FakeUART
+
+# Target RSSI sequence, each value alternates the lock state
+RSSI_SEQUENCE = [-50, -75, -45, -80, -52, -70, -48, -77]
+GAP_S = 0.2  # Time between scan results
+
+def scan_line(rssi):
+    return f"+SCAN:0xC8FD19A2B3E4,{receiver.TARGET_DEVICE},{rssi}\r\n".encode()
+
+async def _run():
+    receiver.AUTO_PROVISION = False  # The fake UART never replies
+    receiver.AUTO_BAUD = False
+    reader = asyncio.StreamReader()
+    task = asyncio.create_task(receiver.main_async(reader=reader, uart=FakeUART(b'')))
+    await asyncio.sleep(GAP_S)
+
+    for rssi in RSSI_SEQUENCE:
+        reader.feed_data(scan_line(rssi))
+        await asyncio.sleep(GAP_S)
+
+    reader.feed_eof()
+    stats = receiver.runtime.latency_stats()
+    task.cancel()
+    return stats
+
+def run():
+    return asyncio.run(_run())
+
+def main():
+    stats = run()
+    print(f"Scan line -> state change over {stats['count']} changes:")
+    print(f"mean {stats['mean_us']} us, max {stats['max_us']} us (polling loop adds up to 50000 us)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Baud Benchmark - Scan result throughput before and after negotiation
+
+Runs a crowded scan against the emulated module on a fake clock, at the
+power-on 9600 baud and at the rate ble_baud.negotiate() settles on.
+"""
+
+import os
+import tempfile
+
+import hostenv
+hostenv.install()
+
+import ble_baud
+import ryb080i_simple
+from machine import UART
+from ryb080i_emulator import RYB080IEmulator
+from ryb080i_simple import SimpleBLE, UART_RXBUF
+
+CROWD = 100           # Devices reporting in the scan
+RELIABLE_BAUD = 57600  # Emulated link: faster rates lose lines
+SCAN_TIME_MS = 500
+STEP_MS = 1
+
+def scan_drain(ble, emulator, clock):
+    """Milliseconds from AT+SCAN to the last result line, and result bytes"""
+    results = [0]
+
+    def on_scan_result(device_list):
+        results[0] += len(device_list)
+
+    ble.set_callback('scan_result', on_scan_result)
+    sent_bytes = emulator.tx_bytes
+    start = clock.now
+    last = start
+    ble.start_scan_async()
+    seen = 0
+    while clock.now - start < SCAN_TIME_MS + 60000:
+        ble.process_uart_data()
+        ble.process_command_queue()
+        ble.flush_scan_batch()
+        if results[0] > seen:
+            seen = results[0]
+            last = clock.now
+        if seen >= CROWD:
+            break
+        clock.now += STEP_MS
+    return last - start, seen, emulator.tx_bytes - sent_bytes
+
+def simulate(negotiate, reliable_baud=RELIABLE_BAUD, module_baud=9600, cache=None):
+    saved_file = ble_baud.BAUD_FILE
+    ble_baud.BAUD_FILE = cache
+    try:
+        with hostenv.sim_time(ryb080i_simple, ble_baud) as clock:
+            emulator = RYB080IEmulator(baudrate=module_baud, scan_time_ms=SCAN_TIME_MS,
+                                       clock=clock.ticks_us, reliable_baud=reliable_baud)
+            emulator.add_crowd(CROWD)
+            ble = SimpleBLE(UART(1, device=emulator, rxbuf=UART_RXBUF), scan_window_ms=0)
+            report = ble_baud.negotiate(ble) if negotiate else None
+            drain_ms, seen, sent = scan_drain(ble, emulator, clock)
+    finally:
+        ble_baud.BAUD_FILE = saved_file
+    return {
+        'baudrate': ble.baudrate,
+        'negotiate_ms': report['time_ms'] if report else 0,
+        'tried': report['tried'] if report else [],
+        'results': seen,
+        'drain_ms': drain_ms,
+        'bytes_per_sec': sent * 1000 // max(drain_ms - SCAN_TIME_MS, 1),
+        'garbled_bytes': emulator.garbled_bytes,
+    }
+
+def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "ble_baud.txt")
+        results = [('9600 fixed', simulate(False, cache=cache)),
+                   ('negotiated', simulate(True, cache=cache))]
+        # Next boot: the module kept the rate, the cached one is tried first
+        results.append(('next boot', simulate(True, module_baud=results[-1][1]['baudrate'], cache=cache)))
+        os.remove(cache)
+        results.append(('clean link', simulate(True, reliable_baud=None, cache=cache)))
+    return results
+
+def main():
+    print(f"Baud benchmark ({CROWD} devices, link reliable up to {RELIABLE_BAUD})")
+    print("mode        baud   negotiate_ms results drain_ms bytes/s  tried")
+    for name, r in run():
+        print(f"{name:<11} {r['baudrate']:6d} {r['negotiate_ms']:12d} {r['results']:7d} "
+              f"{r['drain_ms']:8d} {r['bytes_per_sec']:7d}  {r['tried']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Command Queue Benchmark - List queue vs priority ring while the module stalls
+
+The module stops answering for STALL_MS while scans keep being requested,
+then a configuration command is queued. Runs on a simulated clock.
+"""
+
+import time
+
+import hostenv
+hostenv.install()
+
+import ryb080i_simple
+from ryb080i_simple import SimpleBLE, CMD_SENT, CMD_TIMEOUT, CMD_DROPPED, PRIO_CONFIG
+from fakes import FakeUART
+
+STALL_MS = 30000
+SCAN_EVERY_MS = 250   # Scan requests from a fast scheduler
+STEP_MS = 10
+PUSHES = 2000         # Enqueue/dequeue cost measurement
+
+class LegacyQueueBLE(SimpleBLE):
+    """Previous unbounded list queue, kept for comparison"""
+
+    def __init__(self, uart):
+        super().__init__(uart)
+        self.command_queue = []
+        self.max_depth = 0
+
+    def send_command_async(self, command, timeout_ms=1000, priority=None, max_age_ms=None):
+        cmd_id = self.command_id
+        self.command_id += 1
+        self.command_queue.append({
+            'id': cmd_id,
+            'command': command,
+            'timestamp': ryb080i_simple.time.ticks_ms(),
+            'timeout': timeout_ms,
+            'status': 0,
+            'sent_time': 0,
+            'response': None
+        })
+        self.max_depth = max(self.max_depth, len(self.command_queue))
+        return cmd_id
+
+    def process_command_queue(self):
+        now = ryb080i_simple.time.ticks_ms()  # The driver's clock, simulated in stall()
+        while self.in_flight:
+            cmd = self.in_flight[0]
+            if ryb080i_simple.time.ticks_diff(now, cmd['sent_time']) < cmd['timeout']:
+                break
+            self._complete_command(CMD_TIMEOUT)
+        while self.command_queue and len(self.in_flight) < self.max_in_flight:
+            cmd = self.command_queue.pop(0)
+            self._write((cmd['command'] + '\r\n').encode())
+            cmd['status'] = CMD_SENT
+            cmd['sent_time'] = now
+            self.in_flight.append(cmd)
+            self._last_activity = now
+
+def stall(make_ble):
+    """Queue depth during the stall and how long the config command waits after it"""
+    with hostenv.sim_time(ryb080i_simple) as clock:
+        ble = make_ble(FakeUART(b''))
+        ble.awake_window_ms = 1 << 30  # No wake-up bytes, they'd only add noise
+        requests = 0
+        while clock.now < STALL_MS:
+            if clock.now % SCAN_EVERY_MS == 0:
+                ble.start_scan_async()
+                requests += 1
+            ble.process_command_queue()
+            clock.now += STEP_MS
+        left = len(ble.command_queue)
+
+        # Module answers again; the config command is queued behind the backlog
+        config_id = ble.send_command_async("AT+NAME=PicoLock", 1000, PRIO_CONFIG)
+        start = clock.now
+        while True:
+            ble.process_command_queue()
+            if ble.in_flight:
+                cmd = ble.in_flight[0]
+                ble._handle_response("OK")
+                if cmd['id'] == config_id:
+                    break
+            clock.now += STEP_MS
+        config_wait = clock.now - start
+
+        queue = ble.command_queue
+        dropped = sum(1 for r in ble.command_results.values() if r['status'] == CMD_DROPPED)
+        return {
+            'requests': requests,
+            'max_depth': getattr(queue, 'max_depth', getattr(ble, 'max_depth', 0)),
+            'left': left,
+            'coalesced': getattr(queue, 'coalesced', 0),
+            'expired': getattr(queue, 'expired', 0),
+            'config_wait_ms': config_wait,
+            'dropped_results': dropped
+        }
+
+def push_pop_us(make_ble, depth):
+    """Microseconds per enqueue + dequeue with depth commands waiting"""
+    ble = make_ble(FakeUART(b''))
+    queue = ble.command_queue
+    for i in range(depth):
+        ble.send_command_async(f"AT+Q{i}")
+    start = time.ticks_us()
+    for i in range(PUSHES):
+        ble.send_command_async(f"AT+P{i % 4}")
+        if isinstance(queue, list):
+            queue.pop(0)
+        else:
+            queue.pop()
+    return time.ticks_diff(time.ticks_us(), start) / PUSHES
+
+def run():
+    return {
+        'legacy': stall(LegacyQueueBLE),
+        'ring': stall(SimpleBLE),
+        'legacy_us': push_pop_us(LegacyQueueBLE, 20),
+        'ring_us': push_pop_us(SimpleBLE, 6)
+    }
+
+def main():
+    print(f"Command queue benchmark ({STALL_MS // 1000} s stall, scan request every {SCAN_EVERY_MS} ms)")
+    r = run()
+    for name in ('legacy', 'ring'):
+        s = r[name]
+        print(f"{name:<7} requests {s['requests']}, max depth {s['max_depth']}, left {s['left']}, "
+              f"coalesced {s['coalesced']}, expired {s['expired']}, config waits {s['config_wait_ms']} ms")
+    print(f"Enqueue+dequeue: legacy {r['legacy_us']:.1f} us (20 waiting), ring {r['ring_us']:.1f} us")
+
+if __name__ == "__main__":
+    main()
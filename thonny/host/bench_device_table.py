@@ -0,0 +1,67 @@
+"""
+Device Table Benchmark - Scan processing cost vs visible devices
+"""
+
+try:
+    import hostenv
+    hostenv.install()
+except ImportError:
+    pass  # On the board, copied next to the thonny/minimal files with fakes.py
+
+import time
+from ryb080i_simple import SimpleBLE
+from device_table import DeviceTable
+from fakes import FakeUART
+
+DEVICE_COUNTS = (1, 10, 50, 100, 250, 500)
+ROUNDS = 5  # Scan bursts per device count
+KEYS = (b"C8FD19A2B3E0", b"C8FD19A2B3E1", b"C8FD19A2B3E2")
+
+def make_lines(count):
+    """One scan burst with count devices, the first ones are keys"""
+    lines = []
+    for i in range(count):
+        if i < len(KEYS):
+            lines.append(b"+SCAN:0x" + KEYS[i] + b",PicoKey,-" + str(50 + i).encode())
+        else:
+            lines.append(f"+SCAN:0x{0x5A0000000000 + i:012X},Phone{i},-{60 + i % 35}".encode())
+    return lines
+
+def measure(count, capacity):
+    """Microseconds per scan line: parse, table update and unlock decision"""
+    ble = SimpleBLE(uart=FakeUART(b''))
+    table = DeviceTable(capacity, KEYS)
+    record = ble._scan_record
+    lines = make_lines(count)
+
+    start = time.ticks_us()
+    for _ in range(ROUNDS):
+        for line in lines:
+            ble._parse_scan_result(line)
+            table.update(record)
+        table.strongest_authorized(5000)
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+
+    return {
+        'devices': count,
+        'capacity': capacity,
+        'us_per_line': elapsed / (ROUNDS * count),
+        'evictions': table.evictions
+    }
+
+def run():
+    results = []
+    for count in DEVICE_COUNTS:
+        # Table large enough for everyone, then the default 32-slot table
+        results.append(measure(count, 512))
+        results.append(measure(count, 32))
+    return results
+
+def main():
+    print(f"Device table benchmark ({ROUNDS} scan bursts each)")
+    print("devices capacity  us/line  evictions")
+    for r in run():
+        print(f"{r['devices']:7d} {r['capacity']:8d} {r['us_per_line']:8.1f} {r['evictions']:10d}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+I2C Link Benchmark - Adaptive levels vs the old one-way safe fallback
+
+Runs display updates over a fault-injecting I2C bus on a simulated clock.
+"""
+
+import random
+
+import hostenv
+hostenv.install()
+
+import ssd1306
+from ssd1306 import SSD1306_I2C
+
+FREQ = 400000
+FRAMES = 600
+
+class FaultyI2C:
+    """I2C bus that fails transactions by a fault model
+
+    fault(transfer, size, freq) returns the failure probability.
+    """
+
+    def __init__(self, clock, fault, freq=FREQ, seed=1):
+        self.clock = clock
+        self.fault = fault
+        self.freq = freq
+        self.transfers = 0
+        self.faults = 0
+        self._rng = random.Random(seed)
+
+    def writevto(self, addr, vector):
+        size = 0
+        for buf in vector:
+            size += len(buf)
+        # Start + address + data bits with ACKs + stop
+        self.clock.now_us += (2 + (size + 1) * 9) * 1000000 // self.freq
+        self.transfers += 1
+        if self._rng.random() < self.fault(self.transfers, size, self.freq):
+            self.faults += 1
+            raise OSError(5)
+
+    def writeto(self, addr, buf):
+        self.writevto(addr, (buf,))
+
+def no_faults(transfer, size, freq):
+    return 0
+
+def glitch(transfer, size, freq):
+    """One burst of interference early on"""
+    return 0.6 if 200 <= transfer < 210 else 0
+
+def noisy(transfer, size, freq):
+    """Long transfers at full clock fail now and then"""
+    return 0.03 * size / 129 * freq / FREQ
+
+def marginal(transfer, size, freq):
+    """Weak pull-ups: the full clock is unreliable, half of it is fine"""
+    return 0.3 if freq >= FREQ else 0.002
+
+SCENARIOS = (("clean", no_faults), ("glitch", glitch), ("noisy", noisy), ("marginal", marginal))
+
+def simulate(fault, legacy=False, seed=1):
+    with hostenv.sim_time(ssd1306) as clock:
+        bus = FaultyI2C(clock, fault, seed=seed)
+        buses = []
+
+        def set_freq(hz):
+            bus.freq = hz
+            buses.append(hz)
+            return bus
+
+        display = SSD1306_I2C(128, 64, bus, freq=FREQ, set_freq=set_freq)
+        link = display.link
+        rng = random.Random(seed)
+        start = clock.now_us
+        for frame in range(FRAMES):
+            if frame % 50 == 0:
+                display.invalidate()
+            display.fill_rect(0, 24, 128, 16, 0)
+            display.text(str(rng.randint(-99, -30)), rng.randint(0, 80), 25)
+            display.show()
+            if legacy and link.errors and link.adaptive:
+                display.enable_safe_mode()  # Old driver: safe forever after one error
+        elapsed = clock.now_us - start
+
+    stats = link.stats()
+    stats['faults'] = bus.faults
+    stats['freq_changes'] = len(buses)
+    stats['sim_ms'] = elapsed // 1000
+    return stats
+
+def run():
+    results = []
+    for name, fault in SCENARIOS:
+        for legacy in (True, False):
+            r = simulate(fault, legacy)
+            r['scenario'] = name
+            r['driver'] = "legacy" if legacy else "adaptive"
+            results.append(r)
+    return results
+
+def main():
+    print(f"I2C link simulation ({FRAMES} display updates, {FREQ // 1000} kHz)")
+    print("scenario driver    level errors retries lost  bytes/s  time ms")
+    for r in run():
+        print(f"{r['scenario']:<8} {r['driver']:<9} {r['level']:5d} {r['errors']:6d} {r['retries']:7d}"
+              f" {r['failures']:4d} {r['bytes_per_sec']:8d} {r['sim_ms']:8d}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Large Font Benchmark - Direct buffer writes vs a naive scaled pixel loop
+"""
+
+try:
+    import hostenv
+    hostenv.install()
+except ImportError:
+    pass  # On the board, copied next to the thonny/minimal files
+
+import time
+from machine import I2C, Pin
+from ssd1306 import SSD1306_I2C
+from large_font import FONT, FIRST_CHAR, LAST_CHAR, GLYPH_WIDTH, GLYPH_HEIGHT, gap, fit_scale, draw_centered
+
+TEXTS = ("UNLOCK", "LOCK", "SCAN", "ADVERTISING")
+ROUNDS = 5
+
+def naive_text(display, text, x, y, scale, color=1, scale_y=None):
+    """Scaled text with one pixel() call per screen pixel"""
+    if scale_y is None:
+        scale_y = scale
+    for ch in text:
+        code = ord(ch)
+        if code < FIRST_CHAR or code > LAST_CHAR:
+            code = 63
+        base = (code - FIRST_CHAR) * GLYPH_WIDTH
+        for col in range(GLYPH_WIDTH):
+            bits = FONT[base + col]
+            for row in range(GLYPH_HEIGHT):
+                if bits >> row & 1:
+                    for dx in range(scale):
+                        for dy in range(scale_y):
+                            display.pixel(x + col * scale + dx, y + row * scale_y + dy, color)
+        x += GLYPH_WIDTH * scale + gap(scale)
+
+def naive_centered(display, text):
+    scale = fit_scale(text, display.width, display.height)
+    width = len(text) * (GLYPH_WIDTH * scale + gap(scale)) - gap(scale)
+    naive_text(display, text, (display.width - width) // 2,
+               (display.height - GLYPH_HEIGHT * scale) // 2, scale)
+
+def _time_us(func, display, text):
+    start = time.ticks_us()
+    for _ in range(ROUNDS):
+        display.fill(0)
+        func(display, text)
+    return time.ticks_diff(time.ticks_us(), start) // ROUNDS
+
+def run():
+    display = SSD1306_I2C(128, 64, I2C(0, sda=Pin(8), scl=Pin(9)))  # Receiver OLED wiring
+    results = []
+    for text in TEXTS:
+        naive_us = _time_us(naive_centered, display, text)
+        naive_buf = bytes(display.buffer)
+        fast_us = _time_us(draw_centered, display, text)
+        results.append({
+            'text': text,
+            'scale': fit_scale(text, display.width, display.height),
+            'naive_us': naive_us,
+            'us': fast_us,
+            'same': naive_buf == bytes(display.buffer)
+        })
+    return results
+
+def main():
+    print("Large font full-screen status render (128x64)")
+    for r in run():
+        ratio = r['us'] / r['naive_us'] if r['naive_us'] else 0
+        print(f"{r['text']:<12} x{r['scale']}  {r['us']:6d} us vs naive {r['naive_us']:6d} us"
+              f" ({ratio:.0%}){'' if r['same'] else '  MISMATCH'}")
+
+if __name__ == "__main__":
+    main()
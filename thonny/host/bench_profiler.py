@@ -0,0 +1,57 @@
+"""
+Profiler Benchmark - Cost of begin/mark when disabled and enabled
+"""
+
+try:
+    import hostenv
+    hostenv.install()
+except ImportError:
+    pass  # On the board, copied next to the thonny/minimal files
+
+import time
+from loop_profiler import LoopProfiler
+
+LOOPS = 2000
+STAGES = ("a", "b", "c", "d", "e")
+
+def _loop_us(profiler):
+    """Microseconds per pass of an empty five-stage loop"""
+    begin = profiler.begin
+    mark = profiler.mark
+    start = time.ticks_us()
+    for _ in range(LOOPS):
+        begin()
+        mark(0)
+        mark(1)
+        mark(2)
+        mark(3)
+        mark(4)
+    return time.ticks_diff(time.ticks_us(), start) / LOOPS
+
+def _bare_us():
+    start = time.ticks_us()
+    for _ in range(LOOPS):
+        pass
+    return time.ticks_diff(time.ticks_us(), start) / LOOPS
+
+def run():
+    bare = _bare_us()
+    disabled = _loop_us(LoopProfiler(STAGES))
+    enabled = _loop_us(LoopProfiler(STAGES, enabled=True))
+    memory = _loop_us(LoopProfiler(STAGES, enabled=True, track_memory=True))
+    return {
+        'bare_us': bare,
+        'disabled_us': disabled - bare,
+        'enabled_us': enabled - bare,
+        'memory_us': memory - bare
+    }
+
+def main():
+    print(f"Loop profiler overhead per pass (1 begin + 5 marks, {LOOPS} passes)")
+    r = run()
+    print(f"Disabled:         {r['disabled_us']:.1f} us")
+    print(f"Enabled:          {r['enabled_us']:.1f} us")
+    print(f"Enabled + memory: {r['memory_us']:.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Scan Batch Benchmark - Per-line vs per-window scan result delivery
+"""
+
+try:
+    import hostenv
+    hostenv.install()
+except ImportError:
+    pass  # On the board, copied next to the thonny/minimal files with fakes.py
+
+import time
+from ryb080i_simple import SimpleBLE
+from device_table import DeviceTable
+from fakes import FakeUART
+
+DEVICE_COUNTS = (5, 20, 60)
+REPORTS = 4   # Times each device shows up in one scan burst
+ROUNDS = 20   # Scan bursts per case
+KEY = b"C8FD19A2B3E4"
+
+def make_burst(devices, reports=REPORTS):
+    """One scan burst, every device reported several times with varying RSSI"""
+    lines = []
+    for r in range(reports):
+        lines.append(f"+SCAN:0x{KEY.decode()},PicoKey,-{55 + r * 3}\r\n")
+        for i in range(devices - 1):
+            lines.append(f"+SCAN:0x{0x5A0000000000 + i:012X},Phone{i},-{60 + (i + r * 7) % 35}\r\n")
+    return "".join(lines).encode()
+
+def measure(devices, window_ms):
+    """Callbacks and handled records per scan burst, fastest burst in microseconds"""
+    burst = make_burst(devices)
+    ble = SimpleBLE(uart=FakeUART(b''), scan_window_ms=window_ms)
+    table = DeviceTable(64, (KEY,))
+    counts = {'callbacks': 0, 'records': 0}
+    best = []
+
+    def on_scan_result(device_list):
+        # Same work as the receiver: table update, then the unlock decision
+        counts['callbacks'] += 1
+        for device in device_list:
+            counts['records'] += 1
+            slot = table.update(device)
+            if device.rssi is not None and table.is_authorized(slot):
+                best.append(device.rssi)
+        table.strongest_authorized(5000)
+
+    ble.set_callback('scan_result', on_scan_result)
+    fastest = None
+    for _ in range(ROUNDS):
+        ble.uart = FakeUART(burst)
+        start = time.ticks_us()
+        ble.process_uart_data()
+        ble.flush_scan_batch()  # Scan complete
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        if fastest is None or elapsed < fastest:
+            fastest = elapsed
+
+    return {
+        'devices': devices,
+        'lines': devices * REPORTS,
+        'callbacks': counts['callbacks'] // ROUNDS,
+        'records': counts['records'] // ROUNDS,
+        'key_rssi': best[-1] if best else None,
+        'us_per_scan': fastest
+    }
+
+def run():
+    results = []
+    for devices in DEVICE_COUNTS:
+        results.append(('per-line', measure(devices, 0)))
+        results.append(('batched', measure(devices, 1000)))
+    return results
+
+def main():
+    print(f"Scan batch benchmark ({REPORTS} reports per device, {ROUNDS} bursts each)")
+    print("mode      devices lines callbacks records key_rssi  us/scan")
+    for mode, r in run():
+        print(f"{mode:<9} {r['devices']:7d} {r['lines']:5d} {r['callbacks']:9d} "
+              f"{r['records']:7d} {r['key_rssi']:8d} {r['us_per_scan']:8d}")
+
+if __name__ == "__main__":
+    main()
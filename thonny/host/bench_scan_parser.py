@@ -0,0 +1,159 @@
+"""
+Scan Parser Benchmark - Fuzz and throughput for RYB080I scan lines
+"""
+
+try:
+    import hostenv
+    hostenv.install()
+except ImportError:
+    pass  # On the board, copied next to the thonny/minimal files with fakes.py and bench_alloc.py
+
+import gc
+import re
+import time
+import random
+from ryb080i_simple import SimpleBLE
+from fakes import FakeUART
+from bench_alloc import measure
+
+TARGET = "PicoKey"
+ITERATIONS = 50
+FUZZ_CASES = 2000
+
+# Lines as seen from the module during scans (scan results and other replies)
+CORPUS = [
+    b"+SCAN:0xC8FD19A2B3E4,PicoKey,-58",
+    b"+SCAN:0xC8FD19A2B3E4,PicoKey,-61",
+    b"+SCAN:0x5A1B2C3D4E5F,Galaxy Buds2,-77",
+    b"+SCAN:0xF0A1B2C3D4E5,,-90",
+    b"+SCAN:0x0123456789AB, picokey-2 , -45",
+    b"+SCAN:0xd4e5f60718a9,Mi Band 6,-83",
+    b"+SCAN:0xAABBCCDDEEFF,LE_WH-1000XM4,-69",
+    b"+SCAN:0x112233445566,Tile,RSSI:-72",
+    b"+SCAN:0x665544332211,[TV] Samsung,- 88",
+    b"+SCAN:0x998877665544,NoRssi",
+    b"+SCAN:0x1A2B3C4D5E6F,PicoKey,-101",
+    b"+SCAN:0x1A2B3C4D5E6F,Beacon,12",
+    b"+SCAN:0xABCDEF012345,Door Sensor,-50,extra",
+    b"+SCAN:START",
+    b"+NAME=PicoLock",
+    b"+ADVEN=1",
+    b"OK",
+    b"ERROR",
+]
+
+def legacy_parse(line):
+    """Previous split/dict/upper/regex path, kept for comparison"""
+    text = line.decode('utf-8')
+    if not (text.startswith('+') and ':0x' in text and ',' in text):
+        return None
+    parts = text.split(',')
+    device = {
+        "name": parts[1].strip(),
+        "rssi": parts[2].strip() if len(parts) > 2 else "Unknown"
+    }
+    if TARGET.upper() in device['name'].upper():
+        match = re.search(r'(-?\s*\d+)', device['rssi'])
+        if match:
+            return int(match.group(1).replace(" ", ""))
+    return None
+
+def make_parser():
+    ble = SimpleBLE(uart=FakeUART(b''))
+    pattern = TARGET.upper().encode()
+    record = ble._scan_record
+
+    def parse(line):
+        if line[0] == 0x2B and ble._parse_scan_result(line):
+            if record.name_contains(pattern):
+                return record.rssi
+        return None
+
+    return ble, parse
+
+def mutate(line):
+    """Random byte-level damage: flip, drop, insert or truncate"""
+    data = bytearray(line)
+    for _ in range(random.randint(1, 4)):
+        op = random.randint(0, 3)
+        pos = random.randint(0, max(len(data) - 1, 0))
+        if op == 0 and data:
+            data[pos] = random.getrandbits(8)
+        elif op == 1 and data:
+            data = data[:pos] + data[pos + 1:]
+        elif op == 2:
+            data = data[:pos] + bytes([random.choice(b",:-0x9 ")]) + data[pos:]
+        else:
+            data = data[:pos]
+    return bytes(data) or b"+"
+
+def fuzz(cases=FUZZ_CASES):
+    """Parser must never raise and must keep offsets and RSSI in range"""
+    random.seed(1)
+    ble, parse = make_parser()
+    record = ble._scan_record
+    failures = 0
+
+    for _ in range(cases):
+        line = mutate(random.choice(CORPUS))
+        try:
+            if ble._parse_scan_result(line):
+                n = len(line)
+                assert 0 <= record.addr_start < record.addr_end <= n
+                assert 0 <= record.name_start <= record.name_end <= n
+                assert record.rssi is None or -150 <= record.rssi <= 0
+            parse(line)
+        except Exception as e:
+            failures += 1
+            print(f"Fuzz failure on {line}: {e}")
+
+    return failures
+
+def _lines_per_sec(func):
+    count = 0
+    start = time.ticks_us()
+    for _ in range(ITERATIONS):
+        for line in CORPUS:
+            func(line)
+            count += 1
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    return count * 1000000 // max(elapsed, 1)
+
+def _alloc_bytes(func):
+    """Bytes allocated by one parse of each corpus line, after a warm-up pass"""
+    def corpus():
+        for line in CORPUS:
+            func(line)
+    corpus()
+    return measure(corpus)
+
+def run():
+    ble, parse = make_parser()
+
+    # Both paths must agree on the corpus
+    mismatches = 0
+    for line in CORPUS:
+        if legacy_parse(line) != parse(line):
+            mismatches += 1
+
+    return {
+        'legacy_lines_per_sec': _lines_per_sec(legacy_parse),
+        'lines_per_sec': _lines_per_sec(parse),
+        'legacy_alloc_bytes': _alloc_bytes(legacy_parse),
+        'alloc_bytes': _alloc_bytes(parse),
+        'mismatches': mismatches,
+        'fuzz_failures': fuzz()
+    }
+
+def main():
+    print(f"Scan parser benchmark ({len(CORPUS)} corpus lines x {ITERATIONS})")
+
+    r = run()
+    print(f"Legacy:  {r['legacy_lines_per_sec']} lines/sec")
+    print(f"Current: {r['lines_per_sec']} lines/sec")
+    heap = "heap" if hasattr(gc, 'mem_alloc') else "host peak"
+    print(f"Allocated per corpus pass ({heap}): legacy {r['legacy_alloc_bytes']} bytes, current {r['alloc_bytes']} bytes")
+    print(f"Corpus mismatches: {r['mismatches']}, fuzz failures: {r['fuzz_failures']}/{FUZZ_CASES}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Scan Scheduler Benchmark - Adaptive vs fixed interval on a simulated clock
+"""
+
+import random
+
+import hostenv
+hostenv.install()
+
+from hostenv import SimClock
+from ryb080i_simple import AdaptiveScanScheduler, SCAN_QUIET_MS
+
+RSSI_THRESHOLD = -60
+STEP_MS = 10
+SCAN_TIME_MS = 500       # Time from AT+SCAN to results
+VISITS = 30              # Key arrivals per simulation
+
+def make_visits(seed=7):
+    """(arrive_ms, leave_ms, approach_ms, peak_rssi) for each key visit"""
+    random.seed(seed)
+    visits = []
+    t = 0
+    for _ in range(VISITS):
+        t += random.randint(5000, 60000)  # Nobody around
+        stay = random.randint(10000, 30000)
+        visits.append((t, t + stay, random.randint(3000, 8000), random.randint(-55, -45)))
+        t += stay
+    return visits
+
+def rssi_at(visit, now):
+    """Key walks up from -90 dBm to its peak, then stays"""
+    arrive, leave, approach, peak = visit
+    if now >= arrive + approach:
+        return peak
+    return -90 + (peak + 90) * (now - arrive) // approach
+
+def unlock_time(visit):
+    """When the key's RSSI first crosses the threshold"""
+    arrive, leave, approach, peak = visit
+    return arrive + approach * (RSSI_THRESHOLD + 90) // (peak + 90) + 1
+
+class SimBLE:
+    """SimpleBLE stand-in: scan results wait in the window until it goes quiet or the next scan"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.batch = []
+        self.last = 0
+        self.on_scan = None
+
+    def start_scan_async(self):
+        self.flush_scan_batch()  # The previous scan is complete
+        self.started = self.clock.now
+
+    def add(self, results):
+        self.batch.extend(results)
+        self.last = self.clock.now
+
+    def poll_scan_window(self):
+        if self.batch and self.clock.now - self.last >= SCAN_QUIET_MS:
+            self.flush_scan_batch()
+
+    def flush_scan_batch(self):
+        if self.batch:
+            results, self.batch = self.batch, []
+            self.on_scan(results)
+
+def simulate(make_scheduler, visits):
+    """Run the schedule, returns scheduler stats plus real detect/unlock times"""
+    clock = SimClock()
+    ble = SimBLE(clock)
+    scheduler = make_scheduler(ble, clock)
+    end = visits[-1][1] + 10000
+    pending = None  # (result_time, scan_start)
+    detected = set()
+    unlocked = set()
+    totals = {'ttd': 0, 'ttu': 0}
+
+    def on_scan(results):
+        # Detection counts when the window is delivered, like receiver.on_scan_result
+        for i, rssi in results:
+            scheduler.note_detection(rssi)
+            visit = visits[i]
+            if i not in detected:
+                detected.add(i)
+                totals['ttd'] += clock.now - visit[0]
+            if rssi > RSSI_THRESHOLD and i not in unlocked:
+                unlocked.add(i)
+                totals['ttu'] += clock.now - unlock_time(visit)
+
+    ble.on_scan = on_scan
+    scheduler.start()
+
+    while clock.now < end:
+        if pending and clock.now >= pending[0]:
+            scan_start = pending[1]
+            pending = None
+            ble.add([(i, rssi_at(visit, scan_start)) for i, visit in enumerate(visits)
+                     if visit[0] <= scan_start < visit[1]])
+        ble.poll_scan_window()
+
+        if scheduler.should_scan():
+            scheduler.trigger_scan()
+            pending = (clock.now + SCAN_TIME_MS, ble.started)
+
+        clock.now += STEP_MS
+
+    stats = scheduler.stats()
+    stats['detected'] = len(detected)
+    stats['mean_ttd_ms'] = totals['ttd'] // len(detected) if detected else 0
+    stats['unlocked'] = len(unlocked)
+    stats['mean_ttu_ms'] = totals['ttu'] // len(unlocked) if unlocked else 0
+    return stats
+
+def run():
+    visits = make_visits()
+    return {
+        'fixed': simulate(lambda ble, clock: AdaptiveScanScheduler(
+            ble, RSSI_THRESHOLD, 3000, 3000, 3000, scan_time_ms=SCAN_TIME_MS, clock=clock), visits),
+        'adaptive': simulate(lambda ble, clock: AdaptiveScanScheduler(
+            ble, RSSI_THRESHOLD, scan_time_ms=SCAN_TIME_MS, clock=clock), visits),
+    }
+
+def main():
+    print(f"Scan scheduler simulation ({VISITS} key visits)")
+    for name, r in run().items():
+        print(f"{name:<9} {r['scans_per_sec']:.3f} scans/s ({r['scans']} scans)")
+        print(f"          time-to-detect {r['mean_ttd_ms']} ms mean ({r['detected']}/{VISITS} visits, "
+              f"scheduler bound {r['mean_detect_gap_ms']} ms)")
+        print(f"          threshold-to-unlock {r['mean_ttu_ms']} ms mean ({r['unlocked']}/{VISITS} visits)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+SPI Benchmark - Transactions and bus setup calls per frame
+"""
+
+import hostenv
+hostenv.install()
+
+from machine import SPI, Pin
+from ssd1306 import SSD1306_SPI
+
+def _frame(spi, cs, func):
+    spi.reset_stats()
+    cs.toggles = 0
+    func()
+    return {
+        'transactions': cs.toggles // 2,  # One CS low/high pair each
+        'writes': spi.writes,
+        'inits': spi.init_calls,
+        'bytes': spi.bytes_sent
+    }
+
+def run(shared=False):
+    spi = SPI(0, baudrate=10000000)
+    cs = Pin(17)
+    display = SSD1306_SPI(128, 64, spi, Pin(20), Pin(21), cs, shared=shared)
+    init = {'inits': spi.init_calls, 'writes': spi.writes}
+
+    def full():
+        display.fill(1)
+        display.invalidate()
+        display.show()
+
+    def change():
+        display.fill_rect(0, 25, 128, 8, 0)
+        display.text("UNLOCK", 0, 25)
+        display.show()
+
+    return {
+        'init': init,
+        'full': _frame(spi, cs, full),
+        'change': _frame(spi, cs, change)
+    }
+
+def main():
+    print("SSD1306 SPI: per frame cost")
+    for shared in (False, True):
+        r = run(shared)
+        print(f"{'Shared bus' if shared else 'Own bus'}: bring-up {r['init']['inits']} init calls, {r['init']['writes']} writes")
+        for name in ('full', 'change'):
+            f = r[name]
+            print(f"  {name:<6} {f['transactions']:3d} transactions {f['writes']:3d} writes"
+                  f" {f['inits']:3d} init calls {f['bytes']:5d} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Host Benchmark Suite - Hot-path measurements with a regression check
+
+    python thonny/host/bench_suite.py --output results.json
+    python thonny/host/bench_suite.py --compare thonny/host/bench_baseline.json
+    python thonny/host/bench_suite.py --save-baseline
+
+Count metrics (bytes, transactions) are exact and flagged on any change
+for the worse. Time metrics are flagged when worse than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+
+import hostenv
+hostenv.install()
+
+import time
+from machine import I2C, SPI, Pin
+import bench_alloc
+import bench_command_queue
+import event_log
+import rgbled_tools
+import ryb080i_simple
+import uart_trace
+from bench_uart import make_burst
+from fakes import FakeUART
+from oled_tools import MinimalOLED
+from rgbled_tools import MinimalRGBLED
+from ryb080i_simple import SimpleBLE
+from ssd1306 import SSD1306_I2C, SSD1306_SPI
+
+BASELINE_FILE = os.path.join(hostenv.HOST_DIR, "bench_baseline.json")
+DEFAULT_TOLERANCE = 50  # Percent, for time metrics (sleeps in the drivers are noisy)
+REPEAT = 5              # Timed runs per case, the best one counts
+
+UART_LINES = 400
+TRACE_FILE = os.path.join(hostenv.HOST_DIR, "traces", "crowd_scan.utr")
+LED_FRAMES = 200
+LOG_RECORDS = 1000
+SCAN_POLL_MS = 10  # process_uart_data() period in the delivery check
+OLED_FREQ = 40000  # MinimalOLED's bus clock
+
+# Receiver display sequence (status, rssi)
+STATUS_SEQUENCE = [
+    ("SCAN", None),
+    ("LOCK", -72),
+    ("LOCK", -68),
+    ("UNLOCK", -55),
+    ("UNLOCK", -55),
+    ("SCAN", None),
+]
+
+def metric(value, unit, better="lower", kind="time"):
+    return {'value': value, 'unit': unit, 'better': better, 'kind': kind}
+
+def best_us(func, repeat=REPEAT):
+    """Fastest of several runs in microseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.ticks_us()
+        func()
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        if best is None or elapsed < best:
+            best = elapsed
+    return max(best, 1)
+
+# Cases
+
+def bench_uart():
+    """process_uart_data + _process_line over a scan burst"""
+    burst = make_burst(UART_LINES)
+    lines = [0]
+
+    def on_line(*args):
+        lines[0] += 1
+
+    def run():
+        ble = SimpleBLE(uart=FakeUART(burst), scan_window_ms=0)
+        ble.set_callback('scan_result', on_line)
+        ble.set_callback('response', on_line)
+        start = time.ticks_us()
+        ble.process_uart_data()
+        return time.ticks_diff(time.ticks_us(), start)
+
+    elapsed = min(run() for _ in range(REPEAT))
+    lines_per_run = lines[0] // REPEAT
+    return {
+        'uart.lines': metric(lines_per_run, "lines", "higher", "count"),
+        'uart.lines_per_sec': metric(lines_per_run * 1000000 // max(elapsed, 1), "lines/s", "higher"),
+    }
+
+def bench_scan_delivery():
+    """Scan line to scan_result callback on a simulated clock, key first then repeat sighting"""
+    with hostenv.sim_time(ryb080i_simple) as clock:
+        uart = FakeUART(b'')
+        ble = SimpleBLE(uart=uart)
+        delivered = []
+        ble.set_callback('scan_result', lambda devices: delivered.append(clock.now))
+        delays = []
+        for rssi in (-70, -50):  # The stronger repeat updates the kept record
+            del delivered[:]
+            uart.data += b"+SCAN:0xC8FD19A2B3E4,PicoKey,%d\r\n" % rssi
+            sent = clock.now
+            for _ in range(ryb080i_simple.SCAN_WINDOW_MS // SCAN_POLL_MS + 1):
+                ble.process_uart_data()
+                if delivered:
+                    break
+                clock.sleep_ms(SCAN_POLL_MS)
+            delays.append(delivered[0] - sent)
+    return {
+        'scan.first_sighting_ms': metric(delays[0], "ms", kind="count"),
+        'scan.repeat_sighting_ms': metric(delays[1], "ms", kind="count"),
+    }
+
+def bench_replay():
+    """Recorded receiver session (40-device crowd) replayed through SimpleBLE"""
+    counts = {'callbacks': 0, 'records': 0}
+
+    def on_scan(device_list):
+        counts['callbacks'] += 1
+        counts['records'] += len(device_list)
+
+    def setup(ble):
+        ble.set_callback('scan_result', on_scan)
+
+    stats = None
+    best = None
+    for _ in range(REPEAT):
+        counts['callbacks'] = counts['records'] = 0
+        stats = uart_trace.replay(TRACE_FILE, setup)
+        if best is None or stats['elapsed_us'] < best:
+            best = stats['elapsed_us']
+    return {
+        'replay.scan_records': metric(counts['records'], "records", "higher", "count"),
+        'replay.scan_callbacks': metric(counts['callbacks'], "calls", kind="count"),
+        'replay.rx_overflow': metric(stats['rx_overflow'], "bytes", kind="count"),
+        'replay.decode_errors': metric(stats['rx_decode_errors'], "lines", kind="count"),
+        'replay.cpu_us': metric(best, "us"),
+    }
+
+def _make_display(mode):
+    if mode == "spi":
+        spi = SPI(0, baudrate=10000000)
+        return SSD1306_SPI(128, 64, spi, Pin(20), Pin(21), Pin(17)), spi
+    i2c = I2C(0, freq=OLED_FREQ)
+    display = SSD1306_I2C(128, 64, i2c)
+    if mode == "i2c_safe":
+        display.enable_safe_mode()
+    return display, i2c
+
+def _bus_counts(bus):
+    transactions = bus.writes if isinstance(bus, SPI) else bus.transactions
+    return bus.bytes_sent, transactions, bus.bus_time_us
+
+def bench_show(mode):
+    """Full-frame and status-change show() for one bus mode"""
+    display, bus = _make_display(mode)
+    results = {}
+
+    def full():
+        display.fill(1)
+        display.invalidate()
+        display.show()
+
+    def change():
+        # Alternate so every call has the same amount of new content
+        change.flip ^= 1
+        display.fill_rect(0, 25, 64, 8, 0)
+        display.text("UNLOCK" if change.flip else "LOCK", 0, 25)
+        display.show()
+    change.flip = 0
+
+    for name, func in (("full", full), ("change", change)):
+        func()
+        bus.reset_stats()
+        func()
+        sent, transactions, bus_us = _bus_counts(bus)
+        prefix = f"show.{mode}.{name}"
+        results[prefix + ".bytes"] = metric(sent, "bytes", kind="count")
+        results[prefix + ".transactions"] = metric(transactions, "transactions", kind="count")
+        results[prefix + ".bus_us"] = metric(bus_us, "us", kind="count")
+        if mode == "spi":
+            results[prefix + ".init_calls"] = metric(bus.init_calls, "calls", kind="count")
+        results[prefix + ".cpu_us"] = metric(best_us(func), "us")
+    return results
+
+def bench_flush():
+    """Incremental flush: steps per frame and worst bus time of one step"""
+    i2c = I2C(0, freq=OLED_FREQ)
+    display = SSD1306_I2C(128, 64, i2c)
+    results = {}
+
+    for name, draw in (("full", lambda: display.invalidate()),
+                       ("change", lambda: display.text("UNLOCK", 0, 25))):
+        display.fill(0)
+        display.show()
+        draw()
+        display.commit()
+        steps = 0
+        worst = 0
+        done = False
+        while not done:
+            i2c.reset_stats()
+            done = display.flush_step()
+            steps += 1
+            worst = max(worst, i2c.bus_time_us)
+        results[f"flush.{name}.steps"] = metric(steps, "steps", kind="count")
+        results[f"flush.{name}.max_step_bus_us"] = metric(worst, "us", kind="count")
+    return results
+
+def bench_show_status():
+    """MinimalOLED.show_status over the receiver display sequence"""
+    i2c = I2C(0, freq=OLED_FREQ)
+    oled = MinimalOLED(i2c=i2c)
+
+    def run():
+        for status, rssi in STATUS_SEQUENCE:
+            oled.show_status(status, rssi)
+
+    run()
+    i2c.reset_stats()
+    run()
+    calls = len(STATUS_SEQUENCE)
+    return {
+        'show_status.bytes_per_call': metric(i2c.bytes_sent // calls, "bytes", kind="count"),
+        'show_status.transactions_per_call': metric(i2c.transactions // calls, "transactions", kind="count"),
+        'show_status.cpu_us_per_call': metric(best_us(run) // calls, "us"),
+    }
+
+def bench_led():
+    """Flow animation frame cost and state change to LED latency"""
+    led = MinimalRGBLED(use_timer=False)
+    frames = []
+
+    def precompute():
+        led.set_brightness()
+        frames.append(led._flow_frames())
+
+    precompute_us = best_us(precompute)
+    led.play(frames[-1], rgbled_tools.FLOW_FRAME_MS)
+
+    def animate():
+        for _ in range(LED_FRAMES):
+            led._tick()
+
+    frame_us = best_us(animate) / LED_FRAMES
+
+    def state_changes():
+        for _ in range(LED_FRAMES // 2):
+            led.set_unlocked()
+            led.set_locked()
+
+    latency_us = best_us(state_changes) / LED_FRAMES
+    led.writes = 0
+    led.set_locked()
+    led.set_locked()
+    return {
+        'led.flow_precompute_us': metric(precompute_us, "us"),
+        'led.flow_frame_us': metric(round(frame_us, 1), "us"),
+        'led.state_change_us': metric(round(latency_us, 1), "us"),
+        'led.repeat_state_writes': metric(led.writes, "writes", kind="count"),
+    }
+
+def bench_event_log():
+    """Event log: cost of log() and flash writes per 1000 records"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = event_log.EventLog(prefix=os.path.join(tmp, "events"))
+
+        def append():
+            for i in range(LOG_RECORDS):
+                log.log(event_log.EV_RSSI, 2, 2, -60, i)
+
+        append()
+        pages = log.pages_written
+        log_us = best_us(append) / LOG_RECORDS
+    return {
+        'event_log.log_us': metric(round(log_us, 2), "us"),
+        'event_log.writes_per_1000': metric(pages, "writes", kind="count"),
+    }
+
+def bench_alloc_peak():
+    """Flush path: peak traced memory over bench_alloc's partial frames"""
+    return {f'alloc.{name}.peak_bytes': metric(used, "bytes", kind="count")
+            for name, used in bench_alloc.run().items()}
+
+def bench_command_queue_stall():
+    """Command queue: depth and config delay after a stalled module"""
+    stall = bench_command_queue.stall(SimpleBLE)
+    return {
+        'queue.stall_max_depth': metric(stall['max_depth'], "commands", kind="count"),
+        'queue.stall_coalesced': metric(stall['coalesced'], "commands", better="higher", kind="count"),
+        'queue.config_wait_ms': metric(stall['config_wait_ms'], "ms", kind="count"),
+    }
+
+def run():
+    results = {}
+    results.update(bench_uart())
+    results.update(bench_scan_delivery())
+    results.update(bench_replay())
+    for mode in ("i2c_fast", "i2c_safe", "spi"):
+        results.update(bench_show(mode))
+    results.update(bench_flush())
+    results.update(bench_show_status())
+    results.update(bench_led())
+    results.update(bench_event_log())
+    results.update(bench_command_queue_stall())
+    results.update(bench_alloc_peak())
+    return results
+
+# Reporting
+
+def report(results):
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        'results': results,
+    }
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Metrics worse than the baseline, as (name, old, new, change %)"""
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        before = old['value']
+        after = new['value']
+        worse = after - before if new['better'] == "lower" else before - after
+        allowed = 0 if new['kind'] == "count" else abs(before) * tolerance / 100
+        if worse > allowed:
+            change = 100 * (after - before) / before if before else float("inf")
+            regressions.append((name, before, after, change))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host benchmark suite")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_FILE, help="baseline JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed %% slowdown for time metrics")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_FILE, help="store results as the baseline")
+    args = parser.parse_args(argv)
+
+    data = report(run())
+    results = data['results']
+    for name, m in results.items():
+        print(f"{name:<36} {m['value']:>10} {m['unit']}")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+                f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before} -> {after} ({change:+.0f}%)")
+        missing = [name for name in baseline if name not in results]
+        for name in missing:
+            print(f"MISSING {name}")
+        if regressions or missing:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
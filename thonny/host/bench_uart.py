@@ -0,0 +1,110 @@
+"""
+UART Benchmark - Line assembly throughput during scan bursts
+"""
+
+import time
+
+try:
+    import hostenv
+    hostenv.install()
+except ImportError:
+    pass  # On the board, copied next to the thonny/minimal files with fakes.py
+
+from fakes import FakeUART, CHUNK
+from ryb080i_simple import SimpleBLE
+
+LINES = 400
+REPEAT = 10  # Timed runs, the best one counts
+
+def make_burst(lines=LINES):
+    """Scan burst with interleaved responses, as the module sends it"""
+    out = []
+    for i in range(lines):
+        if i % 20 == 19:
+            out.append("OK\r\n")
+        else:
+            out.append(f"+SCAN:0x{0xC0FFEE000000 + i:012X},Device{i % 37},-{40 + i % 50}\r\n")
+    return "".join(out).encode()
+
+class LegacyLineAssembler:
+    """Previous str-based process_uart_data, kept for comparison"""
+
+    def __init__(self, uart, on_line):
+        self.uart = uart
+        self.on_line = on_line
+        self.response_buffer = ""
+
+    def process_uart_data(self):
+        if self.uart.any():
+            try:
+                data = self.uart.read().decode('utf-8')
+                self.response_buffer += data
+
+                while '\n' in self.response_buffer:
+                    line_end = self.response_buffer.find('\n')
+                    line = self.response_buffer[:line_end].strip()
+                    self.response_buffer = self.response_buffer[line_end + 1:]
+
+                    if line:
+                        self.on_line(line)
+            except:
+                pass
+
+class AssemblyOnlyBLE(SimpleBLE):
+    """SimpleBLE that only counts assembled lines, like the legacy on_line"""
+
+    def _process_line(self, line, start=0, end=None):
+        self.lines += 1
+
+def _lines_per_sec(lines, elapsed_us):
+    return lines * 1000000 // max(elapsed_us, 1)
+
+def _best_us(make, poll):
+    """Fastest of REPEAT runs draining a fresh assembler, and that assembler"""
+    best = None
+    for _ in range(REPEAT):
+        assembler = make()
+        start = time.ticks_us()
+        while assembler.uart.any():
+            poll(assembler)
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, assembler
+
+def run(lines=LINES):
+    """Return lines/sec for the legacy and current assemblers (line splitting only)"""
+    burst = make_burst(lines)
+    counted = [0]
+
+    def on_line(line):
+        counted[0] += 1
+
+    legacy_us, _ = _best_us(lambda: LegacyLineAssembler(FakeUART(burst), on_line),
+                            LegacyLineAssembler.process_uart_data)
+    legacy_lines = counted[0] // REPEAT
+
+    def make():
+        ble = AssemblyOnlyBLE(uart=FakeUART(burst), scan_window_ms=0)
+        ble.lines = 0
+        return ble
+
+    current_us, ble = _best_us(make, SimpleBLE.process_uart_data)
+
+    return {
+        'legacy_lines': legacy_lines,
+        'legacy_lines_per_sec': _lines_per_sec(legacy_lines, legacy_us),
+        'lines': ble.lines,
+        'lines_per_sec': _lines_per_sec(ble.lines, current_us),
+        'rx_overflow': ble.rx_overflow
+    }
+
+def main():
+    print(f"UART line assembly benchmark ({LINES} lines, {CHUNK}-byte reads)")
+
+    r = run()
+    print(f"Legacy:  {r['legacy_lines']} lines, {r['legacy_lines_per_sec']} lines/sec")
+    print(f"Current: {r['lines']} lines, {r['lines_per_sec']} lines/sec, overflow {r['rx_overflow']} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Decode receiver event logs copied off the Pico into per-day summaries
+
+    mpremote cp :events0.bin :events1.bin :events2.bin :events3.bin logs/
+    python thonny/host/event_log_decode.py logs/
+    python thonny/host/event_log_decode.py logs/ --records
+"""
+
+import argparse
+import datetime
+import glob
+import os
+
+import hostenv
+hostenv.install()
+
+from event_log import (read_records, EVENT_NAMES, NO_RSSI, LOG_PREFIX,
+                       EV_BOOT, EV_STATE, EV_LATENCY, EV_RSSI, EV_ERROR)
+
+STATE_NAMES = ("SCAN", "LOCK", "UNLOCK")  # receiver.STATE_CODES order
+EPOCH_2000 = 946684800  # Ports whose time.time() counts from 2000
+
+def _state(code):
+    return STATE_NAMES[code] if code < len(STATE_NAMES) else str(code)
+
+def _day(time_s, epoch):
+    return datetime.datetime.fromtimestamp(time_s + epoch, datetime.timezone.utc).date()
+
+def summarize(records, epoch=0):
+    """Per-day dicts of counts, latency, RSSI and time per state"""
+    days = {}
+    for seq, (time_s, ticks, event, state, previous, rssi, value) in records:
+        day = days.get(_day(time_s, epoch))
+        if day is None:
+            day = days[_day(time_s, epoch)] = {
+                'records': 0, 'boots': 0, 'errors': 0, 'changes': 0,
+                'unlocks': 0, 'locks': 0, 'lost': 0,
+                'latency_us': [], 'rssi': [], 'detections': 0,
+                'state_ms': [0] * len(STATE_NAMES),
+            }
+        day['records'] += 1
+        if event == EV_BOOT:
+            day['boots'] += 1
+        elif event == EV_ERROR:
+            day['errors'] += 1
+        elif event == EV_STATE:
+            day['changes'] += 1
+            name = _state(state)
+            if name == "UNLOCK":
+                day['unlocks'] += 1
+            elif name == "LOCK":
+                day['locks'] += 1
+            else:
+                day['lost'] += 1
+            if previous < len(STATE_NAMES):
+                day['state_ms'][previous] += value
+        elif event == EV_LATENCY:
+            day['latency_us'].append(value)
+        elif event == EV_RSSI and rssi != NO_RSSI:
+            day['rssi'].append(rssi)
+            day['detections'] += value
+    return days
+
+def print_summary(days):
+    print("day         records boots changes unlocks locks lost  latency ms mean/max  "
+          "rssi min/mean/max  detections  unlocked  locked")
+    for date in sorted(days):
+        d = days[date]
+        lat = d['latency_us']
+        latency = f"{sum(lat) / len(lat) / 1000:.1f}/{max(lat) / 1000:.1f}" if lat else "-"
+        rssi = d['rssi']
+        rssi_text = f"{min(rssi)}/{sum(rssi) / len(rssi):.0f}/{max(rssi)}" if rssi else "-"
+        unlocked = d['state_ms'][STATE_NAMES.index("UNLOCK")] // 1000
+        locked = d['state_ms'][STATE_NAMES.index("LOCK")] // 1000
+        print(f"{date}  {d['records']:7d} {d['boots']:5d} {d['changes']:7d} {d['unlocks']:7d} "
+              f"{d['locks']:5d} {d['lost']:4d}  {latency:>19}  {rssi_text:>17}  "
+              f"{d['detections']:10d}  {unlocked:7d}s {locked:6d}s")
+
+def print_records(records, epoch=0):
+    for seq, (time_s, ticks, event, state, previous, rssi, value) in records:
+        stamp = datetime.datetime.fromtimestamp(time_s + epoch, datetime.timezone.utc)
+        name = EVENT_NAMES[event] if event < len(EVENT_NAMES) else str(event)
+        rssi_text = "" if rssi == NO_RSSI else f"{rssi}dBm"
+        print(f"{seq:4d} {stamp:%Y-%m-%d %H:%M:%S} {ticks:10d} {name:<8} "
+              f"{_state(previous):>6} -> {_state(state):<6} {rssi_text:>7} {value}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="log files, or directories holding them")
+    parser.add_argument("--records", action="store_true", help="list every record")
+    parser.add_argument("--epoch-2000", action="store_true", help="timestamps count from 2000")
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, LOG_PREFIX + "*.bin")))
+        else:
+            files.append(path)
+    epoch = EPOCH_2000 if args.epoch_2000 else 0
+
+    records = list(read_records(files))
+    if args.records:
+        print_records(records, epoch)
+    print_summary(summarize(records, epoch))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Shared fakes for the host tests and benchmarks
+
+FakeUART also runs on the board, copy it next to a bench_* script there.
+"""
+
+CHUNK = 256  # Bytes the fake UART hands out per read (rp2 RX buffer size)
+
+class FakeUART:
+    """UART stand-in that serves a fixed byte stream in small chunks"""
+
+    def __init__(self, data, chunk=CHUNK):
+        self.data = data
+        self.chunk = chunk
+        self.pos = 0
+
+    def any(self):
+        return len(self.data) - self.pos
+
+    def read(self, nbytes=None):
+        end = min(self.pos + self.chunk, len(self.data))
+        out = self.data[self.pos:end]
+        self.pos = end
+        return out or None
+
+    def readinto(self, buf):
+        n = min(len(buf), self.chunk, len(self.data) - self.pos)
+        buf[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n or None
+
+    def write(self, data):
+        return len(data)
+
+    def flush(self):
+        pass
+
+class PanelI2C:
+    """SSD1306 on an I2C bus: decodes the traffic into a model of the panel RAM
+
+    Only horizontal addressing and the address window commands matter;
+    other commands are skipped with their arguments.
+    """
+
+    ARG_COUNTS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1,
+                  0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+
+    def __init__(self, width=128, pages=8):
+        self.width = width
+        self.pages = pages
+        self.ram = bytearray(width * pages)
+        self.col0, self.col1 = 0, width - 1
+        self.page0, self.page1 = 0, pages - 1
+        self.col = 0
+        self.page = 0
+        self._cmd = []
+        self.transactions = 0
+
+    def _command(self, byte):
+        cmd = self._cmd
+        cmd.append(byte)
+        if len(cmd) <= self.ARG_COUNTS.get(cmd[0], 0):
+            return  # Arguments still to come
+        if cmd[0] == 0x21:
+            self.col0, self.col1 = cmd[1], cmd[2]
+            self.col = cmd[1]
+        elif cmd[0] == 0x22:
+            self.page0, self.page1 = cmd[1], cmd[2]
+            self.page = cmd[1]
+        self._cmd = []
+
+    def _data(self, byte):
+        self.ram[self.page * self.width + self.col] = byte
+        self.col += 1
+        if self.col > self.col1:
+            self.col = self.col0
+            self.page += 1
+            if self.page > self.page1:
+                self.page = self.page0
+
+    def _frame(self, data):
+        self.transactions += 1
+        control = data[0]
+        if control == 0x80:    # One command byte
+            self._command(data[1])
+        elif control == 0x00:  # Command stream
+            for byte in data[1:]:
+                self._command(byte)
+        elif control == 0x40:  # Data stream
+            for byte in data[1:]:
+                self._data(byte)
+
+    def writeto(self, addr, buf, stop=True):
+        self._frame(bytes(buf))
+        return 1
+
+    def writevto(self, addr, vector, stop=True):
+        self._frame(b"".join(bytes(buf) for buf in vector))
+        return 1
+
+class FlakyI2C:
+    """I2C bus that raises OSError on every transaction while failing is set"""
+
+    def __init__(self, freq=400000):
+        self.freq = freq
+        self.failing = False
+        self.transactions = 0
+        self.faults = 0
+
+    def writevto(self, addr, vector, stop=True):
+        self.transactions += 1
+        if self.failing:
+            self.faults += 1
+            raise OSError(5)  # EIO, as machine.I2C raises on a NACK
+        return 1
+
+    def writeto(self, addr, buf, stop=True):
+        return self.writevto(addr, (buf,), stop)
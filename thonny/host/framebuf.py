@@ -0,0 +1,212 @@
+"""
+Host stand-in for MicroPython's framebuf module
+
+Implements MONO_VLSB, the format the SSD1306 driver uses. Text uses a
+5x7 font in 8x8 cells, the same cell size as MicroPython's built-in font
+(glyph shapes differ slightly).
+"""
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+# Columns of the 5x7 font for ASCII 32..126, LSB at the top
+FONT_5X7 = (
+    b"\x00\x00\x00\x00\x00"  # ' '
+    b"\x00\x00\x5f\x00\x00"  # '!'
+    b"\x00\x07\x00\x07\x00"  # '"'
+    b"\x14\x7f\x14\x7f\x14"  # '#'
+    b"\x24\x2a\x7f\x2a\x12"  # '$'
+    b"\x23\x13\x08\x64\x62"  # '%'
+    b"\x36\x49\x56\x20\x50"  # '&'
+    b"\x00\x08\x07\x03\x00"  # "'"
+    b"\x00\x1c\x22\x41\x00"  # '('
+    b"\x00\x41\x22\x1c\x00"  # ')'
+    b"\x2a\x1c\x7f\x1c\x2a"  # '*'
+    b"\x08\x08\x3e\x08\x08"  # '+'
+    b"\x00\x80\x70\x30\x00"  # ','
+    b"\x08\x08\x08\x08\x08"  # '-'
+    b"\x00\x00\x60\x60\x00"  # '.'
+    b"\x20\x10\x08\x04\x02"  # '/'
+    b"\x3e\x51\x49\x45\x3e"  # '0'
+    b"\x00\x42\x7f\x40\x00"  # '1'
+    b"\x72\x49\x49\x49\x46"  # '2'
+    b"\x21\x41\x49\x4d\x33"  # '3'
+    b"\x18\x14\x12\x7f\x10"  # '4'
+    b"\x27\x45\x45\x45\x39"  # '5'
+    b"\x3c\x4a\x49\x49\x31"  # '6'
+    b"\x41\x21\x11\x09\x07"  # '7'
+    b"\x36\x49\x49\x49\x36"  # '8'
+    b"\x46\x49\x49\x29\x1e"  # '9'
+    b"\x00\x00\x14\x00\x00"  # ':'
+    b"\x00\x40\x34\x00\x00"  # ';'
+    b"\x00\x08\x14\x22\x41"  # '<'
+    b"\x14\x14\x14\x14\x14"  # '='
+    b"\x00\x41\x22\x14\x08"  # '>'
+    b"\x02\x01\x59\x09\x06"  # '?'
+    b"\x3e\x41\x5d\x59\x4e"  # '@'
+    b"\x7c\x12\x11\x12\x7c"  # 'A'
+    b"\x7f\x49\x49\x49\x36"  # 'B'
+    b"\x3e\x41\x41\x41\x22"  # 'C'
+    b"\x7f\x41\x41\x22\x1c"  # 'D'
+    b"\x7f\x49\x49\x49\x41"  # 'E'
+    b"\x7f\x09\x09\x09\x01"  # 'F'
+    b"\x3e\x41\x49\x49\x7a"  # 'G'
+    b"\x7f\x08\x08\x08\x7f"  # 'H'
+    b"\x00\x41\x7f\x41\x00"  # 'I'
+    b"\x20\x40\x41\x3f\x01"  # 'J'
+    b"\x7f\x08\x14\x22\x41"  # 'K'
+    b"\x7f\x40\x40\x40\x40"  # 'L'
+    b"\x7f\x02\x0c\x02\x7f"  # 'M'
+    b"\x7f\x04\x08\x10\x7f"  # 'N'
+    b"\x3e\x41\x41\x41\x3e"  # 'O'
+    b"\x7f\x09\x09\x09\x06"  # 'P'
+    b"\x3e\x41\x51\x21\x5e"  # 'Q'
+    b"\x7f\x09\x19\x29\x46"  # 'R'
+    b"\x26\x49\x49\x49\x32"  # 'S'
+    b"\x01\x01\x7f\x01\x01"  # 'T'
+    b"\x3f\x40\x40\x40\x3f"  # 'U'
+    b"\x1f\x20\x40\x20\x1f"  # 'V'
+    b"\x3f\x40\x38\x40\x3f"  # 'W'
+    b"\x63\x14\x08\x14\x63"  # 'X'
+    b"\x07\x08\x70\x08\x07"  # 'Y'
+    b"\x61\x51\x49\x45\x43"  # 'Z'
+    b"\x00\x7f\x41\x41\x41"  # '['
+    b"\x02\x04\x08\x10\x20"  # '\\'
+    b"\x00\x41\x41\x41\x7f"  # ']'
+    b"\x04\x02\x01\x02\x04"  # '^'
+    b"\x40\x40\x40\x40\x40"  # '_'
+    b"\x00\x03\x07\x08\x00"  # '`'
+    b"\x20\x54\x54\x54\x78"  # 'a'
+    b"\x7f\x48\x44\x44\x38"  # 'b'
+    b"\x38\x44\x44\x44\x20"  # 'c'
+    b"\x38\x44\x44\x48\x7f"  # 'd'
+    b"\x38\x54\x54\x54\x18"  # 'e'
+    b"\x08\x7e\x09\x01\x02"  # 'f'
+    b"\x0c\x52\x52\x52\x3e"  # 'g'
+    b"\x7f\x08\x04\x04\x78"  # 'h'
+    b"\x00\x44\x7d\x40\x00"  # 'i'
+    b"\x20\x40\x44\x3d\x00"  # 'j'
+    b"\x7f\x10\x28\x44\x00"  # 'k'
+    b"\x00\x41\x7f\x40\x00"  # 'l'
+    b"\x7c\x04\x18\x04\x78"  # 'm'
+    b"\x7c\x08\x04\x04\x78"  # 'n'
+    b"\x38\x44\x44\x44\x38"  # 'o'
+    b"\x7c\x14\x14\x14\x08"  # 'p'
+    b"\x08\x14\x14\x18\x7c"  # 'q'
+    b"\x7c\x08\x04\x04\x08"  # 'r'
+    b"\x48\x54\x54\x54\x20"  # 's'
+    b"\x04\x3f\x44\x40\x20"  # 't'
+    b"\x3c\x40\x40\x20\x7c"  # 'u'
+    b"\x1c\x20\x40\x20\x1c"  # 'v'
+    b"\x3c\x40\x30\x40\x3c"  # 'w'
+    b"\x44\x28\x10\x28\x44"  # 'x'
+    b"\x0c\x50\x50\x50\x3c"  # 'y'
+    b"\x44\x64\x54\x4c\x44"  # 'z'
+    b"\x00\x08\x36\x41\x00"  # '{'
+    b"\x00\x00\x77\x00\x00"  # '|'
+    b"\x00\x41\x36\x08\x00"  # '}'
+    b"\x02\x01\x02\x04\x02"  # '~'
+)
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format != MONO_VLSB:
+            raise ValueError("host framebuf only supports MONO_VLSB")
+        self._buf = buffer
+        self._width = width
+        self._height = height
+        self._stride = stride or width
+        if len(buffer) < ((height + 7) // 8) * self._stride:
+            raise ValueError("buffer too small")
+
+    def fill(self, c):
+        value = 0xFF if c else 0x00
+        buf = self._buf
+        for i in range(((self._height + 7) // 8) * self._stride):
+            buf[i] = value
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return None
+        index = (y >> 3) * self._stride + x
+        mask = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buf[index] & mask else 0
+        if c:
+            self._buf[index] |= mask
+        else:
+            self._buf[index] &= ~mask & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self._width)
+        y1 = min(y + h, self._height)
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self.pixel(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def line(self, x0, y0, x1, y1, c):
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x0, y0, c)
+            if x0 == x1 and y0 == y1:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def text(self, s, x, y, c=1):
+        for ch in s:
+            code = ord(ch)
+            if not 32 <= code <= 126:
+                code = 127  # Unknown characters render as a block
+            for col in range(8):
+                if code == 127:
+                    bits = 0x7F if col < 5 else 0
+                else:
+                    bits = FONT_5X7[(code - 32) * 5 + col] if col < 5 else 0
+                for row in range(8):
+                    if bits >> row & 1:
+                        self.pixel(x + col, y + row, c)
+            x += 8
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        for yy in range(fbuf._height):
+            for xx in range(fbuf._width):
+                c = fbuf.pixel(xx, yy)
+                if c != key:
+                    self.pixel(x + xx, y + yy, c)
+
+    def scroll(self, xstep, ystep):
+        src = FrameBuffer(bytearray(self._buf), self._width, self._height, MONO_VLSB, self._stride)
+        for yy in range(self._height):
+            for xx in range(self._width):
+                sx = xx - xstep
+                sy = yy - ystep
+                if 0 <= sx < self._width and 0 <= sy < self._height:
+                    self.pixel(xx, yy, src.pixel(sx, sy))
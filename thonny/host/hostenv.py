@@ -0,0 +1,110 @@
+"""
+Host environment - Run the MicroPython code under CPython
+
+install() adds MicroPython's time.ticks_* functions (wrapping like the
+real ones) and puts the host stand-ins and thonny/minimal on sys.path.
+sim_time() runs driver modules on a SimClock for the simulations.
+"""
+
+import os
+from contextlib import contextmanager
+import sys
+import time
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALF = TICKS_PERIOD // 2
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+MINIMAL_DIR = os.path.join(os.path.dirname(HOST_DIR), "minimal")
+
+_start_ns = time.perf_counter_ns()
+
+def ticks_ms():
+    return ((time.perf_counter_ns() - _start_ns) // 1000000) & TICKS_MAX
+
+def ticks_us():
+    return ((time.perf_counter_ns() - _start_ns) // 1000) & TICKS_MAX
+
+def ticks_diff(end, start):
+    return ((end - start + TICKS_HALF) & TICKS_MAX) - TICKS_HALF
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
+
+def sleep_us(us):
+    time.sleep(us / 1000000)
+
+def install():
+    """Patch time and sys.path, safe to call more than once"""
+    time.ticks_ms = ticks_ms
+    time.ticks_us = ticks_us
+    time.ticks_cpu = ticks_us
+    time.ticks_diff = ticks_diff
+    time.ticks_add = ticks_add
+    time.sleep_ms = sleep_ms
+    time.sleep_us = sleep_us
+
+    for path in (MINIMAL_DIR, HOST_DIR):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+
+class SimClock:
+    """time stand-in whose ticks move only when the simulation advances them
+
+    now is in milliseconds, now_us in microseconds. Sleeps advance the
+    clock, and calling it returns ticks_ms, so it also serves as a
+    clock= function.
+    """
+
+    def __init__(self):
+        self.now_us = 0
+
+    @property
+    def now(self):
+        return self.now_us // 1000
+
+    @now.setter
+    def now(self, ms):
+        self.now_us = ms * 1000
+
+    def __call__(self):
+        return self.now
+
+    def ticks_ms(self):
+        return self.now
+
+    def ticks_us(self):
+        return self.now_us
+
+    def ticks_diff(self, a, b):
+        return a - b
+
+    def ticks_add(self, a, b):
+        return a + b
+
+    def sleep(self, s):
+        self.now_us += int(s * 1000000)
+
+    def sleep_ms(self, ms):
+        self.now_us += ms * 1000
+
+    def sleep_us(self, us):
+        self.now_us += us
+
+@contextmanager
+def sim_time(*modules, clock=None):
+    """Give modules a SimClock as their time module for the block, yields the clock"""
+    clock = clock or SimClock()
+    saved = [module.time for module in modules]
+    for module in modules:
+        module.time = clock
+    try:
+        yield clock
+    finally:
+        for module, original in zip(modules, saved):
+            module.time = original
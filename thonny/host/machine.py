@@ -0,0 +1,269 @@
+"""
+Host stand-in for MicroPython's machine module
+
+Bus objects record what the drivers send and how long it would take on
+the wire. UARTs talk to an emulated device attached with attach().
+"""
+
+import threading
+import time
+
+# Emulated devices by UART id, see attach()
+_uart_devices = {}
+
+def attach(uart_id, device):
+    """Put an emulated device (e.g. RYB080IEmulator) behind UART(uart_id)"""
+    _uart_devices[uart_id] = device
+
+def freq(value=None):
+    return 125000000
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+def unique_id():
+    return b"\xe6\x61\x41\x04\x03\x2a\x2b\x2c"
+
+def idle():
+    pass
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self._value = value or 0
+        self.toggles = 0  # Level changes, e.g. two per CS-framed transfer
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if value is not None:
+            self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        value = 1 if value else 0
+        if value != self._value:
+            self.toggles += 1
+            self._value = value
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    high = on
+    low = off
+
+class I2C:
+    """Records transactions and the bus time they would take at freq"""
+
+    REALTIME = False  # Default for new buses: sleep for the bus time of each transaction
+
+    def __init__(self, id, scl=None, sda=None, freq=400000, realtime=None):
+        self.id = id
+        self.freq = freq
+        self.realtime = I2C.REALTIME if realtime is None else realtime
+        self.transactions = 0
+        self.bytes_sent = 0
+        self.bus_time_us = 0
+        self.log = None  # List of (addr, bytes) when set
+
+    def _transfer(self, addr, size):
+        # Start + address byte + data bytes (9 clocks each with ACK) + stop
+        us = (2 + (size + 1) * 9) * 1000000 // self.freq
+        self.transactions += 1
+        self.bytes_sent += size
+        self.bus_time_us += us
+        if self.realtime:
+            time.sleep(us / 1000000)
+
+    def writeto(self, addr, buf, stop=True):
+        self._transfer(addr, len(buf))
+        if self.log is not None:
+            self.log.append((addr, bytes(buf)))
+        return 1
+
+    def writevto(self, addr, vector, stop=True):
+        if self.log is None:
+            size = 0
+            for buf in vector:
+                size += len(buf)
+            self._transfer(addr, size)  # No copies, allocation checks measure the driver
+            return 1
+        data = b"".join(bytes(buf) for buf in vector)
+        self._transfer(addr, len(data))
+        self.log.append((addr, data))
+        return 1
+
+    def readfrom(self, addr, nbytes, stop=True):
+        self._transfer(addr, nbytes)
+        return bytes(nbytes)
+
+    def scan(self):
+        return [0x3C]
+
+    def reset_stats(self):
+        self.transactions = 0
+        self.bytes_sent = 0
+        self.bus_time_us = 0
+
+class SPI:
+    """Counts writes, bytes and init() calls"""
+
+    def __init__(self, id, baudrate=1000000, polarity=0, phase=0, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self.reset_stats()
+
+    def init(self, baudrate=1000000, polarity=0, phase=0, **kwargs):
+        self.baudrate = baudrate
+        self.init_calls += 1
+
+    def write(self, buf):
+        self.writes += 1
+        self.bytes_sent += len(buf)
+        self._bus_time += len(buf) * 8 / self.baudrate
+
+    @property
+    def bus_time_us(self):
+        return int(self._bus_time * 1000000)
+
+    def reset_stats(self):
+        self.init_calls = 0
+        self.writes = 0
+        self.bytes_sent = 0
+        self._bus_time = 0.0
+
+class UART:
+    """UART connected to the device attached for its id, if any"""
+
+    def __init__(self, id, baudrate=9600, bits=8, parity=None, stop=1,
+                 tx=None, rx=None, rxbuf=256, timeout=0, device=None):
+        self.id = id
+        self.device = device if device is not None else _uart_devices.get(id)
+        self.rxbuf = rxbuf
+        self._rx = bytearray()
+        self.rx_dropped = 0  # Bytes lost to a full receive buffer
+        self.init(baudrate)
+
+    def init(self, baudrate=9600, bits=8, parity=None, stop=1, **kwargs):
+        self.baudrate = baudrate
+
+    def _pump(self):
+        if self.device is None:
+            return
+        data = self.device.read_ready(self.baudrate)
+        if data:
+            room = self.rxbuf - len(self._rx)
+            if len(data) > room:
+                self.rx_dropped += len(data) - room
+                data = data[:room]
+            self._rx += data
+
+    def any(self):
+        self._pump()
+        return len(self._rx)
+
+    def read(self, nbytes=None):
+        self._pump()
+        if not self._rx:
+            return None
+        if nbytes is None or nbytes < 0:
+            nbytes = len(self._rx)
+        data = bytes(self._rx[:nbytes])
+        del self._rx[:nbytes]
+        return data
+
+    def readinto(self, buf, nbytes=None):
+        self._pump()
+        if not self._rx:
+            return None
+        count = min(len(buf) if nbytes is None else nbytes, len(self._rx))
+        buf[:count] = self._rx[:count]
+        del self._rx[:count]
+        return count
+
+    def readline(self):
+        self._pump()
+        end = self._rx.find(b"\n")
+        if end < 0:
+            return self.read()
+        return self.read(end + 1)
+
+    def write(self, buf):
+        if self.device is not None:
+            self.device.receive(bytes(buf), self.baudrate)
+        return len(buf)
+
+    def flush(self):
+        pass
+
+    def txdone(self):
+        return True
+
+    def stream_reader(self):
+        """asyncio reader for CPython, whose StreamReader can't wrap a UART"""
+        return UARTStreamReader(self)
+
+class UARTStreamReader:
+    """Polls a host UART from asyncio, read() returns as soon as data is in"""
+
+    POLL_S = 0.001
+
+    def __init__(self, uart):
+        self.uart = uart
+
+    async def read(self, n=-1):
+        import asyncio
+        while True:
+            data = self.uart.read(n)
+            if data:
+                return data
+            await asyncio.sleep(self.POLL_S)
+
+    def at_eof(self):
+        return False
+
+class Timer:
+    """Periodic or one-shot callback from a host thread"""
+
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self._stop = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, freq=None, period=None, callback=None):
+        self.deinit()
+        interval = 1 / freq if freq else period / 1000
+        stop = threading.Event()
+        self._stop = stop
+
+        def run():
+            deadline = time.perf_counter()
+            while True:
+                deadline += interval
+                if stop.wait(max(0, deadline - time.perf_counter())):
+                    return
+                if callback:
+                    callback(self)
+                if mode == Timer.ONE_SHOT:
+                    return
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def deinit(self):
+        if self._stop:
+            self._stop.set()
+            self._stop = None
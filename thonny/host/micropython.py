@@ -0,0 +1,22 @@
+"""
+Host stand-in for MicroPython's micropython module
+"""
+
+def const(value):
+    return value
+
+def native(func):
+    return func
+
+def viper(func):
+    return func
+
+def schedule(func, arg):
+    func(arg)
+    return True
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+def mem_info(verbose=False):
+    print("mem: not available on host")
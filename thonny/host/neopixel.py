@@ -0,0 +1,40 @@
+"""
+Host stand-in for MicroPython's neopixel module
+"""
+
+import time
+
+class NeoPixel:
+    ORDER = (1, 0, 2, 3)  # GRB on the wire, like WS2812
+
+    def __init__(self, pin, n, bpp=3, timing=1):
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.buf = bytearray(n * bpp)
+        self.write_count = 0
+        self.last_write_us = None
+        self.frames = []  # Bytes of each write, when record_frames is set
+        self.record_frames = False
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, index, value):
+        offset = index * self.bpp
+        for i in range(self.bpp):
+            self.buf[offset + self.ORDER[i]] = value[i]
+
+    def __getitem__(self, index):
+        offset = index * self.bpp
+        return tuple(self.buf[offset + self.ORDER[i]] for i in range(self.bpp))
+
+    def fill(self, value):
+        for i in range(self.n):
+            self[i] = value
+
+    def write(self):
+        self.write_count += 1
+        self.last_write_us = time.ticks_us()
+        if self.record_frames:
+            self.frames.append(bytes(self.buf))
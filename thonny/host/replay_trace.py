@@ -0,0 +1,46 @@
+"""
+Replay a UART trace through SimpleBLE under CPython
+
+    python thonny/host/run_host.py receiver.py --seconds 30 --crowd 40 --trace scan.utr
+    python thonny/host/replay_trace.py scan.utr
+    python thonny/host/replay_trace.py scan.utr --realtime
+"""
+
+import argparse
+
+import hostenv
+hostenv.install()
+
+import uart_trace
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("trace", help="trace file recorded with SimpleBLE.start_trace()")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded timing")
+    parser.add_argument("--no-batch", action="store_true", help="per-line scan callbacks")
+    args = parser.parse_args(argv)
+
+    counts = {'scan_result': 0, 'records': 0, 'response': 0}
+
+    def setup(ble):
+        def on_scan(device_list):
+            counts['scan_result'] += 1
+            counts['records'] += len(device_list)
+
+        def on_response(cmd_id, text):
+            counts['response'] += 1
+
+        ble.set_callback('scan_result', on_scan)
+        ble.set_callback('response', on_response)
+
+    ble_args = {'scan_window_ms': 0} if args.no_batch else {}
+    stats = uart_trace.replay(args.trace, setup, args.realtime, **ble_args)
+    stats.pop('ble')
+    for name, value in stats.items():
+        print(f"{name:<18} {value}")
+    print(f"{'scan_callbacks':<18} {counts['scan_result']}")
+    print(f"{'scan_records':<18} {counts['records']}")
+    print(f"{'responses':<18} {counts['response']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Run a thonny/minimal script under CPython against the emulated module
+
+    python thonny/host/run_host.py receiver.py --seconds 20 --key-rssi -50 --crowd 20
+"""
+
+import argparse
+import os
+import runpy
+import sys
+import threading
+import _thread
+
+import hostenv
+
+def build_emulator(args):
+    from ryb080i_emulator import RYB080IEmulator
+    emulator = RYB080IEmulator(baudrate=args.baud, latency_ms=args.latency_ms,
+                               scan_time_ms=args.scan_time_ms)
+    if args.key_rssi is not None:
+        emulator.add_device("C8FD19A2B3E4", "PicoKey", args.key_rssi, jitter=args.jitter)
+    if args.crowd:
+        emulator.add_crowd(args.crowd)
+    return emulator
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("script", help="script in thonny/minimal, e.g. receiver.py")
+    parser.add_argument("--seconds", type=float, default=10, help="stop with KeyboardInterrupt after this")
+    parser.add_argument("--key-rssi", type=int, help="add a PicoKey at this RSSI")
+    parser.add_argument("--jitter", type=int, default=2, help="key RSSI jitter in dB")
+    parser.add_argument("--crowd", type=int, default=0, help="number of other devices")
+    parser.add_argument("--latency-ms", type=int, default=20, help="module reply latency")
+    parser.add_argument("--scan-time-ms", type=int, default=500, help="AT+SCAN to results")
+    parser.add_argument("--baud", type=int, default=9600, help="module baud rate")
+    parser.add_argument("--realtime-i2c", action="store_true", help="I2C writes take their bus time")
+    parser.add_argument("--trace", help="record the module UART traffic to this trace file")
+    args = parser.parse_args(argv)
+
+    hostenv.install()
+    import machine
+    emulator = build_emulator(args)
+    machine.attach(1, emulator)  # SimpleBLE's UART
+    machine.I2C.REALTIME = args.realtime_i2c
+    if args.trace:
+        from ryb080i_simple import SimpleBLE
+        SimpleBLE.TRACE_PATH = os.path.abspath(args.trace)
+
+    script = args.script
+    if not os.path.exists(script):
+        script = os.path.join(hostenv.MINIMAL_DIR, script)
+
+    stopper = threading.Timer(args.seconds, _thread.interrupt_main)
+    stopper.daemon = True
+    stopper.start()
+    sys.argv = [script]
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopper.cancel()
+        if args.trace:
+            import uart_trace
+            uart_trace.close_all()
+
+    print(f"[host] {len(emulator.commands)} commands, {emulator.scans} scans, "
+          f"{emulator.rx_bytes} bytes in, {emulator.tx_bytes} bytes out")
+    return emulator
+
+if __name__ == "__main__":
+    main()
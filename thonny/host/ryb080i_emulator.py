@@ -0,0 +1,230 @@
+"""
+RYB080I Emulator - Scripted AT-command module behind a host UART
+
+Answers the commands the minimal firmware uses with a configurable reply
+latency, and paces every reply byte at the UART baud rate. AT+SCAN
+replies OK, then reports the device population scan_time_ms later.
+"""
+
+import random
+import time
+
+# Settings the module answers to, with their power-on values
+DEFAULT_SETTINGS = {
+    "NAME": "RYB080I",
+    "CRFOP": "0",
+    "CNE": "0",
+    "CFUN": "0",
+    "ADVEN": "0",
+}
+
+# Rates AT+BAUD accepts
+SUPPORTED_BAUDS = (9600, 19200, 38400, 57600, 115200)
+LOSSY_LINE_RATE = 0.5  # Command lines lost above reliable_baud
+
+def _now_us():
+    return time.perf_counter_ns() // 1000
+
+class EmulatedDevice:
+    """A BLE device seen by scans"""
+
+    def __init__(self, address, name, rssi, jitter=0):
+        self.address = address
+        self.name = name
+        self.rssi = rssi
+        self.jitter = jitter
+
+    def rssi_at(self, now_ms, rng):
+        rssi = self.rssi(now_ms) if callable(self.rssi) else self.rssi
+        if rssi is None:
+            return None  # Out of range
+        if self.jitter:
+            rssi += rng.randint(-self.jitter, self.jitter)
+        return max(-127, min(0, rssi))
+
+class RYB080IEmulator:
+    def __init__(self, baudrate=9600, latency_ms=20, scan_time_ms=500, clock=None, seed=1,
+                 reliable_baud=None):
+        self.baudrate = baudrate
+        self.reliable_baud = reliable_baud  # Faster rates lose command lines (None = all fine)
+        self._next_baud = None    # Rate AT+BAUD switches to once its OK is sent
+        self.latency_ms = latency_ms      # Command end to first reply byte
+        self.scan_time_ms = scan_time_ms  # AT+SCAN to its result lines
+        self.clock = clock or _now_us     # Microseconds
+        self._start_us = self.clock()
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.devices = []
+        self._rng = random.Random(seed)
+        self._cmd_buf = bytearray()
+        self._pending = []        # [start_us, data, bytes_delivered] per reply line
+        self._line_free_us = 0    # When the TX line finishes the queued replies
+        self._rx_free_us = 0      # When the RX line finishes the received bytes
+        self.commands = []        # Every command line received
+        self.rx_bytes = 0
+        self.tx_bytes = 0
+        self.garbled_bytes = 0    # Sent or read at the wrong baud rate
+        self.scans = 0
+        self._adv_off_us = 0      # Time not advertising, up to the last change
+        self._adv_change_us = self._start_us
+
+    def byte_time_us(self):
+        return 10000000 // self.baudrate  # Start + 8 data + stop bits
+
+    # Population
+
+    def add_device(self, address, name, rssi, jitter=0):
+        """address as 12 hex digits, rssi in dBm or a function of elapsed ms (None = away)"""
+        device = EmulatedDevice(address.upper(), name, rssi, jitter)
+        self.devices.append(device)
+        return device
+
+    def add_crowd(self, count, rssi_range=(-95, -55), jitter=3):
+        """Phones and beacons around the lock"""
+        for i in range(count):
+            rssi = self._rng.randint(*rssi_range)
+            self.add_device(f"5A{self._rng.getrandbits(40):010X}", f"Phone{i}", rssi, jitter)
+
+    def stop_advertising(self, notify=False):
+        """Advertising stops on its own (connection, reset), optionally telling the host"""
+        self._set_advertising("0", self.clock())
+        if notify:
+            self._send("+ADVEN=0", self.clock())
+
+    def _set_advertising(self, value, at_us):
+        if value != self.settings["ADVEN"]:
+            if value != "1":
+                self._adv_change_us = at_us
+            else:
+                self._adv_off_us += at_us - self._adv_change_us
+            self.settings["ADVEN"] = value
+
+    def advertising_off_us(self):
+        """Total time the module was not advertising"""
+        off = self._adv_off_us
+        if self.settings["ADVEN"] != "1":
+            off += self.clock() - self._adv_change_us
+        return off
+
+    # UART side
+
+    def _switch_baud(self, now):
+        if self._next_baud and not self._pending and now >= self._line_free_us:
+            self.baudrate = self._next_baud
+            self._next_baud = None
+            self._cmd_buf[:] = b""
+
+    def receive(self, data, baudrate):
+        """Bytes written by the host UART"""
+        self._switch_baud(self.clock())
+        if baudrate != self.baudrate:
+            self.garbled_bytes += len(data)
+            return
+
+        now = self.clock()
+        done = max(now, self._rx_free_us) + len(data) * self.byte_time_us()
+        self._rx_free_us = done
+        self.rx_bytes += len(data)
+
+        buf = self._cmd_buf
+        for byte in data:
+            if byte == 0x0A:  # '\n'
+                line = bytes(buf).strip().decode("utf-8", "replace")
+                buf[:] = b""
+                if line and self._lossy():
+                    self.garbled_bytes += len(line)
+                elif line:
+                    self._handle(line, done)
+            else:
+                buf.append(byte)
+
+    def read_ready(self, baudrate):
+        """Reply bytes that have reached the host by now"""
+        self._switch_baud(self.clock())
+        if baudrate != self.baudrate:
+            # Wrong rate: the host sees noise, drop it
+            self._pending.clear()
+            return b""
+
+        now = self.clock()
+        byte_us = self.byte_time_us()
+        out = b""
+        pending = self._pending
+        while pending:
+            entry = pending[0]
+            start, data, sent = entry
+            if now < start:
+                break
+            ready = min(len(data), (now - start) // byte_us)
+            if ready > sent:
+                out += data[sent:ready]
+                entry[2] = ready
+            if ready < len(data):
+                break
+            pending.pop(0)
+        self.tx_bytes += len(out)
+        self._switch_baud(now)
+        return out
+
+    def _lossy(self):
+        return (self.reliable_baud and self.baudrate > self.reliable_baud
+                and self._rng.random() < LOSSY_LINE_RATE)
+
+    def _send(self, text, at_us):
+        data = (text + "\r\n").encode()
+        start = max(at_us, self._line_free_us)
+        self._line_free_us = start + len(data) * self.byte_time_us()
+        self._pending.append([start, data, 0])
+
+    # Commands
+
+    def _handle(self, line, at_us):
+        # Wake-up 'A' bytes arrive in front of the command
+        while line.startswith("AAT"):
+            line = line[1:]
+        self.commands.append(line)
+        reply_us = at_us + self.latency_ms * 1000
+
+        if line == "AT":
+            self._send("OK", reply_us)
+        elif line == "AT+SCAN":
+            self._send("OK", reply_us)
+            self._scan(reply_us + self.scan_time_ms * 1000)
+        elif line.startswith("AT+"):
+            self._setting(line[3:], reply_us)
+        else:
+            self._send("ERROR", reply_us)
+
+    def _setting(self, body, at_us):
+        if body.endswith("?"):
+            key = body[:-1]
+            if key in self.settings:
+                self._send(f"+{key}={self.settings[key]}", at_us)
+                self._send("OK", at_us)
+                return
+            if key == "BAUD":
+                self._send(f"+BAUD={self.baudrate}", at_us)
+                self._send("OK", at_us)
+                return
+        else:
+            key, sep, value = body.partition("=")
+            if sep and key == "BAUD" and value.isdigit() and int(value) in SUPPORTED_BAUDS:
+                self._send("OK", at_us)  # At the old rate, then switch
+                self._next_baud = int(value)
+                return
+            if sep and key == "ADVEN":
+                self._set_advertising(value, at_us)
+                self._send("OK", at_us)
+                return
+            if sep and key in self.settings:
+                self.settings[key] = value
+                self._send("OK", at_us)
+                return
+        self._send("ERROR", at_us)
+
+    def _scan(self, at_us):
+        self.scans += 1
+        now_ms = (at_us - self._start_us) // 1000
+        for device in self.devices:
+            rssi = device.rssi_at(now_ms, self._rng)
+            if rssi is not None:
+                self._send(f"+SCAN:0x{device.address},{device.name},{rssi}", at_us)
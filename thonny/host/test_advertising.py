@@ -0,0 +1,39 @@
+"""
+AdvertisingSupervisor hooks, run with: python -m pytest thonny/host
+"""
+
+import hostenv
+hostenv.install()
+
+import ryb080i_simple
+from fakes import FakeUART
+from ryb080i_simple import SimpleBLE, AdvertisingSupervisor, ADV_OFF, ADV_ON
+
+def make_ble():
+    with hostenv.sim_time(ryb080i_simple):
+        return SimpleBLE(uart=FakeUART(b''))
+
+def test_supervisor_keeps_existing_response_callback():
+    ble = make_ble()
+    seen = []
+    ble.set_callback('response', lambda cmd_id, text: seen.append(text))
+    supervisor = AdvertisingSupervisor(ble)
+
+    ble.feed(b"+ADVEN=0\r\n")
+    assert seen == ["+ADVEN=0"]
+    assert supervisor.state == ADV_OFF
+
+    ble.feed(b"+ADVEN=1\r\n")
+    assert seen == ["+ADVEN=0", "+ADVEN=1"]
+    assert supervisor.state == ADV_ON
+
+def test_supervisor_still_runs_when_earlier_callback_raises():
+    ble = make_ble()
+
+    def broken(cmd_id, text):
+        raise ValueError(text)
+
+    ble.set_callback('response', broken)
+    supervisor = AdvertisingSupervisor(ble)
+    ble.feed(b"+ADVEN=1\r\n")
+    assert supervisor.state == ADV_ON
@@ -0,0 +1,9 @@
+"""
+SSD1306 flush path allocation bound, run with: python -m pytest thonny/host
+"""
+
+import bench_alloc
+
+def test_flush_path_stays_under_host_bound():
+    for name, used in bench_alloc.run().items():
+        assert used <= bench_alloc.HOST_PEAK_BYTES, name
@@ -0,0 +1,33 @@
+"""
+DeviceTable RSSI range checks, run with: python -m pytest thonny/host
+"""
+
+import hostenv
+hostenv.install()
+
+from device_table import DeviceTable
+from fakes import FakeUART
+from ryb080i_simple import SimpleBLE
+
+KEY = b"C8FD19A2B3E0"
+
+def table_after(rssi_text):
+    ble = SimpleBLE(uart=FakeUART(b''))
+    ble._parse_scan_result(b"+SCAN:0x" + KEY + b",PicoKey," + rssi_text)
+    table = DeviceTable(4, (KEY,))
+    table.update(ble._scan_record, now=0)
+    return table
+
+def test_rssi_minus_128_is_a_reading():
+    table = table_after(b"-128")
+    assert table.strongest_authorized(5000, now=0) == -128
+
+def test_rssi_below_signed_byte_is_stored():
+    table = table_after(b"-140")
+    assert table.count == 1
+    assert table.strongest_authorized(5000, now=0) == -140
+
+def test_far_key_stays_below_threshold():
+    import receiver
+    table = table_after(b"-150")
+    assert table.strongest_authorized(5000, now=0) < receiver.RSSI_THRESHOLD
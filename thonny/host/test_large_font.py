@@ -0,0 +1,35 @@
+"""
+Large font renderer against a per-pixel reference, run with: python -m pytest thonny/host
+"""
+
+import random
+
+import hostenv
+hostenv.install()
+
+from bench_large_font import naive_text
+from large_font import draw_text
+from machine import I2C
+from ssd1306 import SSD1306_I2C
+
+CHARS = "ABCXYZ019 !~\x01é"  # Includes characters outside the font
+
+def test_random_draws_match_pixel_reference():
+    fast = SSD1306_I2C(128, 64, I2C(0))
+    naive = SSD1306_I2C(128, 64, I2C(0))
+    random.seed(5)
+    for i in range(300):
+        # Odd runs draw over noise, so color 0 and OR-ing are both checked
+        start = bytes(random.getrandbits(8) for _ in range(1024)) if i % 2 else bytes(1024)
+        fast.buffer[:] = start
+        naive.buffer[:] = start
+        text = "".join(random.choice(CHARS) for _ in range(random.randint(0, 8)))
+        scale = random.randint(1, 6)
+        scale_y = random.choice((None, 1, 3, 5))
+        color = random.randint(0, 1)
+        # Positions past every edge exercise the clipping
+        x = random.randint(-40, 130)
+        y = random.randint(-40, 70)
+        draw_text(fast, text, x, y, scale, color, scale_y)
+        naive_text(naive, text, x, y, scale, color, scale_y)
+        assert fast.buffer == naive.buffer, (i, text, x, y, scale, scale_y, color)
@@ -0,0 +1,35 @@
+"""
+LoopProfiler report windows, run with: python -m pytest thonny/host
+"""
+
+import hostenv
+hostenv.install()
+
+import loop_profiler
+from loop_profiler import LoopProfiler
+
+def profiled_passes(clock, profiler, passes, stage_ms):
+    for _ in range(passes):
+        profiler.begin()
+        clock.sleep_ms(stage_ms)
+        profiler.mark(0)
+
+def test_report_starts_a_new_window(capsys):
+    with hostenv.sim_time(loop_profiler) as clock:
+        profiler = LoopProfiler(("scan",), enabled=True)
+        profiled_passes(clock, profiler, 5, 10)
+        assert profiler.stats()['stages']['scan']['count'] == 5
+        profiler.report()
+        assert "n=5" in capsys.readouterr().out
+        assert profiler.total_us[0] == 0
+        profiled_passes(clock, profiler, 3, 2)
+        st = profiler.stats()['stages']['scan']
+        assert st['count'] == 3
+        assert st['mean_us'] == 2000
+
+def test_report_can_keep_the_window():
+    with hostenv.sim_time(loop_profiler) as clock:
+        profiler = LoopProfiler(("scan",), enabled=True)
+        profiled_passes(clock, profiler, 4, 10)
+        profiler.report(reset=False)
+        assert profiler.stats()['stages']['scan']['count'] == 4
@@ -0,0 +1,38 @@
+"""
+MinimalOLED status screen against the old full redraw, run with: python -m pytest thonny/host
+"""
+
+import random
+
+import hostenv
+hostenv.install()
+
+from bench_oled import legacy_show_status
+from machine import I2C
+from oled_tools import MinimalOLED
+from ssd1306 import SSD1306_I2C
+
+STATUSES = ("SCAN", "LOCK", "UNLOCK", "ADVERTISING", "X")
+RSSIS = (None, -100, -101, -5, -55, -72, -120, 0, -99)
+
+def test_random_updates_match_full_redraw():
+    oled = MinimalOLED(i2c=I2C(0))
+    reference = SSD1306_I2C(128, 64, I2C(0))
+    random.seed(3)
+    for i in range(500):
+        status = random.choice(STATUSES)
+        rssi = random.choice(RSSIS)
+        oled.show_status(status, rssi)
+        legacy_show_status(reference, status, rssi)
+        assert oled.display.buffer == reference.buffer, (i, status, rssi)
+        assert oled.display._shadow == oled.display.buffer  # Everything reached the panel
+
+def test_invalidate_after_direct_drawing():
+    oled = MinimalOLED(i2c=I2C(0))
+    reference = SSD1306_I2C(128, 64, I2C(0))
+    oled.show_status("LOCK", -70)
+    oled.display.fill_rect(0, 20, 128, 20, 1)
+    oled.invalidate()
+    oled.show_status("LOCK", -70)
+    legacy_show_status(reference, "LOCK", -70)
+    assert oled.display.buffer == reference.buffer
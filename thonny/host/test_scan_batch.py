@@ -0,0 +1,46 @@
+"""
+Scan result delivery with a scan window, run with: python -m pytest thonny/host
+"""
+
+import hostenv
+hostenv.install()
+
+import ryb080i_simple
+from fakes import FakeUART
+from ryb080i_simple import SimpleBLE, SCAN_QUIET_MS
+
+KEY_LINE = b"+SCAN:0xC8FD19A2B3E0,PicoKey,%d\r\n"
+PHONE_LINE = b"+SCAN:0x5A0000000001,Phone,-70\r\n"
+
+def make_ble():
+    uart = FakeUART(b'')
+    ble = SimpleBLE(uart=uart)
+    delivered = []
+    ble.set_callback('scan_result',
+                     lambda devices: delivered.append([(d.name(), d.rssi) for d in devices]))
+    return ble, uart, delivered
+
+def test_first_sightings_are_delivered_with_their_chunk():
+    with hostenv.sim_time(ryb080i_simple):
+        ble, uart, delivered = make_ble()
+        uart.data += KEY_LINE % -60 + PHONE_LINE
+        ble.process_uart_data()
+        assert delivered == [[("PicoKey", -60), ("Phone", -70)]]
+
+def test_repeat_sightings_wait_for_the_quiet_gap():
+    with hostenv.sim_time(ryb080i_simple) as clock:
+        ble, uart, delivered = make_ble()
+        uart.data += KEY_LINE % -60
+        ble.process_uart_data()
+        uart.data += KEY_LINE % -65 + KEY_LINE % -50  # Weaker, then stronger
+        ble.process_uart_data()
+        assert len(delivered) == 1
+
+        clock.sleep_ms(SCAN_QUIET_MS)
+        ble.process_uart_data()
+        assert delivered[1:] == [[("PicoKey", -50)]]
+
+        # The window is closed, so the next report is a first sighting again
+        uart.data += KEY_LINE % -70
+        ble.process_uart_data()
+        assert delivered[2:] == [[("PicoKey", -70)]]
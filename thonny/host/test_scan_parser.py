@@ -0,0 +1,53 @@
+"""
+Scan line parsing in place, run with: python -m pytest thonny/host
+"""
+
+import random
+
+import hostenv
+hostenv.install()
+
+import ryb080i_simple
+from fakes import FakeUART
+from ryb080i_simple import ScanRecord, SimpleBLE
+
+LINE = b"+SCAN:0xC8FD19A2B3E4,PicoKey,-58"
+
+def make_ble():
+    with hostenv.sim_time(ryb080i_simple):
+        ble = SimpleBLE(uart=FakeUART(b''), scan_window_ms=0)
+    records = []
+    ble.set_callback('scan_result', lambda devices: records.append(
+        (devices[0].line, devices[0].address(), devices[0].rssi)))
+    return ble, records
+
+def test_name_contains_matches_upper_find():
+    random.seed(3)
+    record = ScanRecord()
+    letters = b"aAbBkKpP-_ 0{@`["
+    for _ in range(3000):
+        name = bytes(random.choice(letters) for _ in range(random.randint(0, 10)))
+        pattern = bytes(random.choice(letters) for _ in range(random.randint(0, 3))).upper()
+        record.line = b"+SCAN:0x01," + name + b",-50"
+        record.name_start = 11
+        record.name_end = 11 + len(name)
+        assert record.name_contains(pattern) == (name.upper().find(pattern) >= 0), (name, pattern)
+
+def test_whole_line_in_bytes_is_parsed_in_place():
+    ble, records = make_ble()
+    chunk = b"OK\r\n" + LINE + b"\r\n"
+    ble.feed(chunk)
+    line, address, rssi = records[0]
+    assert line is chunk
+    assert address == b"C8FD19A2B3E4"
+    assert rssi == -58
+
+def test_line_in_reused_buffer_is_copied():
+    ble, records = make_ble()
+    chunk = bytearray(LINE + b"\r\n")
+    ble.feed(chunk)
+    chunk[8:20] = b"000000000000"
+    line, address, rssi = records[0]
+    assert type(line) is bytes
+    assert address == b"C8FD19A2B3E4"
+    assert ble._scan_record.address() == b"C8FD19A2B3E4"
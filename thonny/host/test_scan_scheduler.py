@@ -0,0 +1,44 @@
+"""
+AdaptiveScanScheduler checks, run with: python -m pytest thonny/host
+"""
+
+import pytest
+
+import hostenv
+hostenv.install()
+
+import ryb080i_simple
+from fakes import FakeUART
+from ryb080i_simple import AdaptiveScanScheduler, SimpleBLE
+
+KEY_LINE = b"+SCAN:0xC8FD19A2B3E0,PicoKey,%d\r\n"
+
+def test_window_is_delivered_before_the_next_interval():
+    with hostenv.sim_time(ryb080i_simple) as clock:
+        uart = FakeUART(b'')
+        ble = SimpleBLE(uart=uart)
+        scheduler = AdaptiveScanScheduler(ble, -60, clock=clock)
+        ble.set_callback('scan_result',
+                         lambda devices: [scheduler.note_detection(d.rssi) for d in devices])
+
+        scheduler.trigger_scan()
+        uart.data += KEY_LINE % -40
+        ble.process_uart_data()
+        uart.data += KEY_LINE % -38  # Repeat sighting, waits in the window
+        ble.process_uart_data()
+        assert len(ble.scan_batch.updated) == 1
+
+        scheduler.trigger_scan()
+        # Key well above the threshold: base interval, still the first sighting
+        assert scheduler.interval_ms == scheduler.base_interval_ms
+        assert scheduler.detect_count == 1
+
+        # Nothing after the second scan: it counts as empty
+        scheduler.trigger_scan()
+        assert scheduler._last_empty_scan is not None
+
+def test_duty_cycle_must_be_a_fraction():
+    for duty_cycle in (0, -0.5, 1.5):
+        with pytest.raises(ValueError):
+            AdaptiveScanScheduler(None, -60, duty_cycle=duty_cycle)
+    assert AdaptiveScanScheduler(None, -60, duty_cycle=1).min_interval_ms == 1000
@@ -0,0 +1,128 @@
+"""
+SSD1306 flush and I2C link checks on a panel RAM model, run with: python -m pytest thonny/host
+"""
+
+import random
+
+import pytest
+
+import hostenv
+hostenv.install()
+
+import ssd1306
+from fakes import FlakyI2C, PanelI2C
+from ssd1306 import (SSD1306_I2C, I2CLink, LINK_LEVELS, LINK_PROBE_CLEAN, LINK_RETRIES,
+                     LINK_START_LEVEL, LINK_WINDOW)
+
+FREQ = 400000
+
+def random_shapes(display):
+    for _ in range(random.randint(1, 5)):
+        display.fill_rect(random.randint(0, 127), random.randint(0, 63),
+                          random.randint(1, 40), random.randint(1, 20), random.randint(0, 1))
+
+@pytest.mark.parametrize("safe", (False, True))
+def test_incremental_flush_ends_on_latest_commit(safe):
+    panel = PanelI2C()
+    display = SSD1306_I2C(128, 64, panel)
+    if safe:
+        display.enable_safe_mode()
+    committed = [bytes(display.buffer)]
+    random.seed(2)
+    for i in range(400):
+        action = random.random()
+        if action < 0.3:
+            random_shapes(display)
+        elif action < 0.45:
+            if random.random() < 0.1:
+                display.invalidate()
+            display.commit()
+            committed.append(bytes(display.buffer))
+        elif display.flush_step(random.randint(1, 3)):
+            # Idle: the panel shows the latest commit, never a mix
+            assert panel.ram == committed[-1], i
+
+    display.commit()
+    display.flush()
+    assert panel.ram == display.buffer
+    assert display.frames_flushed > 0
+
+def test_show_cancels_incremental_flush():
+    panel = PanelI2C()
+    display = SSD1306_I2C(128, 64, panel)
+    display.fill(1)
+    display.commit()
+    display.flush_step()
+    display.fill_rect(0, 0, 64, 32, 0)
+    display.show()
+    assert not display.flushing()
+    assert panel.ram == display.buffer
+
+def make_link(level=LINK_START_LEVEL):
+    bus = FlakyI2C()
+    clocks = []
+
+    def set_freq(hz):
+        bus.freq = hz
+        clocks.append(hz)
+        return bus
+
+    return I2CLink(bus, 0x3C, FREQ, set_freq, level), bus, clocks
+
+def test_link_steps_down_through_every_level_on_errors():
+    with hostenv.sim_time(ssd1306):
+        link, bus, clocks = make_link()
+        bus.failing = True
+        levels = [link.level]
+        for _ in range(40):
+            assert not link.write([b"\x40", bytes(16)], 16)
+            if link.level != levels[-1]:
+                levels.append(link.level)
+        assert levels == list(range(LINK_START_LEVEL, len(LINK_LEVELS)))
+        chunk, delay, div = LINK_LEVELS[-1]
+        assert (link.chunk_size, link.delay_us) == (chunk, delay)
+        assert bus.freq == FREQ // div
+        assert clocks == [FREQ // LINK_LEVELS[4][2], FREQ // div]
+        assert link.failures == 40
+        assert link.retries == 40 * (LINK_RETRIES - 1)
+
+def test_link_recovers_to_the_fastest_level():
+    with hostenv.sim_time(ssd1306):
+        link, bus, clocks = make_link(len(LINK_LEVELS) - 1)
+        for _ in range(len(LINK_LEVELS) * (LINK_PROBE_CLEAN + LINK_WINDOW)):
+            assert link.write([b"\x40", bytes(16)], 16)
+        assert link.level == 0
+        assert bus.freq == FREQ
+        assert clocks == [FREQ // LINK_LEVELS[-1][2], FREQ // LINK_LEVELS[4][2], FREQ]
+        assert link.stats()['errors'] == 0
+
+def test_failed_probe_backs_off():
+    with hostenv.sim_time(ssd1306):
+        link, bus, clocks = make_link(2)
+        for _ in range(LINK_PROBE_CLEAN):
+            link.write([b"\x40"], 0)
+        assert link.level == 1  # Probing one level up
+        bus.failing = True
+        link.write([b"\x40"], 0)
+        bus.failing = False
+        assert link.level == 2
+        # The next probe needs twice the clean run
+        for _ in range(LINK_PROBE_CLEAN):
+            link.write([b"\x40"], 0)
+        assert link.level == 2
+        for _ in range(LINK_PROBE_CLEAN):
+            link.write([b"\x40"], 0)
+        assert link.level == 1
+
+def test_lost_transfer_forces_full_refresh():
+    with hostenv.sim_time(ssd1306):
+        bus = FlakyI2C()
+        display = SSD1306_I2C(128, 64, bus)
+        display.fill(1)
+        bus.failing = True
+        display.show()
+        bus.failing = False
+        assert display._full_refresh  # Panel RAM is unknown after the lost data
+        sent = bus.transactions
+        display.show()
+        assert bus.transactions - sent >= 1024 // display.link.chunk_size
@@ -0,0 +1,84 @@
+"""
+SimpleBLE line assembly, run with: python -m pytest thonny/host
+"""
+
+import pytest
+
+import hostenv
+hostenv.install()
+
+import ryb080i_simple
+from fakes import FakeUART
+from ryb080i_simple import SimpleBLE, MAX_LINE_LEN
+
+class LineBLE(SimpleBLE):
+    """Records the assembled lines instead of processing them"""
+
+    def _process_line(self, line, start=0, end=None):
+        self.lines.append(line[start:end])
+
+def make_ble(data=b''):
+    with hostenv.sim_time(ryb080i_simple):
+        ble = LineBLE(uart=FakeUART(data), scan_window_ms=0)
+    ble.lines = []
+    return ble
+
+# bytes and bytearray search in C, memoryview takes the per-byte loop
+@pytest.fixture(params=(bytes, bytearray, memoryview))
+def wrap(request):
+    return request.param
+
+def test_line_split_across_reads(wrap):
+    ble = make_ble()
+    ble.feed(wrap(b"+SCAN:0xC8FD19A2B3E0,Pico"))
+    assert ble.lines == []
+    ble.feed(wrap(b"Key,-50\r"))
+    ble.feed(wrap(b"\nOK\r\n"))
+    assert ble.lines == [b"+SCAN:0xC8FD19A2B3E0,PicoKey,-50", b"OK"]
+
+def test_several_lines_in_one_chunk(wrap):
+    ble = make_ble()
+    ble.feed(wrap(b"OK\r\n\r\n  +ADVEN=1 \r\nERROR\r\n+SCAN"))
+    assert ble.lines == [b"OK", b"+ADVEN=1", b"ERROR"]
+    ble.feed(wrap(b":0x01,A,-1\r\n"))
+    assert ble.lines[-1] == b"+SCAN:0x01,A,-1"
+
+def test_only_count_bytes_are_used(wrap):
+    ble = make_ble()
+    ble.feed(wrap(b"OK\r\nstale bytes\r\n"), 4)
+    assert ble.lines == [b"OK"]
+    assert ble._line_len == 0
+
+def test_long_line_in_one_chunk_is_dropped(wrap):
+    ble = make_ble()
+    long_line = b"X" * (MAX_LINE_LEN + 1)
+    ble.feed(wrap(b"OK\r\n" + long_line + b"\nREADY\r\n"))
+    assert ble.lines == [b"OK", b"READY"]
+    assert ble.rx_overflow == len(long_line)
+
+def test_long_line_across_reads_is_dropped_up_to_newline(wrap):
+    ble = make_ble()
+    ble.feed(wrap(b"Y" * 100))
+    ble.feed(wrap(b"Y" * 100))  # Over MAX_LINE_LEN: dropped from here on
+    ble.feed(wrap(b"Y" * 50 + b"\r\nOK\r\n"))
+    assert ble.lines == [b"OK"]
+    assert ble.rx_overflow == 251
+    assert not ble._line_overflow
+
+def test_line_of_max_length_is_kept(wrap):
+    ble = make_ble()
+    line = b"Z" * MAX_LINE_LEN
+    ble.feed(wrap(line[:60]))
+    ble.feed(wrap(line[60:] + b"\n"))
+    assert ble.lines == [line]
+    assert ble.rx_overflow == 0
+
+@pytest.mark.parametrize("rx_find", (True, False))
+def test_process_uart_data_read_paths(rx_find):
+    burst = b"".join(b"+SCAN:0x%012X,Dev,-60\r\n" % i for i in range(40))
+    ble = make_ble(burst)
+    ble._rx_find = rx_find  # False: the MicroPython read() path
+    ble.uart.chunk = 37     # Lines straddle reads
+    ble.process_uart_data()
+    assert len(ble.lines) == 40
+    assert ble.lines[-1] == b"+SCAN:0x000000000027,Dev,-60"
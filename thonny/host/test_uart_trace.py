@@ -0,0 +1,29 @@
+"""
+UART trace replay cleanup, run with: python -m pytest thonny/host
+"""
+
+import os
+
+import pytest
+
+import hostenv
+hostenv.install()
+
+import ryb080i_simple
+import uart_trace
+
+TRACE_FILE = os.path.join(hostenv.HOST_DIR, "traces", "crowd_scan.utr")
+
+def test_constructor_error_propagates_and_restores_clock():
+    saved = ryb080i_simple.time
+    with pytest.raises(TypeError):
+        uart_trace.replay(TRACE_FILE, no_such_arg=1)
+    assert ryb080i_simple.time is saved
+
+def test_bad_trace_restores_clock(tmp_path):
+    path = tmp_path / "bad.utr"
+    path.write_bytes(b"not a trace")
+    saved = ryb080i_simple.time
+    with pytest.raises(ValueError):
+        uart_trace.replay(str(path))
+    assert ryb080i_simple.time is saved
@@ -0,0 +1,114 @@
+"""
+RYB080I Baud Negotiation - Run the module UART as fast as it reliably works
+"""
+
+import time
+from ryb080i_simple import CMD_OK, DEFAULT_BAUD, PRIO_CONFIG
+
+# Last negotiated rate, tried first at boot
+BAUD_FILE = "ble_baud.txt"
+
+# Candidate rates, fastest first
+BAUD_RATES = (115200, 57600, 38400, 19200, 9600)
+
+PROBE_TIMEOUT_MS = 200  # Reply time allowed for AT while detecting
+VERIFY_COUNT = 3        # AT echoes that must all pass at a new rate
+SWITCH_RETRIES = 3      # Attempts at the command that moves the module back
+
+def _read_cached():
+    try:
+        with open(BAUD_FILE) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def _write_cached(rate):
+    try:
+        with open(BAUD_FILE, "w") as f:
+            f.write(str(rate))
+    except OSError as e:
+        print(f"Baud cache write failed: {e}")
+
+def clear_cache():
+    """Detect from the power-on rate on the next run"""
+    _write_cached("")
+
+def _command(ble, command, timeout_ms):
+    cmd_id = ble.send_command_async(command, timeout_ms, PRIO_CONFIG)
+    return ble.wait_command(cmd_id)
+
+def _echo(ble, count=1, timeout_ms=PROBE_TIMEOUT_MS):
+    """True if the module answers AT with OK count times in a row"""
+    for _ in range(count):
+        if _command(ble, "AT", timeout_ms)['status'] != CMD_OK:
+            return False
+    return True
+
+def detect(ble, rates=BAUD_RATES, first=None):
+    """Find the rate the module is on (trying first, then the power-on rate), or None"""
+    order = [r for r in (first, DEFAULT_BAUD) if r]
+    order += [r for r in rates if r not in order]
+    for rate in order:
+        ble.set_baudrate(rate)
+        if _echo(ble):
+            return rate
+    return None
+
+def resume(ble, rates=BAUD_RATES):
+    """Put the UART on the module's current rate (cached one first), returns it or None"""
+    rate = detect(ble, rates, _read_cached())
+    if rate is None:
+        ble.set_baudrate(DEFAULT_BAUD)
+    return rate
+
+def _switch(ble, rate, timeout_ms):
+    """Move module and UART to rate, True once verified by echo"""
+    old = ble.baudrate
+    if _command(ble, f"AT+BAUD={rate}", timeout_ms)['status'] != CMD_OK:
+        return False  # Module refused, still on the old rate
+    ble.set_baudrate(rate)
+    if _echo(ble, VERIFY_COUNT):
+        return True
+
+    # Unreliable: ask the module to go back, from the new rate
+    for _ in range(SWITCH_RETRIES):
+        if _command(ble, f"AT+BAUD={old}", timeout_ms)['status'] == CMD_OK:
+            break
+    ble.set_baudrate(old)
+    return False
+
+def negotiate(ble, rates=BAUD_RATES, use_cache=True, timeout_ms=PROBE_TIMEOUT_MS):
+    """Detect the module rate and move to the fastest one that passes the echo test"""
+    start = time.ticks_ms()
+    cached = _read_cached() if use_cache else None
+    report = {'ok': True, 'cached': False, 'from': None, 'baudrate': None,
+              'tried': [], 'time_ms': 0}
+
+    current = detect(ble, rates, cached)
+    report['from'] = current
+    if current is None:
+        # Module silent at every rate: leave the UART at the power-on rate
+        ble.set_baudrate(DEFAULT_BAUD)
+        report['ok'] = False
+    elif current == cached:
+        report['cached'] = True  # Negotiated on an earlier boot
+    else:
+        for rate in rates:
+            if rate <= current:
+                break
+            report['tried'].append(rate)
+            if _switch(ble, rate, timeout_ms):
+                break
+            if not _echo(ble):
+                # Lost the module while falling back, find it again
+                if detect(ble, rates, current) is None:
+                    report['ok'] = False
+                    break
+        if report['ok'] and not _echo(ble, VERIFY_COUNT):
+            report['ok'] = False  # Ended up on a rate that drops lines, don't keep it
+
+    report['baudrate'] = ble.baudrate
+    if report['ok'] and ble.baudrate != cached:
+        _write_cached(ble.baudrate)
+    report['time_ms'] = time.ticks_diff(time.ticks_ms(), start)
+    return report
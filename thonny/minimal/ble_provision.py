@@ -0,0 +1,92 @@
+"""
+RYB080I Provisioning - Apply a settings profile only when needed
+"""
+
+import time
+from ryb080i_simple import CMD_OK, PRIO_CONFIG
+
+# Fingerprint of the last fully applied profile
+PROFILE_FILE = "ble_profile.txt"
+
+# Settings per role: (AT command name, value)
+RECEIVER_PROFILE = (
+    ("NAME", "PicoLock"),
+    ("CRFOP", "C"),  # Max power
+    ("CNE", "1"),    # Enable connections
+    ("CFUN", "1"),   # Enable BLE
+)
+
+TRANSMITTER_PROFILE = (
+    ("NAME", "PicoKey"),
+    ("CRFOP", "C"),  # Max power
+    ("CFUN", "1"),   # Enable BLE
+)
+
+def fingerprint(profile):
+    """FNV-1a hash of the profile as 8 hex digits"""
+    h = 0x811C9DC5
+    for key, value in profile:
+        for byte in f"{key}={value};".encode():
+            h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return "%08x" % h
+
+def _read_cached():
+    try:
+        with open(PROFILE_FILE) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_cached(value):
+    try:
+        with open(PROFILE_FILE, "w") as f:
+            f.write(value)
+    except OSError as e:
+        print(f"Profile cache write failed: {e}")
+
+def clear_cache():
+    """Force full provisioning on the next run"""
+    _write_cached("")
+
+def _command(ble, command, timeout_ms):
+    cmd_id = ble.send_command_async(command, timeout_ms, PRIO_CONFIG)
+    return ble.wait_command(cmd_id)
+
+def query(ble, key, timeout_ms=1000):
+    """Current value of a setting, or None if the module doesn't report it"""
+    result = _command(ble, f"AT+{key}?", timeout_ms)
+    response = result['response']
+    if result['status'] != CMD_OK or not response:
+        return None
+
+    # Replies look like '+NAME=PicoKey' (some firmware uses ':')
+    for sep in "=:":
+        pos = response.find(sep)
+        if pos >= 0:
+            return response[pos + 1:].strip()
+    return response.strip()
+
+def provision(ble, profile, use_cache=True, timeout_ms=1000):
+    """Bring the module to the profile, sending only settings that differ"""
+    start = time.ticks_ms()
+    fp = fingerprint(profile)
+    report = {'ok': True, 'cached': False, 'applied': 0, 'time_ms': 0}
+
+    if use_cache and _read_cached() == fp:
+        report['cached'] = True
+    else:
+        for key, value in profile:
+            if query(ble, key, timeout_ms) == value:
+                continue
+            result = _command(ble, f"AT+{key}={value}", timeout_ms)
+            if result['status'] == CMD_OK:
+                report['applied'] += 1
+            else:
+                print(f"AT+{key}={value}: no OK (status {result['status']})")
+                report['ok'] = False
+
+        if report['ok']:
+            _write_cached(fp)
+
+    report['time_ms'] = time.ticks_diff(time.ticks_ms(), start)
+    return report
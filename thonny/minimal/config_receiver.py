@@ -3,44 +3,41 @@ BLE Door Lock Receiver - Minimal Configuration
 """
 
 import time
-import machine
 from ryb080i_simple import SimpleBLE
+from ble_baud import resume
+from ble_provision import provision, RECEIVER_PROFILE
 
 class MinimalBLESetup:
     def __init__(self):
         self.ble = SimpleBLE()
         self.ble.set_debug(False)
     
-    def send_command(self, command, timeout=3000):
-        """Send command and wait for response"""
-        self.ble.send_command_async(command)
-        
-        start = time.ticks_ms()
-        while time.ticks_diff(time.ticks_ms(), start) < timeout:
-            self.ble.process_uart_data()
-            self.ble.process_command_queue()
-            time.sleep(0.1)
-        
-        return True
-    
     def configure(self):
         """Configure BLE module as receiver"""
         print("Configuring BLE receiver...")
         
-        # Basic settings
-        self.send_command("AT+NAME=PicoLock")
-        self.send_command("AT+CRFOP=C")  # Max power
-        self.send_command("AT+CNE=1")    # Enable connections
+        # The receiver may have moved the module off 9600 baud
+        rate = resume(self.ble)
+        if rate is None:
+            print("Module not answering at any baud rate")
+            return False
+        print(f"UART: {rate} baud")
         
-        # Reset detection
-        time.sleep(2)
+        # Query the module and apply only the settings that differ
+        report = provision(self.ble, RECEIVER_PROFILE, use_cache=False)
+        ok = report['ok']
+        print(f"Provisioning: {report['time_ms']} ms, {report['applied']} settings applied")
         
-        # Enable BLE
-        self.send_command("AT+CFUN=1")
-        time.sleep(1)
+        # What the next boot does: find the rate (cached one first) and check the settings
+        if ok:
+            start = time.ticks_ms()
+            rate = resume(self.ble)
+            warm = provision(self.ble, RECEIVER_PROFILE)
+            ready_ms = time.ticks_diff(time.ticks_ms(), start)
+            print(f"Warm boot to ready: {ready_ms} ms (AT answered at {rate} baud, settings cached: {warm['cached']})")
         
-        print("Configuration complete")
-        return True
+        print("Configuration complete" if ok else "Configuration incomplete")
+        return ok
 
 def main():
     print("BLE Receiver Configuration")
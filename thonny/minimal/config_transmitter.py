@@ -4,37 +4,40 @@ BLE Key Fob Transmitter - Minimal Configuration
 
 import time
 from ryb080i_simple import SimpleBLE
+from ble_baud import resume
+from ble_provision import provision, TRANSMITTER_PROFILE
 
 class MinimalTransmitterSetup:
     def __init__(self):
         self.ble = SimpleBLE()
         self.ble.set_debug(False)
     
-    def send_command(self, command, timeout=3000):
-        """Send command and wait"""
-        self.ble.send_command_async(command)
-        
-        start = time.ticks_ms()
-        while time.ticks_diff(time.ticks_ms(), start) < timeout:
-            self.ble.process_uart_data()
-            self.ble.process_command_queue()
-            time.sleep(0.1)
-        
-        return True
-    
     def configure(self):
         """Configure BLE module as transmitter (key)"""
         print("Configuring BLE transmitter...")
         
-        # Basic settings
-        self.send_command("AT+NAME=PicoKey")
-        self.send_command("AT+CRFOP=C")    # Max power
-        self.send_command("AT+CFUN=1")     # Enable BLE
+        # Normally 9600 here, but probe in case the module was left on another rate
+        rate = resume(self.ble)
+        if rate is None:
+            print("Module not answering at any baud rate")
+            return False
+        print(f"UART: {rate} baud")
+        
+        # Query the module and apply only the settings that differ
+        report = provision(self.ble, TRANSMITTER_PROFILE, use_cache=False)
+        ok = report['ok']
+        print(f"Provisioning: {report['time_ms']} ms, {report['applied']} settings applied")
         
-        time.sleep(1)
+        # What the next boot does: find the rate (cached one first) and check the settings
+        if ok:
+            start = time.ticks_ms()
+            rate = resume(self.ble)
+            warm = provision(self.ble, TRANSMITTER_PROFILE)
+            ready_ms = time.ticks_diff(time.ticks_ms(), start)
+            print(f"Warm boot to ready: {ready_ms} ms (AT answered at {rate} baud, settings cached: {warm['cached']})")
         
-        print("Configuration complete")
-        return True
+        print("Configuration complete" if ok else "Configuration incomplete")
+        return ok
 
 def main():
     print("BLE Transmitter (Key) Configuration")
@@ -0,0 +1,100 @@
+"""
+BLE Device Table - Fixed-size per-device RSSI tracking
+"""
+
+import time
+from array import array
+from micropython import const
+
+DEFAULT_CAPACITY = const(32)
+NO_RSSI = const(-32768)  # Below any reading parse_rssi returns
+
+class DeviceTable:
+    """Preallocated table of seen devices, keyed by scan address
+
+    Memory is fixed by capacity. When full, the least recently seen
+    device is replaced, keeping authorized keys while others remain.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, authorized=(), name_patterns=()):
+        self.capacity = capacity
+        self.rssi = array('h', [NO_RSSI] * capacity)
+        self.last_seen = array('L', [0] * capacity)  # ticks_ms
+        self.authorized = bytearray(capacity)        # 1 = key allowed to unlock
+        self.addresses = [None] * capacity
+        self._index = {}        # address bytes -> slot
+        self._auth_slots = []   # slots of authorized devices
+        self._allowed = set(addr.upper() for addr in authorized)
+        self._name_patterns = name_patterns  # Upper-case bytes, matched by ScanRecord.name_contains
+        self.count = 0
+        self.evictions = 0
+
+    def _allocate(self, now):
+        """Free slot, or the least recently seen one when full"""
+        if self.count < self.capacity:
+            slot = self.count
+            self.count += 1
+            return slot
+
+        last_seen = self.last_seen
+        authorized = self.authorized
+        slot = -1
+        oldest = -1
+        for i in range(self.capacity):
+            age = time.ticks_diff(now, last_seen[i])
+            if age > oldest and not authorized[i]:
+                oldest = age
+                slot = i
+        if slot < 0:
+            slot = self._auth_slots[0]  # Only keys left, drop the earliest added
+
+        del self._index[self.addresses[slot]]
+        if self.authorized[slot]:
+            self._auth_slots.remove(slot)
+        self.evictions += 1
+        return slot
+
+    def _is_allowed(self, address, record):
+        if address.upper() in self._allowed:
+            return True
+        for pattern in self._name_patterns:
+            if record.name_contains(pattern):
+                return True
+        return False
+
+    def update(self, record, now=None):
+        """Store a ScanRecord's RSSI, returns the device slot"""
+        if now is None:
+            now = time.ticks_ms()
+        address = record.address()
+        slot = self._index.get(address)
+
+        if slot is None:
+            slot = self._allocate(now)
+            self._index[address] = slot
+            self.addresses[slot] = address
+            allowed = self._is_allowed(address, record)
+            self.authorized[slot] = 1 if allowed else 0
+            if allowed:
+                self._auth_slots.append(slot)
+
+        if record.rssi is not None:
+            self.rssi[slot] = record.rssi
+        self.last_seen[slot] = now
+        return slot
+
+    def is_authorized(self, slot):
+        return self.authorized[slot] == 1
+
+    def strongest_authorized(self, timeout_ms, now=None):
+        """Best RSSI among authorized devices seen within timeout_ms, or None"""
+        if now is None:
+            now = time.ticks_ms()
+        best = None
+        for slot in self._auth_slots:
+            rssi = self.rssi[slot]
+            if rssi == NO_RSSI or time.ticks_diff(now, self.last_seen[slot]) > timeout_ms:
+                continue
+            if best is None or rssi > best:
+                best = rssi
+        return best
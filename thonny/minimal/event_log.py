@@ -0,0 +1,175 @@
+"""
+Event Log - Fixed-size binary records in a ring of flash files
+
+Records are collected in a RAM page and appended to the current file one
+page at a time. When a file is full the next one in the ring is started
+over, so flash use is bounded and writes are spread over the files.
+
+File: header record (EVENT_MAGIC, sequence, record size, page size),
+then records of RECORD_FORMAT:
+    time_s, ticks_ms, event, state, previous state, rssi, value
+"""
+
+import os
+import struct
+import time
+from micropython import const
+
+EVENT_MAGIC = b"EVL1"
+HEADER_FORMAT = "<4sIHHI"
+RECORD_FORMAT = "<IIBBBbi"
+RECORD_SIZE = const(16)
+PAGE_SIZE = const(256)        # Flash page, 16 records per write
+LOG_PREFIX = "events"         # Files events0.bin ... eventsN.bin
+LOG_FILES = const(4)
+LOG_FILE_SIZE = const(32768)  # Per file, the ring holds LOG_FILES times this
+FLUSH_AGE_MS = const(300000)  # Write a partial page after this long
+
+# Event types
+EV_BOOT = const(0)
+EV_STATE = const(1)     # State change, value = ms spent in the previous state
+EV_LATENCY = const(2)   # Unlock, value = us from the scan result to the state change
+EV_RSSI = const(3)      # RSSI history, rssi = strongest in the interval, value = detections
+EV_ERROR = const(4)     # value = error code
+
+EVENT_NAMES = ("boot", "state", "latency", "rssi", "error")
+NO_RSSI = const(-128)
+
+class EventLog:
+    """Append-only event log, buffered in RAM and written page by page
+
+    log() only packs the record into the page buffer; the write happens
+    when the page is full, or from service() once it is FLUSH_AGE_MS old.
+    """
+
+    def __init__(self, prefix=LOG_PREFIX, files=LOG_FILES, file_size=LOG_FILE_SIZE,
+                 page_size=PAGE_SIZE, flush_age_ms=FLUSH_AGE_MS):
+        self.prefix = prefix
+        self.files = files
+        self.file_size = file_size
+        self.flush_age_ms = flush_age_ms
+        self._page = bytearray(page_size - page_size % RECORD_SIZE)
+        self._view = memoryview(self._page)
+        self._len = 0
+        self._page_start = 0   # ticks_ms of the first record in the page
+        # Statistics
+        self.records = 0
+        self.pages_written = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+        self.max_write_us = 0
+        self._open_ring()
+
+    def path(self, index):
+        return f"{self.prefix}{index}.bin"
+
+    def _read_sequence(self, index):
+        """Sequence number from a file header, -1 if missing or foreign"""
+        try:
+            with open(self.path(index), "rb") as f:
+                header = f.read(RECORD_SIZE)
+        except OSError:
+            return -1
+        if len(header) < RECORD_SIZE:
+            return -1
+        magic, seq, record_size, page_size, _ = struct.unpack_from(HEADER_FORMAT, header)
+        if magic != EVENT_MAGIC or record_size != RECORD_SIZE:
+            return -1
+        return seq
+
+    def _open_ring(self):
+        """Continue the newest file, or start the ring"""
+        self._index = 0
+        self._seq = -1
+        for i in range(self.files):
+            seq = self._read_sequence(i)
+            if seq > self._seq:
+                self._index = i
+                self._seq = seq
+        if self._seq < 0:
+            self._start_file(0, 0)
+            return
+        try:
+            self._size = os.stat(self.path(self._index))[6]
+        except OSError:
+            self._size = self.file_size
+        # A partial record at the end (reset during a write) would shift the rest
+        if self._size % RECORD_SIZE or self._size >= self.file_size:
+            self._next_file()
+
+    def _start_file(self, index, seq):
+        self._index = index
+        self._seq = seq
+        self._size = RECORD_SIZE
+        header = bytearray(RECORD_SIZE)
+        struct.pack_into(HEADER_FORMAT, header, 0, EVENT_MAGIC, seq, RECORD_SIZE, len(self._page), 0)
+        try:
+            with open(self.path(index), "wb") as f:
+                f.write(header)
+        except OSError:
+            self.write_errors += 1
+
+    def _next_file(self):
+        self._start_file((self._index + 1) % self.files, self._seq + 1)
+
+    def log(self, event, state=0, previous=0, rssi=NO_RSSI, value=0):
+        """Add a record (no allocation, no flash access unless the page fills)"""
+        if rssi is None:
+            rssi = NO_RSSI
+        elif rssi <= NO_RSSI:
+            rssi = NO_RSSI + 1  # Signed byte field, -150 dBm readings log as -127
+        if self._len == 0:
+            self._page_start = time.ticks_ms()
+        struct.pack_into(RECORD_FORMAT, self._page, self._len, int(time.time()) & 0xFFFFFFFF,
+                         time.ticks_ms(), event, state, previous, rssi, value)
+        self._len += RECORD_SIZE
+        self.records += 1
+        if self._len >= len(self._page):
+            self.flush()
+
+    def service(self):
+        """Write a partial page once it is old enough, call from the main loop"""
+        if self._len and time.ticks_diff(time.ticks_ms(), self._page_start) >= self.flush_age_ms:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered records to the current file"""
+        size = self._len
+        if not size:
+            return
+        self._len = 0
+        if self._size + size > self.file_size:
+            self._next_file()
+
+        start = time.ticks_us()
+        try:
+            with open(self.path(self._index), "ab") as f:
+                f.write(self._view[:size])
+            self._size += size
+            self.pages_written += 1
+            self.bytes_written += size
+        except OSError:
+            self.write_errors += 1  # Dropped, the loop must not stall on flash
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        if elapsed > self.max_write_us:
+            self.max_write_us = elapsed
+
+def read_records(paths):
+    """Yield (sequence, record tuple) from log files, oldest file first"""
+    files = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        if len(data) < RECORD_SIZE:
+            continue
+        magic, seq, record_size, page_size, _ = struct.unpack_from(HEADER_FORMAT, data)
+        if magic == EVENT_MAGIC and record_size == RECORD_SIZE:
+            files.append((seq, data))
+    files.sort()
+
+    for seq, data in files:
+        for pos in range(RECORD_SIZE, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+            yield seq, struct.unpack_from(RECORD_FORMAT, data, pos)
@@ -0,0 +1,133 @@
+"""
+Large Font - Scaled 5x7 text written straight into a MONO_VLSB buffer
+"""
+
+from micropython import const
+
+GLYPH_WIDTH = const(5)
+GLYPH_HEIGHT = const(7)
+FIRST_CHAR = const(32)
+LAST_CHAR = const(126)
+
+# Packed 5x7 glyphs for ASCII 32..126: 5 column bytes each, LSB at the top
+FONT = (
+    b"\x00\x00\x00\x00\x00\x00\x00\x5f\x00\x00\x00\x07\x00\x07\x00\x14\x7f\x14\x7f\x14"  #  !"#
+    b"\x24\x2a\x7f\x2a\x12\x23\x13\x08\x64\x62\x36\x49\x56\x20\x50\x00\x08\x07\x03\x00"  # $%&'
+    b"\x00\x1c\x22\x41\x00\x00\x41\x22\x1c\x00\x2a\x1c\x7f\x1c\x2a\x08\x08\x3e\x08\x08"  # ()*+
+    b"\x00\x80\x70\x30\x00\x08\x08\x08\x08\x08\x00\x00\x60\x60\x00\x20\x10\x08\x04\x02"  # ,-./
+    b"\x3e\x51\x49\x45\x3e\x00\x42\x7f\x40\x00\x72\x49\x49\x49\x46\x21\x41\x49\x4d\x33"  # 0123
+    b"\x18\x14\x12\x7f\x10\x27\x45\x45\x45\x39\x3c\x4a\x49\x49\x31\x41\x21\x11\x09\x07"  # 4567
+    b"\x36\x49\x49\x49\x36\x46\x49\x49\x29\x1e\x00\x00\x14\x00\x00\x00\x40\x34\x00\x00"  # 89:;
+    b"\x00\x08\x14\x22\x41\x14\x14\x14\x14\x14\x00\x41\x22\x14\x08\x02\x01\x59\x09\x06"  # <=>?
+    b"\x3e\x41\x5d\x59\x4e\x7c\x12\x11\x12\x7c\x7f\x49\x49\x49\x36\x3e\x41\x41\x41\x22"  # @ABC
+    b"\x7f\x41\x41\x22\x1c\x7f\x49\x49\x49\x41\x7f\x09\x09\x09\x01\x3e\x41\x49\x49\x7a"  # DEFG
+    b"\x7f\x08\x08\x08\x7f\x00\x41\x7f\x41\x00\x20\x40\x41\x3f\x01\x7f\x08\x14\x22\x41"  # HIJK
+    b"\x7f\x40\x40\x40\x40\x7f\x02\x0c\x02\x7f\x7f\x04\x08\x10\x7f\x3e\x41\x41\x41\x3e"  # LMNO
+    b"\x7f\x09\x09\x09\x06\x3e\x41\x51\x21\x5e\x7f\x09\x19\x29\x46\x26\x49\x49\x49\x32"  # PQRS
+    b"\x01\x01\x7f\x01\x01\x3f\x40\x40\x40\x3f\x1f\x20\x40\x20\x1f\x3f\x40\x38\x40\x3f"  # TUVW
+    b"\x63\x14\x08\x14\x63\x07\x08\x70\x08\x07\x61\x51\x49\x45\x43\x00\x7f\x41\x41\x41"  # XYZ[
+    b"\x02\x04\x08\x10\x20\x00\x41\x41\x41\x7f\x04\x02\x01\x02\x04\x40\x40\x40\x40\x40"  # \]^_
+    b"\x00\x03\x07\x08\x00\x20\x54\x54\x54\x78\x7f\x48\x44\x44\x38\x38\x44\x44\x44\x20"  # `abc
+    b"\x38\x44\x44\x48\x7f\x38\x54\x54\x54\x18\x08\x7e\x09\x01\x02\x0c\x52\x52\x52\x3e"  # defg
+    b"\x7f\x08\x04\x04\x78\x00\x44\x7d\x40\x00\x20\x40\x44\x3d\x00\x7f\x10\x28\x44\x00"  # hijk
+    b"\x00\x41\x7f\x40\x00\x7c\x04\x18\x04\x78\x7c\x08\x04\x04\x78\x38\x44\x44\x44\x38"  # lmno
+    b"\x7c\x14\x14\x14\x08\x08\x14\x14\x18\x7c\x7c\x08\x04\x04\x08\x48\x54\x54\x54\x20"  # pqrs
+    b"\x04\x3f\x44\x40\x20\x3c\x40\x40\x20\x7c\x1c\x20\x40\x20\x1c\x3c\x40\x30\x40\x3c"  # tuvw
+    b"\x44\x28\x10\x28\x44\x0c\x50\x50\x50\x3c\x44\x64\x54\x4c\x44\x00\x08\x36\x41\x00"  # xyz{
+    b"\x00\x00\x77\x00\x00\x00\x41\x36\x08\x00\x02\x01\x02\x04\x02"  # |}~
+)
+
+def gap(scale):
+    """Pixels between characters at a scale"""
+    return (scale + 1) // 2
+
+def text_width(text, scale=1):
+    n = len(text)
+    return n * (GLYPH_WIDTH * scale + gap(scale)) - gap(scale) if n else 0
+
+def fit_scale(text, width, height, max_scale=8):
+    """Largest scale at which text fits in width x height (at least 1)"""
+    scale = max_scale
+    while scale > 1 and (text_width(text, scale) > width or GLYPH_HEIGHT * scale > height):
+        scale -= 1
+    return scale
+
+def _stretch(bits, scale):
+    """Glyph column bits with every bit repeated scale times"""
+    if scale == 1:
+        return bits
+    out = 0
+    run = (1 << scale) - 1
+    shift = 0
+    while bits:
+        if bits & 1:
+            out |= run << shift
+        bits >>= 1
+        shift += scale
+    return out
+
+def draw_text(display, text, x, y, scale=2, color=1, scale_y=None):
+    """Draw text with its top-left corner at x, y, clipped to the display
+
+    display needs buffer, width and height (an SSD1306). Each glyph column
+    is stretched once and ORed (or cleared, color 0) into the pages it
+    covers for all of its scaled columns, no per-pixel calls.
+    """
+    buf = display.buffer
+    width = display.width
+    pages = display.height // 8
+    if scale_y is None:
+        scale_y = scale
+    advance = GLYPH_WIDTH * scale + gap(scale)
+    height = GLYPH_HEIGHT * scale_y
+
+    # Pages the text covers, and where the glyph top falls in the first one
+    first_page = y >> 3
+    offset = y & 7
+    last_page = (y + height - 1) >> 3
+    start_page = first_page if first_page > 0 else 0
+    if last_page >= pages:
+        last_page = pages - 1
+
+    for ch in text:
+        code = ord(ch)
+        if code < FIRST_CHAR or code > LAST_CHAR:
+            code = 63  # '?'
+        base = (code - FIRST_CHAR) * GLYPH_WIDTH
+        for col in range(GLYPH_WIDTH):
+            bits = FONT[base + col]
+            if bits:
+                mask = _stretch(bits, scale_y) << offset
+                x0 = x + col * scale
+                x1 = x0 + scale
+                if x0 < 0:
+                    x0 = 0
+                if x1 > width:
+                    x1 = width
+                for page in range(start_page, last_page + 1):
+                    byte = (mask >> ((page - first_page) * 8)) & 0xFF
+                    if not byte:
+                        continue
+                    index = page * width
+                    if color:
+                        for i in range(index + x0, index + x1):
+                            buf[i] |= byte
+                    else:
+                        byte ^= 0xFF
+                        for i in range(index + x0, index + x1):
+                            buf[i] &= byte
+        x += advance
+        if x >= width:
+            break
+
+def draw_centered(display, text, scale=None, y=None, scale_y=None):
+    """Draw text centered horizontally (and vertically unless y is given), returns the scale"""
+    if scale is None:
+        scale = fit_scale(text, display.width, display.height)
+    if scale_y is None:
+        scale_y = scale
+    x = (display.width - text_width(text, scale)) // 2
+    if y is None:
+        y = (display.height - GLYPH_HEIGHT * scale_y) // 2
+    draw_text(display, text, x, y, scale, 1, scale_y)
+    return scale
@@ -0,0 +1,170 @@
+"""
+Main Loop Profiler - Per-stage timing histograms without allocation
+"""
+
+import time
+from array import array
+from micropython import const
+
+try:
+    import gc
+    _mem_free = gc.mem_free
+except (ImportError, AttributeError):
+    _mem_free = None  # CPython has no heap counter
+
+# Upper bucket edges in microseconds, the last bucket holds everything above
+BUCKET_EDGES_US = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+JITTER_SHIFT = const(4)  # Jitter smoothing, 1/16 per loop as in RTP
+
+class LoopProfiler:
+    """Times named loop stages with ticks_us into fixed-bucket histograms
+
+    Call begin() at the top of each loop pass and mark(stage) after each
+    stage. All storage is preallocated, and every method returns at once
+    while the profiler is disabled. Counters are 32-bit (total_us wraps
+    after about 71 minutes of stage time), so report() starts a new
+    window by default.
+    """
+
+    def __init__(self, stages, enabled=False, track_memory=False, edges=BUCKET_EDGES_US):
+        self.stages = stages
+        self.edges = edges
+        self.enabled = enabled
+        self.track_memory = track_memory and _mem_free is not None
+        buckets = len(edges) + 1
+        n = len(stages)
+        self._buckets = buckets
+        self.histogram = array('L', [0] * (n * buckets))
+        self.count = array('L', [0] * n)
+        self.total_us = array('L', [0] * n)
+        self.max_us = array('L', [0] * n)
+        self.loop_histogram = array('L', [0] * buckets)  # Busy time per pass
+        self.reset()
+
+    def reset(self):
+        for arr in (self.histogram, self.count, self.total_us, self.max_us, self.loop_histogram):
+            for i in range(len(arr)):
+                arr[i] = 0
+        self.loops = 0
+        self.worst_stall_us = 0   # Longest busy time of one pass
+        self.max_period_us = 0    # Longest time between passes
+        self.jitter_us = 0        # Smoothed period variation
+        self.alloc_bytes = 0      # Heap used by the loop, summed over passes
+        self.max_alloc_bytes = 0  # Most heap used by one pass
+        self.gc_runs = 0          # Passes where the heap grew (collection)
+        self._loop_start = None
+        self._last = 0
+        self._period = 0
+        self._mem = 0
+
+    def enable(self, track_memory=None):
+        if track_memory is not None:
+            self.track_memory = track_memory and _mem_free is not None
+        self._loop_start = None  # Don't count the time spent disabled
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def _bucket(self, us):
+        i = 0
+        for edge in self.edges:
+            if us <= edge:
+                return i
+            i += 1
+        return i
+
+    def begin(self):
+        """Start a loop pass, closing the previous one"""
+        if not self.enabled:
+            return
+        now = time.ticks_us()
+        start = self._loop_start
+
+        if start is not None:
+            busy = time.ticks_diff(self._last, start)
+            self.loop_histogram[self._bucket(busy)] += 1
+            if busy > self.worst_stall_us:
+                self.worst_stall_us = busy
+
+            period = time.ticks_diff(now, start)
+            if period > self.max_period_us:
+                self.max_period_us = period
+            if self.loops > 1:
+                delta = period - self._period
+                if delta < 0:
+                    delta = -delta
+                self.jitter_us += (delta - self.jitter_us) >> JITTER_SHIFT
+            self._period = period
+
+            if self.track_memory:
+                used = self._mem - _mem_free()
+                if used < 0:
+                    self.gc_runs += 1
+                else:
+                    self.alloc_bytes += used
+                    if used > self.max_alloc_bytes:
+                        self.max_alloc_bytes = used
+
+        self.loops += 1
+        if self.track_memory:
+            self._mem = _mem_free()
+        self._loop_start = now
+        self._last = now
+
+    def mark(self, stage):
+        """End a stage (index into stages), timed from the previous mark"""
+        if not self.enabled:
+            return
+        now = time.ticks_us()
+        us = time.ticks_diff(now, self._last)
+        self._last = now
+        self.record(stage, us)
+
+    def record(self, stage, us):
+        """Add a measured duration, for stages timed outside begin/mark"""
+        if not self.enabled:
+            return
+        self.histogram[stage * self._buckets + self._bucket(us)] += 1
+        self.count[stage] += 1
+        self.total_us[stage] += us
+        if us > self.max_us[stage]:
+            self.max_us[stage] = us
+
+    def stats(self):
+        """Report dict (allocates, call outside the hot path)"""
+        buckets = self._buckets
+        stages = {}
+        for i, name in enumerate(self.stages):
+            count = self.count[i]
+            stages[name] = {
+                'count': count,
+                'mean_us': self.total_us[i] // count if count else 0,
+                'max_us': self.max_us[i],
+                'histogram': list(self.histogram[i * buckets:(i + 1) * buckets])
+            }
+        return {
+            'loops': self.loops,
+            'stages': stages,
+            'loop_histogram': list(self.loop_histogram),
+            'worst_stall_us': self.worst_stall_us,
+            'max_period_us': self.max_period_us,
+            'jitter_us': self.jitter_us,
+            'alloc_bytes': self.alloc_bytes,
+            'max_alloc_bytes': self.max_alloc_bytes,
+            'gc_runs': self.gc_runs,
+            'edges_us': self.edges
+        }
+
+    def report(self, reset=True):
+        """Print a compact summary, then start a new window unless reset is False"""
+        s = self.stats()
+        print(f"Loops: {s['loops']}, stall max {s['worst_stall_us']} us, "
+              f"period max {s['max_period_us']} us, jitter {s['jitter_us']} us")
+        if self.track_memory:
+            print(f"Heap: {s['alloc_bytes']} bytes, max {s['max_alloc_bytes']}/pass, {s['gc_runs']} collections")
+        for name, st in s['stages'].items():
+            hist = " ".join(str(n) for n in st['histogram'])
+            print(f"{name:<8} n={st['count']} mean={st['mean_us']} max={st['max_us']} us [{hist}]")
+        if reset:
+            self.reset()
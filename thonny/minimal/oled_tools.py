@@ -2,7 +2,9 @@
 Minimal OLED Display Tool
 """
 
+import framebuf
 from machine import Pin, I2C
+from large_font import draw_centered
 
 try:
     from ssd1306 import SSD1306_I2C
@@ -10,38 +12,141 @@ try:
 except ImportError:
     OLED_AVAILABLE = False
 
+I2C_FREQ = 40000
+
+# Screen layout, each line owns the display pages it touches
+RSSI_Y = 0
+RSSI_LABEL = "RSSI:"
+RSSI_VALUE_X = 40  # After the label
+STATUS_Y = 25
+LINE_HEIGHT = 8
+
+# Lines rendered once at start-up, others are rendered on first use
+PRERENDERED = (
+    ("SCAN", STATUS_Y), ("UNLOCK", STATUS_Y), ("LOCK", STATUS_Y), ("ADVERTISING", STATUS_Y),
+    ("No Signal", RSSI_Y), (RSSI_LABEL, RSSI_Y),
+)
+
 class MinimalOLED:
-    def __init__(self, sda_pin=8, scl_pin=9):
+    def __init__(self, sda_pin=8, scl_pin=9, i2c=None, incremental=False):
         self.display = None
+        self.incremental = incremental  # Commit frames, service() sends them
+        self._strips = {}  # (text, y) -> (buffer offset, prerendered pages)
+        self._status = None
+        self._rssi = None
+        self._rssi_shown = False
+        self._large = None  # Text shown by show_large
         
         if not OLED_AVAILABLE:
             return
         
         try:
-            i2c = I2C(0, sda=Pin(sda_pin), scl=Pin(scl_pin), freq=40000)
-            self.display = SSD1306_I2C(128, 64, i2c, addr=0x3C)
+            freq = None
+            set_freq = None
+            if i2c is None:
+                freq = I2C_FREQ
+                i2c = I2C(0, sda=Pin(sda_pin), scl=Pin(scl_pin), freq=freq)
+                # The link may slow the bus down after errors, and back up
+                set_freq = lambda hz: I2C(0, sda=Pin(sda_pin), scl=Pin(scl_pin), freq=hz)
+            self.display = SSD1306_I2C(128, 64, i2c, addr=0x3C, freq=freq, set_freq=set_freq)
             self.display.fill(0)
             self.display.show()
+            for text, y in PRERENDERED:
+                self._strip(text, y)
         except:
             self.display = None
     
-    def show_status(self, status, rssi=None):
-        """Show system status"""
+    def _strip(self, text, y):
+        """Full-width display pages holding one text line, rendered once"""
+        key = (text, y)
+        cached = self._strips.get(key)
+        if cached is None:
+            width = self.display.width
+            first = y // 8
+            pages = (y + LINE_HEIGHT - 1) // 8 - first + 1
+            strip = bytearray(pages * width)
+            fb = framebuf.FrameBuffer(strip, width, pages * 8, framebuf.MONO_VLSB)
+            fb.text(text, 0, y - first * 8)
+            cached = (first * width, strip)
+            self._strips[key] = cached
+        return cached
+    
+    def _draw(self, text, y):
+        """Replace the pages of a text line with its prerendered copy"""
+        offset, strip = self._strip(text, y)
+        self.display.buffer[offset:offset + len(strip)] = strip
+    
+    def _present(self):
+        if self.incremental:
+            self.display.commit()
+        else:
+            self.display.show()
+    
+    def service(self, max_chunks=1):
+        """Send part of a committed frame, returns True when nothing is left"""
         if not self.display:
+            return True
+        try:
+            return self.display.flush_step(max_chunks)
+        except:
+            return True
+    
+    def max_stall_us(self):
+        """Longest time one service() call kept the caller waiting"""
+        return self.display.max_step_us if self.display else 0
+    
+    def invalidate(self):
+        """Forget the cached layout, e.g. after drawing on the display directly"""
+        self._status = None
+        self._rssi = None
+        self._rssi_shown = False
+        self._large = None
+    
+    def show_large(self, text, scale=None):
+        """Show text as large as fits, centered on the screen"""
+        if not self.display or text == self._large:
             return
         
         try:
+            self.invalidate()
             self.display.fill(0)
+            draw_centered(self.display, text, scale)
+            self._present()
+            self._large = text
+        except:
+            self.invalidate()
+    
+    def show_status(self, status, rssi=None):
+        """Show system status, only redrawing what changed"""
+        if not self.display:
+            return
+        
+        show_rssi = bool(rssi and rssi > -100)
+        if not show_rssi:
+            rssi = None
+        if self._status is not None and status == self._status and rssi == self._rssi:
+            return  # Same content already on the panel
+        
+        try:
+            display = self.display
+            self._large = None
+            if self._status is None:
+                display.fill(0)  # Unknown content, start from a clean screen
             
-            # RSSI
-            if rssi and rssi > -100:
-                self.display.text(f"RSSI:{rssi}", 0, 0)
-            else:
-                self.display.text("No Signal", 0, 0)
+            # RSSI: restore the bare label, then draw only the digits
+            if show_rssi:
+                self._draw(RSSI_LABEL, RSSI_Y)
+                display.text(str(rssi), RSSI_VALUE_X, RSSI_Y)
+            elif self._rssi_shown or self._status is None:
+                self._draw("No Signal", RSSI_Y)
             
             # Status
-            self.display.text(status, 0, 25)
+            if status != self._status:
+                self._draw(status, STATUS_Y)
             
-            self.display.show()
+            self._status = status
+            self._rssi = rssi
+            self._rssi_shown = show_rssi
+            self._present()
         except:
-            pass
\ No newline at end of file
+            self.invalidate()
@@ -3,15 +3,43 @@ BLE Door Lock Receiver - Minimal Version
 """
 
 import time
-from ryb080i_simple import SimpleBLE, SimpleAutoScanManager
+from ryb080i_simple import SimpleBLE, AdaptiveScanScheduler
+from ryb080i_async import AsyncBLE, asyncio, wait_event
+from ble_provision import provision, RECEIVER_PROFILE
+from ble_baud import negotiate
+from device_table import DeviceTable
+from event_log import EventLog, EV_BOOT, EV_STATE, EV_LATENCY, EV_RSSI
+from loop_profiler import LoopProfiler
 from oled_tools import MinimalOLED
 from rgbled_tools import MinimalRGBLED
 
 # Settings
 RSSI_THRESHOLD = -60
 RSSI_TIMEOUT = 5000
-SCAN_INTERVAL = 3000
+SCAN_INTERVAL = 3000      # Scan interval while a key is present but far from the threshold
+SCAN_MIN_INTERVAL = 1000  # Fastest scanning, near the threshold or when a key appears
+SCAN_MAX_INTERVAL = 3000  # Slowest scanning in an empty area, no later first sighting than a fixed 3 s schedule
 TARGET_DEVICE = "PicoKey"
+TARGET_PATTERN = TARGET_DEVICE.upper().encode()
+AUTHORIZED_KEYS = ()  # Key fob addresses as hex bytes, e.g. (b"C8FD19A2B3E4",)
+MAX_DEVICES = 32      # Device table capacity
+USE_ASYNCIO = True  # False: classic polling loop
+AUTO_PROVISION = True  # Check the module settings at boot (skipped when cached)
+AUTO_BAUD = True  # Move the module UART above 9600 baud for dense scans (rate cached)
+OLED_INCREMENTAL = True  # Send display updates a chunk per loop pass instead of blocking
+PROFILE = False  # Time the main loop stages (profiler.enable() at runtime)
+PROFILE_REPORT_MS = 10000  # Print profiler stats this often while enabled
+EVENT_LOG = True  # Record state changes and RSSI history to flash (event_log)
+RSSI_LOG_MS = 30000  # Strongest key RSSI is logged once per this interval
+
+# Profiled main loop stages
+STAGES = ("uart", "queue", "scan", "state", "output", "display")
+STAGE_UART = 0
+STAGE_QUEUE = 1
+STAGE_SCAN = 2
+STAGE_STATE = 3
+STAGE_OUTPUT = 4
+STAGE_DISPLAY = 5
 
 # System states
 class State:
@@ -19,33 +47,56 @@ class State:
     UNLOCKED = "UNLOCK"
     LOCKED = "LOCK"
 
+# State codes in the event log
+STATE_CODES = {State.SCANNING: 0, State.LOCKED: 1, State.UNLOCKED: 2}
+
 # Global variables
 ble = None
 oled = None
 led = None
 scanner = None
+devices = None
+events = None
 current_state = State.SCANNING
+current_rssi = None
+state_since = 0     # ticks_ms of the last state change
+detect_us = 0       # ticks_us of the last authorized key result
+rssi_best = None    # Strongest key RSSI since the last RSSI record
+rssi_count = 0
+rssi_logged = 0     # ticks_ms of the last RSSI record
+profiler = LoopProfiler(STAGES, enabled=PROFILE, track_memory=PROFILE)
+
+# asyncio runtime (set by main_async)
+runtime = None
+rssi_event = None
+state_event = None
 
 def on_scan_result(device_list):
-    """Handle scan results"""
+    """Handle one scan window's results, one record per device"""
+    global detect_us, rssi_best, rssi_count
+    now = time.ticks_ms()
     for device in device_list:
-        name = device.get('name', '')
-        rssi_text = device.get('rssi', '')
-        
-        if TARGET_DEVICE.upper() in name.upper():
-            rssi = ble.parse_rssi_from_text(rssi_text)
-            if rssi:
-                ble.update_rssi_data(rssi)
-                print(f"Found {TARGET_DEVICE}: {rssi}dBm")
+        slot = devices.update(device, now)
+        rssi = device.rssi
+        if rssi is not None and devices.is_authorized(slot):
+            ble.update_rssi_data(rssi)
+            scanner.note_detection(rssi)
+            detect_us = time.ticks_us()
+            rssi_count += 1
+            if rssi_best is None or rssi > rssi_best:
+                rssi_best = rssi
+            print(f"Found {device.name()}: {rssi}dBm")
+            if rssi_event:
+                rssi_event.set()
 
 def update_state():
-    """Update system state based on RSSI"""
-    global current_state
+    """Update system state from the strongest authorized key, returns True when it changed"""
+    global current_state, current_rssi, state_since
     
-    rssi = ble.get_current_rssi()
-    timeout = ble.check_rssi_timeout(RSSI_TIMEOUT)
+    rssi = devices.strongest_authorized(RSSI_TIMEOUT)
+    current_rssi = rssi
     
-    if timeout:
+    if rssi is None:
         new_state = State.SCANNING
     elif rssi > RSSI_THRESHOLD:
         new_state = State.UNLOCKED
@@ -53,40 +104,81 @@ def update_state():
         new_state = State.LOCKED
     
     if new_state != current_state:
+        if events:
+            now = time.ticks_ms()
+            events.log(EV_STATE, STATE_CODES[new_state], STATE_CODES[current_state], rssi,
+                       time.ticks_diff(now, state_since))
+            if new_state == State.UNLOCKED:
+                events.log(EV_LATENCY, STATE_CODES[new_state], STATE_CODES[current_state], rssi,
+                           time.ticks_diff(time.ticks_us(), detect_us))
+            state_since = now
         current_state = new_state
-        
-        # Update displays
-        if oled:
-            oled.show_status(current_state, rssi)
-        
-        if led:
-            if current_state == State.SCANNING:
-                led.set_scanning()
-            elif current_state == State.UNLOCKED:
-                led.set_unlocked()
-            else:
-                led.set_locked()
-        
         print(f"State: {current_state} (RSSI: {rssi})")
+        return True
+    return False
 
-def init_system():
+def service_log():
+    """Record the RSSI history and write out an old partial page"""
+    global rssi_best, rssi_count, rssi_logged
+    if not events:
+        return
+    now = time.ticks_ms()
+    if time.ticks_diff(now, rssi_logged) >= RSSI_LOG_MS:
+        if rssi_count:
+            code = STATE_CODES[current_state]
+            events.log(EV_RSSI, code, code, rssi_best, rssi_count)
+        rssi_best = None
+        rssi_count = 0
+        rssi_logged = now
+    events.service()
+
+def update_outputs():
+    """Show the current state on OLED and LED"""
+    if oled:
+        oled.show_status(current_state, current_rssi)
+    
+    if led:
+        if current_state == State.SCANNING:
+            led.set_scanning()
+        elif current_state == State.UNLOCKED:
+            led.set_unlocked()
+        else:
+            led.set_locked()
+
+def init_system(uart=None):
     """Initialize all components"""
-    global ble, oled, led, scanner
+    global ble, oled, led, scanner, devices, events, state_since, rssi_logged
     
     print("Initializing BLE Door Lock...")
     
+    # Event log, continues the ring left by the previous boot
+    if EVENT_LOG:
+        events = EventLog()
+        events.log(EV_BOOT)
+        state_since = rssi_logged = time.ticks_ms()
+    
+    # Known devices, any authorized key can unlock
+    devices = DeviceTable(MAX_DEVICES, AUTHORIZED_KEYS, (TARGET_PATTERN,))
+    
     # BLE
-    ble = SimpleBLE()
+    ble = SimpleBLE(uart)
     ble.set_callback('scan_result', on_scan_result)
+    if AUTO_BAUD:
+        report = negotiate(ble)
+        print(f"UART: {report['baudrate']} baud{'' if report['ok'] else ' (negotiation failed)'} in {report['time_ms']} ms")
+    if AUTO_PROVISION:
+        report = provision(ble, RECEIVER_PROFILE)
+        print(f"Provisioning: {'cached' if report['cached'] else 'applied'} in {report['time_ms']} ms")
     
     # OLED
-    oled = MinimalOLED()
+    oled = MinimalOLED(incremental=OLED_INCREMENTAL)
     
     # LED
     led = MinimalRGBLED()
     
     # Auto scanner
-    scanner = SimpleAutoScanManager(ble, SCAN_INTERVAL)
+    scanner = AdaptiveScanScheduler(ble, RSSI_THRESHOLD, SCAN_MIN_INTERVAL,
+                                    SCAN_MAX_INTERVAL, SCAN_INTERVAL)
     scanner.start()
     
     print("System ready")
@@ -97,26 +189,138 @@ def main():
     print(f"Threshold: {RSSI_THRESHOLD}dBm")
     
     init_system()
+    last_report = time.ticks_ms()
     
     try:
         while True:
+            profiler.begin()
+            
             # Process BLE
             ble.process_uart_data()
+            profiler.mark(STAGE_UART)
             ble.process_command_queue()
+            profiler.mark(STAGE_QUEUE)
             
             # Auto scan
             if scanner.should_scan():
                 scanner.trigger_scan()
+            profiler.mark(STAGE_SCAN)
             
             # Update state
-            update_state()
+            changed = update_state()
+            profiler.mark(STAGE_STATE)
+            if changed:
+                update_outputs()
+                profiler.mark(STAGE_OUTPUT)
             
-            time.sleep(0.05)
+            # Send the next piece of a committed display frame
+            display_idle = oled.service() if oled else True
+            profiler.mark(STAGE_DISPLAY)
+            
+            service_log()
+            
+            if profiler.enabled:
+                now = time.ticks_ms()
+                if time.ticks_diff(now, last_report) >= PROFILE_REPORT_MS:
+                    profiler.report()
+                    last_report = now
+            
+            # Come back quickly while a display frame is still going out
+            time.sleep(0.05 if display_idle else 0.005)
             
     except KeyboardInterrupt:
-        print("Shutting down...")
-        if led:
-            led.set_off()
+        shutdown()
+
+def shutdown():
+    print("Shutting down...")
+    if led:
+        led.set_off()
+    if events:
+        events.flush()
+
+async def scan_task():
+    """Queue scans when the scheduler says so"""
+    while True:
+        if scanner.should_scan():
+            scanner.trigger_scan()
+            runtime.command_event.set()
+        # Wake at least every minimum interval, a key may shorten the schedule
+        wait_ms = min(max(scanner.time_to_next_ms(), 1), SCAN_MIN_INTERVAL)
+        await asyncio.sleep(wait_ms / 1000)
+
+async def state_task():
+    """Re-evaluate the state on new RSSI data or when the RSSI times out"""
+    while True:
+        age = time.ticks_diff(time.ticks_ms(), ble.connection_state['last_rssi_time'])
+        wait_ms = RSSI_TIMEOUT - age + 1 if age <= RSSI_TIMEOUT else RSSI_TIMEOUT
+        woken = await wait_event(rssi_event, wait_ms)
+        
+        start = time.ticks_us()
+        changed = update_state()
+        profiler.record(STAGE_STATE, time.ticks_diff(time.ticks_us(), start))
+        if changed:
+            if woken:
+                runtime.record_latency()
+            state_event.set()
+
+async def display_task():
+    """Update OLED and LED after state changes"""
+    while True:
+        await state_event.wait()
+        state_event.clear()
+        start = time.ticks_us()
+        update_outputs()
+        profiler.record(STAGE_OUTPUT, time.ticks_diff(time.ticks_us(), start))
+        
+        # Let the BLE tasks run between display chunks
+        while oled:
+            start = time.ticks_us()
+            done = oled.service()
+            profiler.record(STAGE_DISPLAY, time.ticks_diff(time.ticks_us(), start))
+            if done:
+                break
+            await asyncio.sleep(0)
+
+async def profile_task():
+    """Print profiler stats while it is enabled"""
+    while True:
+        await asyncio.sleep(PROFILE_REPORT_MS / 1000)
+        if profiler.enabled:
+            profiler.report()
+
+async def log_task():
+    """Record the RSSI history at its interval"""
+    while True:
+        await asyncio.sleep(RSSI_LOG_MS / 1000)
+        service_log()
+
+async def main_async(reader=None, uart=None):
+    """Event-driven main loop"""
+    global runtime, rssi_event, state_event
+    
+    print("BLE Door Lock - Minimal Version (asyncio)")
+    print(f"Threshold: {RSSI_THRESHOLD}dBm")
+    
+    init_system(uart)
+    runtime = AsyncBLE(ble, reader)
+    rssi_event = asyncio.Event()
+    state_event = asyncio.Event()
+    
+    runtime.start()
+    asyncio.create_task(scan_task())
+    asyncio.create_task(display_task())
+    asyncio.create_task(profile_task())
+    asyncio.create_task(log_task())
+    await state_task()
+
+def run_async():
+    try:
+        asyncio.run(main_async())
+    except KeyboardInterrupt:
+        shutdown()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if USE_ASYNCIO:
+        run_async()
+    else:
+        main()
\ No newline at end of file
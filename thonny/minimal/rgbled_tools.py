@@ -3,9 +3,8 @@ Minimal RGB LED Control Tool
 """
 
 import neopixel
-from machine import Pin
+from machine import Pin, Timer
 import time
-import _thread
 
 # Colors
 RED = (30, 0, 0)
@@ -13,115 +12,192 @@ GREEN = (0, 30, 0)
 PURPLE = (15, 0, 15)
 OFF = (0, 0, 0)
 
+# Flow animation
+FLOW_FRAME_MS = 80  # Frame period
+FLOW_HEAD = (25, 5, 15)  # Whitish red/pink
+FLOW_TRAIL_START = 25
+FLOW_FADE = 3  # Trail fade per frame
+
+def make_lut(brightness=1.0, gamma=1.0):
+    """Color value -> output value, scaled by brightness with gamma correction"""
+    lut = bytearray(256)
+    for i in range(256):
+        lut[i] = int(255 * brightness * (i / 255) ** gamma + 0.5)
+    return lut
+
 class MinimalRGBLED:
-    def __init__(self, pin=2, count=8):
+    def __init__(self, pin=2, count=8, brightness=1.0, gamma=1.0, use_timer=True):
+        self.animation_running = False
+        self._timer = None
+        self._frames = None   # Frames of the running animation
         try:
             self.pixels = neopixel.NeoPixel(Pin(pin), count)
-            self.count = count
-            self.animation_running = False
-            self.set_off()
         except:
             self.pixels = None
-    
+            return
+        self.count = count
+        self.bpp = getattr(self.pixels, 'bpp', 3)
+        self.order = getattr(self.pixels, 'ORDER', (1, 0, 2, 3))
+        self.use_timer = use_timer
+        self.frame_ms = FLOW_FRAME_MS
+        self._frame_index = 0
+        self._next_frame = 0  # ticks_ms the next frame is due (cooperative playback)
+        self._shown = None    # Frame currently on the LEDs
+        self.writes = 0
+        self.skipped_writes = 0
+        self.latency_us = 0   # set_* call to LEDs updated
+        self.set_brightness(brightness, gamma)
+        self.set_off()
+
+    def set_brightness(self, brightness=1.0, gamma=1.0):
+        """Rebuild the output tables, the default 1.0/1.0 sends colors as given"""
+        self._lut = make_lut(brightness, gamma)
+        self._solid = {}
+        self._flow = None
+        self._shown = None
+
+    def _encode(self, frame, index, color):
+        offset = index * self.bpp
+        order = self.order
+        lut = self._lut
+        for c in range(3):
+            frame[offset + order[c]] = lut[color[c]]
+
+    def _solid_frame(self, color):
+        frame = self._solid.get(color)
+        if frame is None:
+            frame = bytearray(self.count * self.bpp)
+            for i in range(self.count):
+                self._encode(frame, i, color)
+            self._solid[color] = frame
+        return frame
+
+    def _flow_frames(self):
+        """One bounce of the flow animation, computed once"""
+        if self._flow is not None:
+            return self._flow
+
+        count = self.count
+        cycle = max(2 * (count - 1), 1)
+        trail = [0] * count
+        frames = []
+        position = 0
+        direction = 1
+        # The first bounce warms up the trail, the second one repeats forever
+        for step in range(2 * cycle):
+            for i in range(count):
+                trail[i] = max(0, trail[i] - FLOW_FADE)
+            trail[position] = FLOW_TRAIL_START
+
+            if step >= cycle:
+                frame = bytearray(count * self.bpp)
+                for i in range(count):
+                    if i == position:
+                        self._encode(frame, i, FLOW_HEAD)
+                    elif trail[i] > 0:
+                        level = trail[i] // 2
+                        self._encode(frame, i, (level, 0, level))
+                frames.append(frame)
+
+            position += direction
+            if position >= count - 1:
+                position = count - 1
+                direction = -1
+            elif position <= 0:
+                position = 0
+                direction = 1
+
+        self._flow = frames
+        return frames
+
+    def _show(self, frame):
+        """Write a frame, skipping the write if it is already shown"""
+        if frame is self._shown:
+            self.skipped_writes += 1
+            return
+        try:
+            self.pixels.buf[:] = frame
+            self.pixels.write()
+            self._shown = frame
+            self.writes += 1
+        except:
+            pass
+
     def set_all(self, color):
         """Set all LEDs to same color"""
         if self.pixels:
+            start = time.ticks_us()
             self.stop_animation()
-            try:
-                self.pixels.fill(color)
-                self.pixels.write()
-            except:
-                pass
-    
+            self._show(self._solid_frame(color))
+            self.latency_us = time.ticks_diff(time.ticks_us(), start)
+
     def set_scanning(self):
         """Purple for scanning (receiver)"""
         self.set_all(PURPLE)
-    
+
     def set_advertising(self):
         """Purple flowing animation for transmitter"""
         if not self.pixels:
             return
-        
+        self.play(self._flow_frames(), FLOW_FRAME_MS)
+
+    def play(self, frames, frame_ms):
+        """Loop through precomputed frames from a timer, or from step()"""
         self.stop_animation()
+        self._frames = frames
+        self._frame_index = 0
+        self.frame_ms = frame_ms
         self.animation_running = True
-        try:
-            _thread.start_new_thread(self._flow_animation, ())
-        except:
-            self.set_all(PURPLE)  # Fallback to solid purple
-    
+        self._show(frames[0])
+        self._next_frame = time.ticks_add(time.ticks_ms(), frame_ms)
+
+        if self.use_timer:
+            try:
+                self._timer = Timer(-1, mode=Timer.PERIODIC, period=frame_ms, callback=self._tick)
+            except:
+                self._timer = None  # No timer, the caller drives step()
+
+    def _tick(self, timer=None):
+        frames = self._frames
+        if not self.animation_running or frames is None:
+            return
+        index = self._frame_index + 1
+        if index >= len(frames):
+            index = 0
+        self._frame_index = index
+        self._show(frames[index])
+
+    def step(self):
+        """Advance a timer-less animation when its frame is due, returns ms to the next frame"""
+        if not self.animation_running or self._timer:
+            return -1
+        now = time.ticks_ms()
+        wait = time.ticks_diff(self._next_frame, now)
+        if wait > 0:
+            return wait
+        self._tick()
+        self._next_frame = time.ticks_add(now, self.frame_ms)
+        return self.frame_ms
+
     def set_unlocked(self):
         """Green for unlocked"""
         self.set_all(GREEN)
-    
+
     def set_locked(self):
         """Red for locked"""
         self.set_all(RED)
-    
+
     def set_off(self):
         """Turn off all LEDs"""
-        self.stop_animation()
-        if self.pixels:
-            try:
-                self.pixels.fill(OFF)
-                self.pixels.write()
-            except:
-                pass
-    
+        self.set_all(OFF)
+
     def stop_animation(self):
-        """Stop animation"""
+        """Stop animation (returns at once, the next frame is never shown)"""
         self.animation_running = False
-        time.sleep(0.1)
-    
-    def _flow_animation(self):
-        """Purple flowing animation - single point with fading trail"""
-        position = 0.0
-        direction = 1  # 1: forward, -1: backward
-        trail_brightness = [0] * self.count  # Trail brightness for each LED
-        
-        while self.animation_running:
+        self._frames = None
+        if self._timer:
             try:
-                self.pixels.fill(OFF)
-                
-                # Fade all trails
-                for i in range(self.count):
-                    if trail_brightness[i] > 0:
-                        trail_brightness[i] = max(0, trail_brightness[i] - 3)  # Fade speed
-                
-                # Set current position (brightest point - whitish red)
-                current_pos = int(position)
-                if 0 <= current_pos < self.count:
-                    trail_brightness[current_pos] = 25  # Brightest
-                    self.pixels[current_pos] = (25, 5, 15)  # Whitish red/pink
-                
-                # Apply trail colors (purple)
-                for i in range(self.count):
-                    if trail_brightness[i] > 0 and i != current_pos:
-                        brightness = trail_brightness[i]
-                        purple_intensity = brightness // 2
-                        self.pixels[i] = (purple_intensity, 0, purple_intensity)
-                
-                self.pixels.write()
-                
-                # Move position
-                position += direction * 1.0
-                
-                # Change direction at ends
-                if position >= self.count - 1:
-                    position = self.count - 1
-                    direction = -1
-                elif position <= 0:
-                    position = 0
-                    direction = 1
-                
-                time.sleep(0.08)  # Slightly faster
-                
+                self._timer.deinit()
             except:
-                break
-        
-        # Turn off when animation stops
-        if self.pixels:
-            try:
-                self.pixels.fill(OFF)
-                self.pixels.write()
-            except:
-                pass
\ No newline at end of file
+                pass
+            self._timer = None
@@ -0,0 +1,127 @@
+"""
+RYB080I BLE Module - asyncio Runtime
+"""
+
+import time
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from ryb080i_simple import RX_CHUNK_SIZE, DEFAULT_CMD_TIMEOUT, PRIO_NORMAL
+
+# Poll interval while commands are waiting for a wake-up delay or a reply
+BUSY_POLL_S = 0.002
+
+class AsyncBLE:
+    """Runs a SimpleBLE from asyncio tasks instead of a polling loop"""
+
+    def __init__(self, ble, reader=None):
+        self.ble = ble
+        if reader is None:
+            # On the Pico the UART itself is the stream, host UARTs provide a reader
+            stream_reader = getattr(ble.uart, 'stream_reader', None)
+            reader = stream_reader() if stream_reader else asyncio.StreamReader(ble.uart)
+        self.reader = reader
+        self.command_event = asyncio.Event()
+        self.done_event = asyncio.Event()  # Set whenever a command completes
+        self.batch_event = asyncio.Event()  # Set when scan results start a batch
+        ble.set_callback('command_done', self._on_command_done)
+        self.rx_time_us = 0  # When the last UART data arrived
+        self.latency_count = 0
+        self.latency_last_us = 0
+        self.latency_max_us = 0
+        self.latency_total_us = 0
+
+    def send_command(self, command, timeout_ms=DEFAULT_CMD_TIMEOUT, priority=PRIO_NORMAL):
+        """Queue a command and wake the transmit task"""
+        cmd_id = self.ble.send_command_async(command, timeout_ms, priority)
+        self.command_event.set()
+        return cmd_id
+
+    def _on_command_done(self, cmd):
+        self.done_event.set()
+
+    async def command(self, command, timeout_ms=DEFAULT_CMD_TIMEOUT, priority=PRIO_NORMAL):
+        """Send a command and wait for its result dict"""
+        cmd_id = self.send_command(command, timeout_ms, priority)
+        while True:
+            result = self.ble.get_command_result(cmd_id)
+            if result:
+                return result
+            await self.done_event.wait()
+            self.done_event.clear()
+
+    def record_latency(self):
+        """Record time from the last received data to now (e.g. a state change)"""
+        latency = time.ticks_diff(time.ticks_us(), self.rx_time_us)
+        self.latency_count += 1
+        self.latency_last_us = latency
+        self.latency_total_us += latency
+        if latency > self.latency_max_us:
+            self.latency_max_us = latency
+
+    def latency_stats(self):
+        mean = self.latency_total_us // self.latency_count if self.latency_count else 0
+        return {
+            'count': self.latency_count,
+            'last_us': self.latency_last_us,
+            'mean_us': mean,
+            'max_us': self.latency_max_us
+        }
+
+    async def rx_task(self):
+        """Feed UART data to the line assembler as soon as it arrives"""
+        while True:
+            data = await self.reader.read(RX_CHUNK_SIZE)
+            if not data:
+                at_eof = getattr(self.reader, 'at_eof', None)
+                if at_eof and at_eof():
+                    return  # Host stream closed
+                await asyncio.sleep(0)
+                continue
+            self.rx_time_us = time.ticks_us()
+            self.ble.feed(data)
+            if self.ble.scan_batch:
+                self.batch_event.set()
+
+    async def tx_task(self):
+        """Send queued commands when woken, expire unanswered ones"""
+        ble = self.ble
+        while True:
+            if not ble.command_queue and not ble.in_flight:
+                await self.command_event.wait()
+                self.command_event.clear()
+            ble.process_command_queue()
+            await asyncio.sleep(BUSY_POLL_S)
+
+    async def batch_task(self):
+        """Close each scan window when its burst goes quiet or the window ends"""
+        ble = self.ble
+        while True:
+            wait_ms = ble.scan_batch_due_ms()
+            if wait_ms < 0:
+                await self.batch_event.wait()
+                self.batch_event.clear()
+            elif wait_ms:
+                await asyncio.sleep(wait_ms / 1000)
+            else:
+                ble.flush_scan_batch()
+
+    def start(self):
+        """Create the receive, transmit and scan batch tasks"""
+        tasks = [asyncio.create_task(self.rx_task()),
+                 asyncio.create_task(self.tx_task())]
+        if self.ble.scan_batch is not None:
+            tasks.append(asyncio.create_task(self.batch_task()))
+        return tasks
+
+async def wait_event(event, timeout_ms):
+    """Wait for an event or a timeout, returns True if the event fired"""
+    try:
+        await asyncio.wait_for(event.wait(), timeout_ms / 1000)
+    except asyncio.TimeoutError:
+        return False
+    event.clear()
+    return True
@@ -5,28 +5,363 @@ RYB080I BLE Module - Minimal Version
 import machine
 import time
 from machine import Pin, UART
-import re
+from micropython import const
 
-class SimpleBLE:
+# UART receive settings
+DEFAULT_BAUD = const(9600)  # Module power-on rate
+UART_RXBUF = const(1024)    # Driver receive buffer, holds 50 ms of scan results at 115200
+RX_CHUNK_SIZE = const(256)  # Bytes read from the UART per readinto(), several lines at once
+MAX_LINE_LEN = const(128)   # Longer lines are dropped and counted as overflow
+
+# uart_trace record kinds
+TRACE_RX = const(0)
+TRACE_TX = const(1)
+TRACE_BAUD = const(2)
+
+# Command status
+CMD_QUEUED = const(0)
+CMD_SENT = const(1)
+CMD_OK = const(2)
+CMD_ERROR = const(3)
+CMD_TIMEOUT = const(4)
+CMD_DROPPED = const(5)  # Never sent: queue full, or expired while waiting
+
+# Command priorities, lower goes first
+PRIO_CONFIG = const(0)    # Settings and provisioning
+PRIO_NORMAL = const(1)
+PRIO_PERIODIC = const(2)  # Scans and state checks, expire when the module stalls
+PRIORITY_LEVELS = const(3)
+
+# Command engine settings
+DEFAULT_CMD_TIMEOUT = const(1000)  # Time allowed for a reply after sending (ms)
+WAKE_DELAY_MS = const(10)          # Delay between wake-up byte and command
+AWAKE_WINDOW_MS = const(1000)      # Module counts as awake this long after traffic
+MAX_RESULTS = const(16)            # Completed commands kept for lookup
+QUEUE_SLOTS = const(8)             # Queued commands per priority
+PERIODIC_MAX_AGE_MS = const(5000)  # Queued periodic commands older than this are dropped
+
+# Scan result batching
+SCAN_WINDOW_MS = const(1000)  # Longest a window collects repeat sightings before delivery (0 = no batching)
+SCAN_QUIET_MS = const(100)    # Burst counts as finished after this long without results
+MAX_SCAN_BATCH = const(64)    # Distinct devices per batch, a full batch is delivered early
+KEEP_STRONGEST = const(0)     # Duplicate address: keep the highest RSSI of the window
+KEEP_LATEST = const(1)        # Duplicate address: keep the last report
+
+# Advertising supervision
+ADV_CHECK_MS = const(25000)  # Query the advertising state this often (0 = only on module events)
+ADV_RETRY_MS = const(1000)   # First retry after a failed enable, doubles up to ADV_CHECK_MS
+ADV_POLL_MS = const(50)      # Result polling while a supervisor command is out
+ADV_POWER_KEY = "CRFOP"      # Setting for the TX power level
+
+# Advertising state
+ADV_UNKNOWN = const(0)
+ADV_ON = const(1)
+ADV_OFF = const(2)
+
+# Supervisor command kinds
+_ADV_ENABLE = const(0)
+_ADV_CHECK = const(1)
+_ADV_SETTING = const(2)
+
+def parse_rssi(buf, start, end):
+    """Parse the first (optionally negative) integer in buf[start:end] as RSSI"""
+    i = start
+    while i < end and not (0x30 <= buf[i] <= 0x39):
+        i += 1
+    if i == end:
+        return None
+    
+    # A '-' before the digits (spaces allowed in between) makes it negative
+    j = i - 1
+    while j >= start and buf[j] == 0x20:
+        j -= 1
+    negative = j >= start and buf[j] == 0x2D
+    
+    value = 0
+    while i < end and 0x30 <= buf[i] <= 0x39:
+        value = value * 10 + buf[i] - 0x30
+        i += 1
+    if negative:
+        value = -value
+    
+    if -150 <= value <= 0:
+        return value
+    return None
+
+class ScanRecord:
+    """Scan result fields as offsets into the received line
+    
+    One record is reused for every line, so copy what you need to keep.
+    """
+    __slots__ = ('line', 'addr_start', 'addr_end', 'name_start', 'name_end', 'rssi')
+    
     def __init__(self):
-        self.uart = UART(1, baudrate=9600, tx=Pin(4), rx=Pin(5))
+        self.line = b''
+        self.addr_start = 0
+        self.addr_end = 0
+        self.name_start = 0
+        self.name_end = 0
+        self.rssi = None
+    
+    def address(self):
+        """Device address hex digits as bytes"""
+        return self.line[self.addr_start:self.addr_end]
+    
+    def name(self):
+        """Device name as str"""
+        return self.line[self.name_start:self.name_end].decode('utf-8')
+    
+    def name_contains(self, pattern):
+        """Case-insensitive substring match against an upper-case bytes pattern
+        
+        Compares in place, ASCII letters only, so nothing is allocated.
+        """
+        n = len(pattern)
+        if not n:
+            return True
+        line = self.line
+        first = pattern[0]
+        i = self.name_start
+        last = self.name_end - n
+        while i <= last:
+            c = line[i]
+            if c == first or (0x61 <= c <= 0x7A and c - 0x20 == first):
+                j = 1
+                while j < n:
+                    c = line[i + j]
+                    if 0x61 <= c <= 0x7A:
+                        c -= 0x20
+                    if c != pattern[j]:
+                        break
+                    j += 1
+                else:
+                    return True
+            i += 1
+        return False
+
+class QueuedCommand:
+    """Command waiting in a CommandRing slot"""
+    __slots__ = ('id', 'command', 'timeout', 'queued', 'max_age')
+    
+    def __init__(self):
+        self.id = 0
+        self.command = None
+        self.timeout = 0
+        self.queued = 0     # ticks_ms, refreshed when a duplicate is merged in
+        self.max_age = 0    # ms the command may wait, 0 = no limit
+
+class CommandRing:
+    """Preallocated FIFO ring of command slots per priority
+    
+    pop() takes the oldest command of the highest priority. Nothing is
+    allocated after construction; a full ring rejects new commands.
+    """
+    
+    def __init__(self, capacity=QUEUE_SLOTS, levels=PRIORITY_LEVELS):
+        self.capacity = capacity
+        self._slots = [[QueuedCommand() for _ in range(capacity)] for _ in range(levels)]
+        self._head = [0] * levels
+        self._count = [0] * levels
+        self.depth = 0
+        # Statistics
+        self.max_depth = 0
+        self.coalesced = 0  # Duplicates merged into a pending command
+        self.dropped = 0    # Rejected because their priority was full
+        self.expired = 0    # Waited longer than their max age
+    
+    def __len__(self):
+        return self.depth
+    
+    def find(self, command):
+        """Pending slot with the same command text, or None"""
+        capacity = self.capacity
+        for level in range(len(self._slots)):
+            slots = self._slots[level]
+            head = self._head[level]
+            for i in range(self._count[level]):
+                slot = slots[(head + i) % capacity]
+                if slot.command == command:
+                    return slot
+        return None
+    
+    def push(self, priority, cmd_id, command, timeout, now, max_age=0):
+        """Queue a command, returns False when its priority is full"""
+        count = self._count[priority]
+        if count >= self.capacity:
+            self.dropped += 1
+            return False
+        slot = self._slots[priority][(self._head[priority] + count) % self.capacity]
+        slot.id = cmd_id
+        slot.command = command
+        slot.timeout = timeout
+        slot.queued = now
+        slot.max_age = max_age
+        self._count[priority] = count + 1
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+        return True
+    
+    def peek(self):
+        """Next command to send, or None"""
+        for level in range(len(self._slots)):
+            if self._count[level]:
+                return self._slots[level][self._head[level]]
+        return None
+    
+    def pop(self):
+        """Remove the command peek() returned"""
+        for level in range(len(self._slots)):
+            if self._count[level]:
+                slot = self._slots[level][self._head[level]]
+                self._head[level] = (self._head[level] + 1) % self.capacity
+                self._count[level] -= 1
+                self.depth -= 1
+                return slot  # Valid until the next push
+        return None
+
+class ScanBatch:
+    """Scan results of one window, one record per device address
+    
+    First sightings of an address go to fresh, which SimpleBLE delivers at
+    the end of every received chunk. Repeat sightings only update the kept
+    record, and the records they changed wait in updated until the window
+    closes. Records and lists are reused for every window, so copy what
+    you need to keep after the callback returns.
+    """
+    
+    def __init__(self, capacity=MAX_SCAN_BATCH, keep=KEEP_STRONGEST):
+        self.capacity = capacity
+        self.keep = keep
+        self._pool = [ScanRecord() for _ in range(capacity)]
+        self._index = {}    # address bytes -> record
+        self.results = []   # Records in order of first appearance
+        self.fresh = []     # First sightings, not yet delivered
+        self.updated = []   # Records changed by a repeat sighting, not yet delivered
+        self.start = 0      # ticks_ms of the first result in the window
+        self.last = 0       # ticks_ms of the latest result
+        # Statistics
+        self.lines = 0
+        self.duplicates = 0
+        self.batches = 0
+    
+    def __len__(self):
+        return len(self.results)
+    
+    def is_full(self):
+        return len(self.results) >= self.capacity
+    
+    def add(self, record, now):
+        """Merge a parsed scan line into the window"""
+        self.lines += 1
+        self.last = now
+        address = record.address()
+        kept = self._index.get(address)
+        if kept is None:
+            if not self.results:
+                self.start = now
+            kept = self._pool[len(self.results)]
+            self.results.append(kept)
+            self.fresh.append(kept)
+            self._index[address] = kept
+        else:
+            self.duplicates += 1
+            rssi = record.rssi
+            if self.keep == KEEP_STRONGEST and (rssi is None or
+                                                (kept.rssi is not None and rssi <= kept.rssi)):
+                return
+            if kept not in self.updated and kept not in self.fresh:
+                self.updated.append(kept)
+        
+        kept.line = record.line
+        kept.addr_start = record.addr_start
+        kept.addr_end = record.addr_end
+        kept.name_start = record.name_start
+        kept.name_end = record.name_end
+        kept.rssi = record.rssi
+    
+    def due_ms(self, now, window_ms, quiet_ms=SCAN_QUIET_MS):
+        """Milliseconds until the window should be delivered, -1 while empty"""
+        if not self.results:
+            return -1
+        wait = min(window_ms - time.ticks_diff(now, self.start),
+                   quiet_ms - time.ticks_diff(now, self.last))
+        return wait if wait > 0 else 0
+    
+    def clear(self):
+        self.results.clear()
+        self.fresh.clear()
+        self.updated.clear()
+        self._index.clear()
+        self.batches += 1
+
+class SimpleBLE:
+    TRACE_PATH = None  # Record the UART traffic of every new instance here (see uart_trace)
+    
+    def __init__(self, uart=None, scan_window_ms=SCAN_WINDOW_MS, scan_keep=KEEP_STRONGEST,
+                 baudrate=DEFAULT_BAUD):
+        if uart is None:
+            uart = UART(1, baudrate=baudrate, tx=Pin(4), rx=Pin(5), rxbuf=UART_RXBUF)
+        self.uart = uart
+        self.baudrate = baudrate
         self.callbacks = {}
         self.connection_state = {
             'current_rssi': -100,
             'last_rssi_time': 0
         }
-        self.response_buffer = ""
-        self.command_queue = []
+        # Line assembly buffers (preallocated)
+        self._rx_buf = bytearray(RX_CHUNK_SIZE)
+        # MicroPython's bytearray has no find(), bytes from read() keep the newline search in C
+        self._rx_find = hasattr(self._rx_buf, 'find')
+        self._line_buf = bytearray(MAX_LINE_LEN)
+        self._line_view = memoryview(self._line_buf)
+        self._line_len = 0
+        self._line_overflow = False
+        self.rx_overflow = 0       # Bytes dropped from over-long lines
+        self.rx_decode_errors = 0  # Lines dropped for invalid UTF-8
+        self.command_queue = CommandRing()
         self.command_id = 0
+        # Command engine: sent commands waiting for a reply, completed results
+        self.in_flight = []
+        self.max_in_flight = 1
+        self.command_results = {}
+        self.awake_window_ms = AWAKE_WINDOW_MS
+        self._last_activity = None  # ticks_ms of the last UART traffic
+        self._wake_time = None      # ticks_ms the wake-up byte was sent
+        self.wake_count = 0
         self.scan_stats = {'total_scans': 0, 'found_count': 0}
+        # Reused for every scan result callback
+        self._scan_record = ScanRecord()
+        self._scan_list = [self._scan_record]
+        # New addresses are delivered at once, repeat sightings once per window
+        self.scan_window_ms = scan_window_ms
+        self.scan_batch = ScanBatch(keep=scan_keep) if scan_window_ms else None
+        self.trace = None
+        if self.TRACE_PATH:
+            self.start_trace(self.TRACE_PATH)
         time.sleep(0.1)
     
     def set_debug(self, enabled):
         pass  # Debug removed for minimal version
     
     def set_callback(self, event_type, callback_func):
+        """Make callback_func the only callback for the event"""
         self.callbacks[event_type] = callback_func
     
+    def add_callback(self, event_type, callback_func):
+        """Call callback_func after the callbacks already set for the event"""
+        previous = self.callbacks.get(event_type)
+        if previous is None:
+            self.callbacks[event_type] = callback_func
+            return
+        
+        def chained(*args):
+            try:
+                previous(*args)
+            finally:
+                callback_func(*args)
+        self.callbacks[event_type] = chained
+    
     def _trigger_callback(self, event_type, *args):
         callback = self.callbacks.get(event_type)
         if callback:
@@ -36,94 +371,377 @@ class SimpleBLE:
                 pass
     
     def parse_rssi_from_text(self, rssi_text):
-        """Extract RSSI value from text"""
+        """Extract RSSI value from text (str or bytes)"""
+        if isinstance(rssi_text, str):
+            rssi_text = rssi_text.encode()
+        return parse_rssi(rssi_text, 0, len(rssi_text))
+    
+    def start_trace(self, path):
+        """Record UART RX/TX with timestamps to a trace file"""
+        from uart_trace import TraceRecorder
+        self.stop_trace()
+        self.trace = TraceRecorder(path)
+    
+    def stop_trace(self):
+        if self.trace:
+            self.trace.close()
+            self.trace = None
+    
+    def _write(self, data):
+        if self.trace:
+            self.trace.record(TRACE_TX, data)
+        self.uart.write(data)
+    
+    def set_baudrate(self, baudrate):
+        """Switch the UART rate, dropping anything received at the old one"""
+        uart = self.uart
         try:
-            match = re.search(r'(-?\s*\d+)', rssi_text)
-            if match:
-                rssi = int(match.group(1).replace(" ", ""))
-                if -150 <= rssi <= 0:
-                    return rssi
-        except:
+            uart.flush()
+        except AttributeError:
             pass
-        return None
+        uart.init(baudrate=baudrate)
+        while uart.any():
+            if not uart.read():
+                break
+        self._line_len = 0
+        self._line_overflow = False
+        self.baudrate = baudrate
+        if self.trace:
+            self.trace.record(TRACE_BAUD, str(baudrate).encode())
     
     def process_uart_data(self):
         """Process incoming UART data"""
-        if self.uart.any():
-            try:
-                data = self.uart.read().decode('utf-8')
-                self.response_buffer += data
-                
-                while '\n' in self.response_buffer:
-                    line_end = self.response_buffer.find('\n')
-                    line = self.response_buffer[:line_end].strip()
-                    self.response_buffer = self.response_buffer[line_end + 1:]
-                    
-                    if line:
-                        self._process_line(line)
-            except:
-                pass
+        uart = self.uart
+        rx = self._rx_buf
+        
+        while uart.any():
+            if self._rx_find:
+                count = uart.readinto(rx)
+                if not count:
+                    break
+                self.feed(rx, count)
+            else:
+                data = uart.read(RX_CHUNK_SIZE)
+                if not data:
+                    break
+                self.feed(data)
+        
+        if self.scan_batch:
+            self.poll_scan_window()
     
-    def _process_line(self, line):
-        """Process received line"""
-        # Scan result detection
-        if line.startswith('+') and ':0x' in line and ',' in line:
-            device_info = self._parse_scan_result(line)
-            if device_info:
-                self._trigger_callback('scan_result', [device_info])
-        else:
-            self._trigger_callback('response', None, line)
+    def feed(self, data, count=None):
+        """Assemble lines from received bytes and process complete ones"""
+        if count is None:
+            count = len(data)
+        if count:
+            self._last_activity = time.ticks_ms()
+            if self.trace:
+                self.trace.record(TRACE_RX, data, count)
+        view = self._line_view
+        length = self._line_len
+        overflow = self._line_overflow
+        find = getattr(data, 'find', None)  # Missing on MicroPython's bytearray and memoryview
+        src = memoryview(data)
+        whole = data if type(data) is bytes else src  # bytes can be parsed in place
+        
+        pos = 0
+        while pos < count:
+            # Segment up to the next newline (or the end of the data)
+            if find:
+                end = find(b'\n', pos, count)
+                if end < 0:
+                    end = count
+            else:
+                end = pos
+                while end < count and data[end] != 0x0A:
+                    end += 1
+            size = end - pos
+            
+            if end == count:
+                # No newline yet: keep the start of the line for the next chunk
+                if overflow:
+                    self.rx_overflow += size
+                elif length + size <= MAX_LINE_LEN:
+                    view[length:length + size] = src[pos:end]
+                    length += size
+                else:
+                    # Line too long: drop it up to the next newline
+                    overflow = True
+                    self.rx_overflow += length + size
+                    length = 0
+                break
+            
+            if overflow:
+                self.rx_overflow += size
+            elif length + size > MAX_LINE_LEN:
+                self.rx_overflow += length + size
+            elif length:
+                view[length:length + size] = src[pos:end]
+                self._emit_line(view, 0, length + size)
+            else:
+                self._emit_line(whole, pos, end)  # Whole line in this chunk
+            overflow = False
+            length = 0
+            pos = end + 1
+        
+        self._line_len = length
+        self._line_overflow = overflow
+        
+        batch = self.scan_batch
+        if batch and batch.fresh:
+            self.deliver_fresh()
     
-    def _parse_scan_result(self, line):
-        """Parse scan result line"""
+    def _emit_line(self, buf, start, end):
+        """Strip buf[start:end] and hand it on, copied unless buf is bytes"""
+        while start < end and buf[start] <= 0x20:
+            start += 1
+        while end > start and buf[end - 1] <= 0x20:
+            end -= 1
+        
+        if end <= start:
+            return
+        if type(buf) is not bytes:
+            # Reused buffer: the scan record must not point into it
+            buf = bytes(buf[start:end])
+            start = 0
+            end = len(buf)
+        self._process_line(buf, start, end)
+    
+    def _process_line(self, line, start=0, end=None):
+        """Process the received line line[start:end] (bytes)"""
+        if end is None:
+            end = len(line)
+        # Scan result detection
+        if line[start] == 0x2B and self._parse_scan_result(line, start, end):  # '+'
+            batch = self.scan_batch
+            if batch is None:
+                self._trigger_callback('scan_result', self._scan_list)
+            else:
+                if batch.is_full():
+                    self.flush_scan_batch()
+                batch.add(self._scan_record, time.ticks_ms())
+            return
+        
+        if start or end < len(line):
+            line = line[start:end]
         try:
-            parts = line.split(',')
-            if len(parts) >= 2:
-                return {
-                    "name": parts[1].strip(),
-                    "rssi": parts[2].strip() if len(parts) > 2 else "Unknown"
-                }
-        except:
-            pass
-        return None
+            text = line.decode('utf-8')
+        except UnicodeError:
+            self.rx_decode_errors += 1
+            return
+        self._handle_response(text)
+    
+    def _handle_response(self, text):
+        """Match a reply line to the oldest command waiting for one"""
+        if not self.in_flight:
+            self._trigger_callback('response', None, text)
+            return
+        
+        cmd = self.in_flight[0]
+        if text == 'OK' or text == '+OK':
+            self._complete_command(CMD_OK)
+        elif text.startswith('ERROR') or text.startswith('+ERR'):
+            self._complete_command(CMD_ERROR)
+        elif cmd['response'] is None:
+            cmd['response'] = text  # Value reply, e.g. '+NAME=PicoKey'
+        self._trigger_callback('response', cmd['id'], text)
+    
+    def _complete_command(self, status):
+        """Finish the oldest in-flight command and store its result"""
+        cmd = self.in_flight.pop(0)
+        cmd['status'] = status
+        self._store_result(cmd)
+    
+    def _store_result(self, cmd):
+        results = self.command_results
+        results[cmd['id']] = cmd
+        if len(results) > MAX_RESULTS:
+            del results[min(results)]
+        self._trigger_callback('command_done', cmd)
+    
+    def _parse_scan_result(self, line, start=0, end=None):
+        """Tokenize '+...:0x<address>,<name>[,<rssi>]' in line[start:end] into the scan record"""
+        if end is None:
+            end = len(line)
+        start = line.find(b':0x', start, end)
+        if start < 0:
+            return False
+        addr_start = start + 3
+        addr_end = line.find(b',', addr_start, end)
+        if addr_end <= addr_start:
+            return False
+        
+        name_start = addr_end + 1
+        name_end = line.find(b',', name_start, end)
+        rssi_start = name_end + 1
+        if name_end < 0:
+            name_end = end
+            rssi_start = end
+        
+        # Trim spaces around the name
+        while name_start < name_end and line[name_start] == 0x20:
+            name_start += 1
+        while name_end > name_start and line[name_end - 1] == 0x20:
+            name_end -= 1
+        
+        record = self._scan_record
+        record.line = line
+        record.addr_start = addr_start
+        record.addr_end = addr_end
+        record.name_start = name_start
+        record.name_end = name_end
+        record.rssi = parse_rssi(line, rssi_start, end)
+        return True
+    
+    def scan_batch_due_ms(self, now=None):
+        """Milliseconds until the pending scan batch is delivered, -1 if none"""
+        if not self.scan_batch:
+            return -1
+        if now is None:
+            now = time.ticks_ms()
+        return self.scan_batch.due_ms(now, self.scan_window_ms)
+    
+    def poll_scan_window(self, now=None):
+        """Deliver the scan batch once the burst went quiet or the window ran out"""
+        if self.scan_batch_due_ms(now) == 0:
+            self.flush_scan_batch()
+    
+    def deliver_fresh(self):
+        """Hand the devices first seen in this window to the callback"""
+        fresh = self.scan_batch.fresh
+        self._trigger_callback('scan_result', fresh)
+        fresh.clear()
+    
+    def flush_scan_batch(self):
+        """Close the scan window, handing its updated records to the callback as one list"""
+        batch = self.scan_batch
+        if not batch:
+            return
+        if batch.fresh:
+            self.deliver_fresh()
+        if batch.updated:
+            self._trigger_callback('scan_result', batch.updated)
+        batch.clear()
+    
+    def _is_awake(self, now):
+        last = self._last_activity
+        return last is not None and time.ticks_diff(now, last) < self.awake_window_ms
     
     def process_command_queue(self):
-        """Process command queue"""
-        current_time = time.ticks_ms()
+        """Send queued commands and expire unanswered ones (non-blocking)"""
+        now = time.ticks_ms()
         
-        if self.command_queue and self.uart:
-            cmd = self.command_queue.pop(0)
+        # Expire commands whose reply never came
+        while self.in_flight:
+            cmd = self.in_flight[0]
+            if time.ticks_diff(now, cmd['sent_time']) < cmd['timeout']:
+                break
+            self._complete_command(CMD_TIMEOUT)
+        
+        queue = self.command_queue
+        while queue and len(self.in_flight) < self.max_in_flight:
+            slot = queue.peek()
+            if slot.max_age and time.ticks_diff(now, slot.queued) >= slot.max_age:
+                # Stale (module stalled): drop it rather than send it late
+                queue.pop()
+                queue.expired += 1
+                self._drop_command(slot.id, slot.command, slot.queued, slot.timeout)
+                continue
+            
+            # Wake the module only if it has been quiet
+            if not self._is_awake(now):
+                if self._wake_time is None:
+                    try:
+                        self._write(b'A')
+                    except:
+                        pass
+                    self._wake_time = now
+                    self.wake_count += 1
+                    return
+                if time.ticks_diff(now, self._wake_time) < WAKE_DELAY_MS:
+                    return
+            self._wake_time = None
+            
+            queue.pop()
+            full_command = slot.command
+            if not full_command.endswith('\r\n'):
+                full_command += '\r\n'
             
             try:
-                self.uart.write(b'A')
-                time.sleep(0.01)
-                
-                full_command = cmd['command']
-                if not full_command.endswith('\r\n'):
-                    full_command += '\r\n'
-                
-                self.uart.write(full_command.encode())
-                self.uart.flush()
+                self._write(full_command.encode())
             except:
                 pass
+            
+            cmd = self._command_dict(slot.id, slot.command, slot.queued, slot.timeout)
+            cmd['status'] = CMD_SENT
+            cmd['sent_time'] = now
+            self.in_flight.append(cmd)
+            self._last_activity = now
     
-    def send_command_async(self, command):
-        """Queue command for sending"""
-        cmd_id = self.command_id
-        self.command_id += 1
-        
-        self.command_queue.append({
+    def _command_dict(self, cmd_id, command, timestamp, timeout):
+        """In-flight and result record, made when a command leaves the queue"""
+        return {
             'id': cmd_id,
             'command': command,
-            'timestamp': time.ticks_ms()
-        })
+            'timestamp': timestamp,
+            'timeout': timeout,
+            'status': CMD_QUEUED,
+            'sent_time': 0,
+            'response': None
+        }
+    
+    def _drop_command(self, cmd_id, command, timestamp, timeout):
+        cmd = self._command_dict(cmd_id, command, timestamp, timeout)
+        cmd['status'] = CMD_DROPPED
+        self._store_result(cmd)
+    
+    def send_command_async(self, command, timeout_ms=DEFAULT_CMD_TIMEOUT,
+                           priority=PRIO_NORMAL, max_age_ms=None):
+        """Queue command for sending, returns its id
         
+        A command equal to one still queued is merged into it and gets its
+        id. max_age_ms defaults to PERIODIC_MAX_AGE_MS for PRIO_PERIODIC
+        and to no limit otherwise.
+        """
+        now = time.ticks_ms()
+        queue = self.command_queue
+        pending = queue.find(command)
+        if pending is not None:
+            pending.queued = now  # Still wanted: restart its expiry
+            queue.coalesced += 1
+            return pending.id
+        
+        cmd_id = self.command_id
+        self.command_id += 1
+        if max_age_ms is None:
+            max_age_ms = PERIODIC_MAX_AGE_MS if priority == PRIO_PERIODIC else 0
+        if not queue.push(priority, cmd_id, command, timeout_ms, now, max_age_ms):
+            self._drop_command(cmd_id, command, now, timeout_ms)
         return cmd_id
     
+    def get_command_result(self, cmd_id):
+        """Completed command dict ('status', 'response', ...) or None if pending"""
+        return self.command_results.get(cmd_id)
+    
+    def wait_command(self, cmd_id, timeout_ms=None):
+        """Poll UART and queue until a command completes, returns its result"""
+        start = time.ticks_ms()
+        while True:
+            self.process_uart_data()
+            self.process_command_queue()
+            
+            result = self.command_results.get(cmd_id)
+            if result:
+                return result
+            if timeout_ms is not None and time.ticks_diff(time.ticks_ms(), start) >= timeout_ms:
+                return None
+            time.sleep_ms(1)
+    
     def start_scan_async(self):
         """Start BLE scan"""
+        self.flush_scan_batch()  # The previous scan is complete
         self.scan_stats['total_scans'] += 1
-        return self.send_command_async("AT+SCAN")
+        return self.send_command_async("AT+SCAN", priority=PRIO_PERIODIC)
     
     def start_advertising_async(self):
         """Start advertising"""
@@ -170,4 +788,288 @@ class SimpleAutoScanManager:
         self.running = True
     
     def stop(self):
-        self.running = False
\ No newline at end of file
+        self.running = False
+
+class AdaptiveScanScheduler:
+    """Scan scheduler that speeds up near a key and backs off when empty
+    
+    Same interface as SimpleAutoScanManager. Call note_detection() for
+    every authorized key seen so the next interval can adapt.
+    """
+    
+    def __init__(self, ble_module, rssi_threshold, min_interval_ms=1000,
+                 max_interval_ms=3000, base_interval_ms=3000, near_margin_db=5,
+                 scan_time_ms=500, duty_cycle=0.5, clock=None):
+        if not 0 < duty_cycle <= 1:
+            raise ValueError("duty_cycle must be in (0, 1]")
+        self.ble = ble_module
+        self.rssi_threshold = rssi_threshold
+        self.near_margin_db = near_margin_db
+        self.max_interval_ms = max_interval_ms
+        self.base_interval_ms = base_interval_ms
+        # The duty-cycle budget sets a floor on the interval
+        self.min_interval_ms = max(min_interval_ms, int(scan_time_ms / duty_cycle))
+        self.clock = clock or time.ticks_ms
+        self.interval_ms = self.min_interval_ms
+        self.running = False
+        
+        now = self.clock()
+        self.last_scan_time = now
+        self._scan_due = True
+        self._present = False
+        self._best_rssi = None      # Strongest key RSSI since the last scan
+        self._last_empty_scan = None
+        
+        # Statistics
+        self.start_time = now
+        self.scan_count = 0
+        self.detect_count = 0
+        self.detect_gap_total = 0
+    
+    def should_scan(self):
+        if not self.running:
+            return False
+        return self._scan_due or self.time_to_next_ms() <= 0
+    
+    def time_to_next_ms(self):
+        """Milliseconds until the next scan is due"""
+        elapsed = time.ticks_diff(self.clock(), self.last_scan_time)
+        return self.interval_ms - elapsed
+    
+    def note_detection(self, rssi):
+        """Record an authorized key seen in the current scan"""
+        if self._best_rssi is None or rssi > self._best_rssi:
+            self._best_rssi = rssi
+        
+        if not self._present:
+            # Key just appeared: count how long it may have gone unseen
+            self._present = True
+            self.detect_count += 1
+            if self._last_empty_scan is not None:
+                self.detect_gap_total += time.ticks_diff(self.clock(), self._last_empty_scan)
+            self.interval_ms = self.min_interval_ms
+    
+    def _next_interval(self):
+        """Pick the interval after a scan from what the previous one found"""
+        rssi = self._best_rssi
+        if rssi is None:
+            # Nothing seen: back off exponentially
+            self._present = False
+            return min(self.interval_ms * 2, self.max_interval_ms)
+        if rssi <= self.rssi_threshold + self.near_margin_db:
+            return self.min_interval_ms  # Locked or just unlocked: decision may change
+        # Well above the threshold: stay unlocked, scan at the base rate
+        return max(self.min_interval_ms, min(self.base_interval_ms, self.max_interval_ms))
+    
+    def trigger_scan(self):
+        if self.ble:
+            # Results still waiting in the scan window belong to the previous scan
+            self.ble.flush_scan_batch()
+        now = self.clock()
+        if self.scan_count:
+            if self._best_rssi is None:
+                self._last_empty_scan = self.last_scan_time
+            self.interval_ms = self._next_interval()
+        self._best_rssi = None
+        self._scan_due = False
+        self.last_scan_time = now
+        self.scan_count += 1
+        if self.ble:
+            self.ble.start_scan_async()
+    
+    def stats(self):
+        elapsed = time.ticks_diff(self.clock(), self.start_time)
+        return {
+            'scans': self.scan_count,
+            'scans_per_sec': self.scan_count * 1000 / elapsed if elapsed > 0 else 0,
+            'interval_ms': self.interval_ms,
+            'detections': self.detect_count,
+            # Upper bound on time-to-detect: last empty scan to detection
+            'mean_detect_gap_ms': self.detect_gap_total // self.detect_count if self.detect_count else 0
+        }
+    
+    def start(self):
+        self.running = True
+    
+    def stop(self):
+        self.running = False
+
+class AdvertisingSupervisor:
+    """Keeps the module advertising, re-enabling it only when it stopped
+    
+    The state comes from the replies: OK to AT+ADVEN=1, the periodic
+    AT+ADVEN? query and unsolicited '+ADVEN=' lines. Any other unsolicited
+    line (module reset, connection events) triggers an early query.
+    Call update() from the main loop.
+    """
+    
+    def __init__(self, ble_module, check_interval_ms=ADV_CHECK_MS,
+                 retry_ms=ADV_RETRY_MS, clock=None):
+        self.ble = ble_module
+        self.check_interval_ms = check_interval_ms
+        self.retry_ms = retry_ms
+        self.clock = clock or time.ticks_ms
+        self.running = False
+        self.state = ADV_UNKNOWN
+        self.settings = {}       # Settings the module acknowledged
+        self.notify = None       # Called when update() should run early
+        self._pending = None     # (cmd_id, kind, setting) of the command out
+        self._queued = []        # (key, value) settings waiting to be sent
+        self._retry_wait = retry_ms
+        
+        now = self.clock()
+        self._next = now         # ticks_ms of the next query or enable, None = on events only
+        self._off_since = now
+        
+        # Statistics
+        self.start_time = now
+        self.enable_count = 0      # AT+ADVEN=1 sent
+        self.readvertise_count = 0 # Enables after advertising had been on
+        self.check_count = 0
+        self.error_count = 0
+        self.off_ms = 0            # Time not advertising, up to the last change
+        self._was_on = False
+        
+        ble_module.add_callback('response', self._on_response)
+    
+    def start(self):
+        """Begin supervising, advertising is enabled on the next update()"""
+        self.running = True
+        self._next = self.clock()
+        self._wake()
+    
+    def stop(self):
+        self.running = False
+    
+    def set_tx_power(self, level):
+        """Queue a TX power change (module power level)"""
+        self._queue_setting(ADV_POWER_KEY, level)
+    
+    def _queue_setting(self, key, value):
+        value = str(value)
+        if self.settings.get(key) == value:
+            return
+        self._queued = [item for item in self._queued if item[0] != key]
+        self._queued.append((key, value))
+        self._wake()
+    
+    def _wake(self):
+        if self.notify:
+            self.notify()
+    
+    def _set_state(self, state, now):
+        if state == self.state:
+            return
+        if state == ADV_ON:
+            self.off_ms += time.ticks_diff(now, self._off_since)
+            self._was_on = True
+        elif self.state == ADV_ON:
+            self._off_since = now
+        self.state = state
+    
+    def _schedule(self, now, delay_ms):
+        self._next = time.ticks_add(now, delay_ms) if delay_ms else None
+    
+    def _send(self, command, kind, setting=None):
+        if kind == _ADV_SETTING:
+            priority = PRIO_CONFIG
+        elif kind == _ADV_CHECK:
+            priority = PRIO_PERIODIC
+        else:
+            priority = PRIO_NORMAL
+        cmd_id = self.ble.send_command_async(command, priority=priority)
+        self._pending = (cmd_id, kind, setting)
+    
+    def _on_response(self, cmd_id, text):
+        now = self.clock()
+        if text.startswith('+ADVEN='):
+            # The module's state, even if some command was waiting for a reply
+            self._set_state(ADV_ON if text[7:].strip() == '1' else ADV_OFF, now)
+            if self.state == ADV_ON:
+                return
+        elif cmd_id is not None:
+            return  # Reply to a command, handled through its result
+        # Stopped, or something happened that may have stopped it: look now
+        self._next = now
+        self._wake()
+    
+    def _finish(self, kind, setting, result, now):
+        ok = result['status'] == CMD_OK
+        if not ok:
+            self.error_count += 1
+        
+        if kind == _ADV_SETTING:
+            if ok:
+                self.settings[setting[0]] = setting[1]
+            return
+        
+        if kind == _ADV_CHECK and ok:
+            response = result['response'] or ''
+            if response.startswith('+ADVEN='):
+                ok = response[7:].strip() == '1'
+        
+        if ok:
+            self._set_state(ADV_ON, now)
+            self._retry_wait = self.retry_ms
+            self._schedule(now, self.check_interval_ms)
+        elif kind == _ADV_CHECK and result['status'] == CMD_OK:
+            self._set_state(ADV_OFF, now)  # Reported off: enable right away
+            self._next = now
+        else:
+            # No answer or an error: state unknown, enable again after a backoff
+            self._set_state(ADV_UNKNOWN, now)
+            self._next = time.ticks_add(now, self._retry_wait)
+            limit = self.check_interval_ms or self.retry_ms * 32
+            self._retry_wait = min(self._retry_wait * 2, limit)
+    
+    def update(self):
+        """Collect the last command's result and send the next one when due"""
+        now = self.clock()
+        pending = self._pending
+        if pending:
+            result = self.ble.get_command_result(pending[0])
+            if result is None:
+                return
+            self._pending = None
+            self._finish(pending[1], pending[2], result, now)
+        
+        if not self.running:
+            return
+        if self._queued:
+            key, value = self._queued.pop(0)
+            self._send(f"AT+{key}={value}", _ADV_SETTING, (key, value))
+        elif self._next is not None and time.ticks_diff(now, self._next) >= 0:
+            if self.state == ADV_ON:
+                self.check_count += 1
+                self._send("AT+ADVEN?", _ADV_CHECK)
+            else:
+                self.enable_count += 1
+                if self._was_on:
+                    self.readvertise_count += 1
+                self._send("AT+ADVEN=1", _ADV_ENABLE)
+    
+    def time_to_next_ms(self):
+        """Milliseconds until update() has something to do, -1 = wait for notify"""
+        if self._pending:
+            return ADV_POLL_MS
+        if self._queued:
+            return 0
+        if self._next is None:
+            return -1
+        wait = time.ticks_diff(self._next, self.clock())
+        return wait if wait > 0 else 0
+    
+    def stats(self):
+        now = self.clock()
+        off_ms = self.off_ms
+        if self.state != ADV_ON:
+            off_ms += time.ticks_diff(now, self._off_since)
+        return {
+            'state': self.state,
+            'enables': self.enable_count,
+            'readvertises': self.readvertise_count,
+            'checks': self.check_count,
+            'errors': self.error_count,
+            'off_ms': off_ms,
+            'uptime_ms': time.ticks_diff(now, self.start_time)
+        }
@@ -24,6 +24,13 @@ SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
 
+# Dirty regions are tracked and sent in column segments of this width
+SEG_WIDTH = const(16)
+# Most segments sent in one I2C data transaction (128 bytes)
+MAX_CHUNK_SEGS = const(8)
+# Segments sent per flush_step() chunk in incremental mode
+FLUSH_CHUNK_SEGS = const(2)
+
 class SSD1306(framebuf.FrameBuffer):
     def __init__(self, width, height, external_vcc):
         self.width = width
@@ -31,6 +38,27 @@ class SSD1306(framebuf.FrameBuffer):
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        # Copy of what the panel currently shows, used to find dirty regions
+        self._shadow = bytearray(self.pages * self.width)
+        self._full_refresh = True
+        # Preallocated views of the shadow buffer, one per column segment
+        shadow_view = memoryview(self._shadow)
+        self._seg_views = [shadow_view[i:i + SEG_WIDTH] for i in range(0, len(self._shadow), SEG_WIDTH)]
+        # Preallocated address window command sequence
+        self._addr_cmds = bytearray(6)
+        self._addr_cmds[0] = SET_COL_ADDR
+        self._addr_cmds[3] = SET_PAGE_ADDR
+        # Incremental flush: committed frame being sent, and the next one
+        self._frame = bytearray(self.pages * self.width)
+        self._next = bytearray(self.pages * self.width)
+        self._flushing = False
+        self._commit_pending = False
+        self._flush_all = False  # Send every segment of this flush
+        self._flush_seg = 0      # Next segment to check
+        self.flush_chunk_segs = FLUSH_CHUNK_SEGS
+        self.frames_flushed = 0
+        self.frames_dropped = 0  # Commits replaced before they were sent
+        self.max_step_us = 0     # Longest flush_step() call
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
 
@@ -55,10 +83,7 @@ class SSD1306(framebuf.FrameBuffer):
             SET_DISP | 0x01,  # on
         ]
         
-        for cmd in init_sequence:
-            self.write_cmd(cmd)
-            # Minimal wait time
-            time.sleep_us(100)  # 0.1ms in microseconds
+        self.write_cmds(bytes(init_sequence))
         
         self.fill(0)
         self.show()
@@ -70,122 +95,388 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(SET_DISP | 0x01)
 
     def contrast(self, contrast):
-        self.write_cmd(SET_CONTRAST)
-        self.write_cmd(contrast)
+        self.write_cmds(bytes((SET_CONTRAST, contrast)))
 
     def invert(self, invert):
         self.write_cmd(SET_NORM_INV | (invert & 1))
 
+    def write_cmds(self, sequence):
+        """Send a command sequence (one command at a time by default)"""
+        for cmd in sequence:
+            self.write_cmd(cmd)
+
+    def invalidate(self):
+        """Force the next show() to resend the whole framebuffer"""
+        self._full_refresh = True
+
     def show(self):
-        x0 = 0
-        x1 = self.width - 1
+        """Send only the column segments changed since the last show()"""
+        # A blocking show supersedes any incremental flush
+        self._flushing = False
+        self._commit_pending = False
+        buf = self.buffer
+        shadow = self._shadow
+        segs = self.width // SEG_WIDTH
+        
+        if self._full_refresh:
+            # Panel RAM content is unknown, send everything once
+            self._full_refresh = False
+            shadow[:] = buf
+            self._write_window(0, self.width - 1, 0, self.pages - 1)
+            self._write_segments(0, len(self._seg_views))
+            return
+        
+        i = 0
+        for page in range(self.pages):
+            first = -1
+            last = -1
+            for seg in range(segs):
+                # Compare and copy one segment into the shadow buffer
+                end = i + SEG_WIDTH
+                dirty = False
+                while i < end:
+                    if buf[i] != shadow[i]:
+                        shadow[i] = buf[i]
+                        dirty = True
+                    i += 1
+                if dirty:
+                    if first < 0:
+                        first = seg
+                    last = seg
+            
+            if first >= 0:
+                self._write_window(first * SEG_WIDTH, (last + 1) * SEG_WIDTH - 1, page, page)
+                self._write_segments(page * segs + first, last - first + 1)
+    
+    def commit(self):
+        """Queue the framebuffer for flush_step(), drawing can go on at once
+
+        The frame is copied, so later drawing never reaches the panel
+        half-finished. A commit made during a flush waits until that
+        flush completes, replacing any commit still waiting.
+        """
+        if self._commit_pending:
+            self.frames_dropped += 1
+        self._next[:] = self.buffer
+        self._commit_pending = True
+        if not self._flushing:
+            self._start_flush()
+
+    def _start_flush(self):
+        self._frame, self._next = self._next, self._frame
+        self._commit_pending = False
+        self._flushing = True
+        self._flush_seg = 0
+        self._flush_all = self._full_refresh
+        self._full_refresh = False
+
+    def flushing(self):
+        """True while a committed frame is still being sent"""
+        return self._flushing
+
+    def flush_step(self, max_chunks=1):
+        """Send up to max_chunks runs of changed segments, True when idle"""
+        if not self._flushing:
+            return True
+        start = time.ticks_us()
+        frame = self._frame
+        shadow = self._shadow
+        segs = self.width // SEG_WIDTH
+        total = len(self._seg_views)
+        chunk_segs = self.flush_chunk_segs
+        seg = self._flush_seg
+        chunks = 0
+
+        while chunks < max_chunks:
+            # Find the next changed segment
+            first = -1
+            while seg < total:
+                i = seg * SEG_WIDTH
+                end = i + SEG_WIDTH
+                while i < end and frame[i] == shadow[i]:
+                    i += 1
+                if i < end or self._flush_all:
+                    first = seg
+                    break
+                seg += 1
+
+            if first < 0:
+                # Frame complete, start the next one if it was committed meanwhile
+                self.frames_flushed += 1
+                self._flushing = False
+                if self._commit_pending:
+                    self._start_flush()
+                    seg = 0
+                    frame = self._frame
+                    continue
+                break
+
+            # Extend the run within the page while segments differ
+            page = first // segs
+            page_end = (page + 1) * segs
+            count = 0
+            while seg < page_end and count < chunk_segs:
+                i = seg * SEG_WIDTH
+                end = i + SEG_WIDTH
+                dirty = self._flush_all
+                while i < end:
+                    if frame[i] != shadow[i]:
+                        shadow[i] = frame[i]
+                        dirty = True
+                    i += 1
+                if not dirty:
+                    break
+                count += 1
+                seg += 1
+
+            x0 = (first - page * segs) * SEG_WIDTH
+            self._write_window(x0, x0 + count * SEG_WIDTH - 1, page, page)
+            self._write_segments(first, count)
+            chunks += 1
+
+        self._flush_seg = seg
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        if elapsed > self.max_step_us:
+            self.max_step_us = elapsed
+        return not self._flushing
+
+    def flush(self):
+        """Finish any committed frame, blocking"""
+        while not self.flush_step(8):
+            pass
+
+    def _write_window(self, x0, x1, page0, page1):
+        """Set the column/page address window for the following data"""
         if self.width == 64:
             x0 += 32
             x1 += 32
         
-        # Send address setting commands in one sequence
-        self.write_cmd(SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+        cmds = self._addr_cmds
+        cmds[1] = x0
+        cmds[2] = x1
+        cmds[4] = page0
+        cmds[5] = page1
+        self.write_cmds(cmds)
+    
+    def _write_segments(self, first, count):
+        """Send consecutive shadow buffer segments"""
+        views = self._seg_views
+        for i in range(first, first + count):
+            self.write_data(views[i])
+
+# I2C link levels, fastest first: (max bytes per data transaction,
+# delay in us after data transactions over half that size, bus clock divisor)
+LINK_LEVELS = (
+    (128, 0, 1),
+    (128, 200, 1),   # Previous fast mode
+    (64, 200, 1),
+    (32, 500, 1),    # Previous safe mode
+    (32, 1000, 2),
+    (16, 2000, 4),
+)
+LINK_START_LEVEL = const(1)
+LINK_SAFE_LEVEL = const(3)
+LINK_WINDOW = const(32)       # Transfers in the rolling error window
+LINK_DOWN_ERRORS = const(3)   # Errors in the window that move one level down
+LINK_PROBE_CLEAN = const(64)  # Clean transfers before probing one level up
+LINK_PROBE_MAX = const(8192)  # Longest wait between probes after failed ones
+LINK_RETRIES = const(3)
+LINK_RETRY_DELAY_US = const(2000)
+
+class I2CLink:
+    """Sends I2C transactions, tuning chunk size, delay and clock to the error rate
+
+    Errors are kept in a rolling window of recent transfers. Too many move
+    the link one level down. After a run of clean transfers it probes one
+    level up; a probe that fails soon doubles the run needed for the next.
+    """
+
+    def __init__(self, i2c, addr, freq=None, set_freq=None, level=LINK_START_LEVEL):
+        self.i2c = i2c
+        self.addr = addr
+        self.freq = freq          # Full bus clock, needed to scale it down
+        self.set_freq = set_freq  # set_freq(hz) -> I2C object to use from then on
+        self.adaptive = True
+        self._window = bytearray(LINK_WINDOW)  # 1 = transfer failed
+        self._window_pos = 0
+        self._window_errors = 0
+        self._clean = 0
+        self._probe_clean = LINK_PROBE_CLEAN
+        self._probing = False
+        self.transfers = 0
+        self.errors = 0
+        self.retries = 0
+        self.failures = 0      # Transfers that failed every retry
+        self.level_changes = 0
+        self.bytes_sent = 0
+        self.busy_us = 0
+        self.level = -1
+        self.set_level(level)
+
+    def set_level(self, level):
+        level = max(0, min(level, len(LINK_LEVELS) - 1))
+        if level == self.level:
+            return
+        old_div = LINK_LEVELS[self.level][2] if self.level >= 0 else 1
+        self.level = level
+        self.chunk_size, self.delay_us, div = LINK_LEVELS[level]
+        if div != old_div and self.freq and self.set_freq:
+            try:
+                self.i2c = self.set_freq(self.freq // div)
+            except Exception as e:
+                print(f"I2C clock change failed: {e}")
+        self.level_changes += 1
+        for i in range(LINK_WINDOW):
+            self._window[i] = 0
+        self._window_errors = 0
+        self._clean = 0
+
+    def _record(self, failed):
+        pos = self._window_pos
+        self._window_errors += failed - self._window[pos]
+        self._window[pos] = failed
+        self._window_pos = pos + 1 if pos + 1 < LINK_WINDOW else 0
+        if not self.adaptive:
+            return
+
+        if failed:
+            if self._probing:
+                # The faster level failed soon after the probe: back off
+                self._probe_clean = min(self._probe_clean * 2, LINK_PROBE_MAX)
+                self._probing = False
+                self.set_level(self.level + 1)
+            elif self._window_errors >= LINK_DOWN_ERRORS:
+                self.set_level(self.level + 1)
+            self._clean = 0
+            return
+
+        self._clean += 1
+        if self._probing and self._clean >= LINK_WINDOW:
+            self._probing = False  # Probe survived
+            self._probe_clean = LINK_PROBE_CLEAN
+        if self._clean >= self._probe_clean and self.level > 0:
+            self.set_level(self.level - 1)
+            self._probing = True
+
+    def write(self, vector, size, data=True):
+        """Send one transaction (a writevto vector), retrying on errors"""
+        start = time.ticks_us()
+        ok = False
+        for attempt in range(LINK_RETRIES):
+            try:
+                self.i2c.writevto(self.addr, vector)
+                ok = True
+            except OSError:
+                self.errors += 1
+                self.transfers += 1
+                self._record(1)
+                if attempt < LINK_RETRIES - 1:
+                    self.retries += 1
+                    time.sleep_us(LINK_RETRY_DELAY_US)
+                continue
+            self.transfers += 1
+            self.bytes_sent += size
+            self._record(0)
+            if data and self.delay_us and size > self.chunk_size >> 1:
+                time.sleep_us(self.delay_us)
+            break
+        if not ok:
+            self.failures += 1
+        self.busy_us += time.ticks_diff(time.ticks_us(), start)
+        return ok
+
+    def bytes_per_sec(self):
+        """Effective payload rate including retries and delays"""
+        return self.bytes_sent * 1000000 // self.busy_us if self.busy_us else 0
+
+    def stats(self):
+        return {
+            'level': self.level,
+            'chunk_size': self.chunk_size,
+            'delay_us': self.delay_us,
+            'transfers': self.transfers,
+            'errors': self.errors,
+            'retries': self.retries,
+            'failures': self.failures,
+            'window_errors': self._window_errors,
+            'level_changes': self.level_changes,
+            'bytes_per_sec': self.bytes_per_sec()
+        }
 
 class SSD1306_I2C(SSD1306):
-    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False, freq=None, set_freq=None):
         self.i2c = i2c
         self.addr = addr
         self.temp = bytearray(2)
         self.write_list = [b"\x40", None]
-        # Performance settings
-        self.fast_mode = True
-        self.max_chunk_size = 128  # Larger chunk size
+        # Command stream: 0x00 control byte followed by the commands
+        self.cmd_list = [b"\x00", None]
+        self._single = [self.temp]
+        # Data vectors holding 1..MAX_CHUNK_SEGS segments, indexed by count
+        self._seg_lists = [[b"\x40"] + [None] * n for n in range(MAX_CHUNK_SEGS + 1)]
+        # Chunk size, delays and clock follow the link's error rate
+        self.link = I2CLink(i2c, addr, freq, set_freq)
         super().__init__(width, height, external_vcc)
 
+    @property
+    def fast_mode(self):
+        return self.link.level < LINK_SAFE_LEVEL
+
+    @property
+    def max_chunk_size(self):
+        return self.link.chunk_size
+
+    def _send(self, vector, size, data=True):
+        if not self.link.write(vector, size, data):
+            # Panel RAM no longer matches the shadow buffer
+            self._full_refresh = True
+
     def write_cmd(self, cmd):
         self.temp[0] = 0x80
         self.temp[1] = cmd
-        
-        if self.fast_mode:
-            try:
-                self.i2c.writeto(self.addr, self.temp)
-                # In fast mode, minimize wait time
-                time.sleep_us(50)  # 50 microseconds
-            except OSError:
-                # Switch to safe mode only on error
-                self._safe_write_cmd(cmd)
-        else:
-            self._safe_write_cmd(cmd)
-    
-    def _safe_write_cmd(self, cmd):
-        """Command transmission in safe mode"""
-        self.temp[0] = 0x80
-        self.temp[1] = cmd
-        try:
-            self.i2c.writeto(self.addr, self.temp)
-            time.sleep_us(500)
-        except OSError as e:
-            print(f"Command write error: {e}")
-            time.sleep_us(5000)  # 5ms
-            self.fast_mode = False  # Switch to safe mode
+        self._send(self._single, 2, False)
+
+    def write_cmds(self, sequence):
+        """Stream a bytes-like command sequence in one transaction"""
+        self.cmd_list[1] = sequence
+        self._send(self.cmd_list, len(sequence) + 1, False)
 
     def write_data(self, buf):
-        if self.fast_mode:
-            # Fast mode: try sending in large chunks
-            try:
-                self._write_data_fast(buf)
-            except OSError:
-                # On error, fallback to safe mode
-                self.fast_mode = False
-                self._write_data_safe(buf)
-        else:
-            self._write_data_safe(buf)
-    
-    def _write_data_fast(self, buf):
-        """Fast data transmission"""
-        chunk_size = self.max_chunk_size
-        
-        for i in range(0, len(buf), chunk_size):
-            chunk = buf[i:i+chunk_size]
+        view = memoryview(buf)
+        i = 0
+        while i < len(view):
+            n = self.link.chunk_size  # _send may change the level between chunks
+            chunk = view[i:i + n]
             self.write_list[1] = chunk
-            self.i2c.writevto(self.addr, self.write_list)
-            # Minimal wait time
-            if len(chunk) > 64:
-                time.sleep_us(200)  # Only for larger chunks
-    
-    def _write_data_safe(self, buf):
-        """Safe data transmission"""
-        chunk_size = 32
-        
-        for i in range(0, len(buf), chunk_size):
-            chunk = buf[i:i+chunk_size]
-            self.write_list[1] = chunk
-            
-            retry_count = 3
-            for attempt in range(retry_count):
-                try:
-                    self.i2c.writevto(self.addr, self.write_list)
-                    time.sleep_us(500)
-                    break
-                except OSError as e:
-                    if attempt == retry_count - 1:
-                        print(f"Data write failed after {retry_count} attempts: {e}")
-                    time.sleep_us(2000)  # Retry after 2ms
-    
+            self._send(self.write_list, len(chunk))
+            i += n
+
+    def _write_segments(self, first, count):
+        """Send shadow segments, several per transaction, without allocating"""
+        views = self._seg_views
+        end = first + count
+        i = first
+
+        while i < end:
+            n = min(self.link.chunk_size // SEG_WIDTH, MAX_CHUNK_SEGS, end - i)
+            vector = self._seg_lists[n]
+            for k in range(n):
+                vector[k + 1] = views[i + k]
+            self._send(vector, n * SEG_WIDTH)
+            i += n
+
     def enable_fast_mode(self):
-        """Enable fast mode"""
-        self.fast_mode = True
-        self.max_chunk_size = 128
-    
+        """Start again from the fast level and keep adapting"""
+        self.link.adaptive = True
+        self.link.set_level(LINK_START_LEVEL)
+
     def enable_safe_mode(self):
-        """Enable safe mode (compatibility-focused)"""
-        self.fast_mode = False
-        self.max_chunk_size = 32
+        """Stay at the safe level (compatibility-focused)"""
+        self.link.adaptive = False
+        self.link.set_level(LINK_SAFE_LEVEL)
 
-# SPI version also optimized
 class SSD1306_SPI(SSD1306):
-    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False):
+    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False, shared=False):
         self.rate = 20 * 1024 * 1024  # Increase SPI clock
         dc.init(dc.OUT, value=0)
         res.init(res.OUT, value=0)
@@ -194,6 +485,11 @@ class SSD1306_SPI(SSD1306):
         self.dc = dc
         self.res = res
         self.cs = cs
+        self._cmd = bytearray(1)
+        # A bus shared with other devices is set up again before every
+        # transfer, otherwise only once
+        self.shared = shared
+        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
         
         # Optimized reset process
         self.res(1)
@@ -203,18 +499,34 @@ class SSD1306_SPI(SSD1306):
         self.res(1)
         super().__init__(width, height, external_vcc)
 
+    def _begin(self, data):
+        """Select the display for a command (0) or data (1) transfer"""
+        if self.shared:
+            self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self.dc(data)
+        self.cs(0)
+
     def write_cmd(self, cmd):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self._cmd[0] = cmd
+        self._begin(0)
+        self.spi.write(self._cmd)
         self.cs(1)
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([cmd]))
+
+    def write_cmds(self, sequence):
+        """Send a command sequence in one CS-asserted transfer"""
+        self._begin(0)
+        self.spi.write(sequence)
         self.cs(1)
 
     def write_data(self, buf):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
+        self._begin(1)
         self.spi.write(buf)
         self.cs(1)
+
+    def _write_segments(self, first, count):
+        """Send shadow segments in one CS-asserted transfer"""
+        views = self._seg_views
+        self._begin(1)
+        for i in range(first, first + count):
+            self.spi.write(views[i])
+        self.cs(1)
@@ -2,32 +2,53 @@
 BLE Key Fob Transmitter - Minimal Version
 """
 import time
-from ryb080i_simple import SimpleBLE
+from ryb080i_simple import SimpleBLE, AdvertisingSupervisor
+from ryb080i_async import AsyncBLE, asyncio, wait_event
+from ble_baud import resume
+from ble_provision import provision, TRANSMITTER_PROFILE
 from oled_tools import MinimalOLED
 from rgbled_tools import MinimalRGBLED
 
 # Settings
-ADVERTISING_INTERVAL = 15000  # Restart advertising every 15 seconds
+ADV_CHECK_INTERVAL = 25000  # Confirm advertising is still on this often (0 = only on module events)
+ADV_TX_POWER = None  # TX power level (e.g. "C" max), None keeps the provisioned one
+USE_ASYNCIO = True  # False: classic polling loop
+AUTO_PROVISION = True  # Check the module settings at boot (skipped when cached)
+AUTO_BAUD = True  # Find the module's UART rate at boot (cached rate tried first)
 
 # Global variables
 ble = None
 oled = None
 led = None
+advertiser = None
+runtime = None  # asyncio runtime (set by main_async)
+adv_event = None
 
-def init_system():
+def init_system(uart=None):
     """Initialize all components"""
-    global ble, oled, led
+    global ble, oled, led, advertiser
     
     print("Initializing BLE Key Fob...")
     
     # BLE
-    ble = SimpleBLE()
+    ble = SimpleBLE(uart)
+    if AUTO_BAUD:
+        rate = resume(ble)
+        print(f"UART: {rate} baud" if rate else "UART: module not answering")
+    if AUTO_PROVISION:
+        report = provision(ble, TRANSMITTER_PROFILE)
+        print(f"Provisioning: {'cached' if report['cached'] else 'applied'} in {report['time_ms']} ms")
+    
+    # Advertising, re-enabled only when the module stops it
+    advertiser = AdvertisingSupervisor(ble, ADV_CHECK_INTERVAL)
+    if ADV_TX_POWER is not None:
+        advertiser.set_tx_power(ADV_TX_POWER)
     
     # OLED - Use new centered large text feature
     oled = MinimalOLED()
     if oled.display:
         # Show ADVERTISING with large centered text
-        oled.show_status("ADVERTISING")
+        oled.show_large("ADVERTISING")
     
     # LED - Purple flowing animation for advertising
     led = MinimalRGBLED()
@@ -38,8 +59,8 @@ def init_system():
 
 def start_advertising():
     """Start BLE advertising"""
-    if ble:
-        ble.start_advertising_async()
+    if advertiser:
+        advertiser.start()
 
 def main():
     """Main advertising loop"""
@@ -48,30 +69,71 @@ def main():
     init_system()
     start_advertising()
     
-    last_advertising = time.ticks_ms()
-    
     try:
         while True:
-            current_time = time.ticks_ms()
-            
             # Process BLE
             ble.process_uart_data()
+            advertiser.update()
             ble.process_command_queue()
             
-            # Restart advertising periodically
-            if time.ticks_diff(current_time, last_advertising) >= ADVERTISING_INTERVAL:
-                start_advertising()
-                last_advertising = current_time
+            # LED animation, when no hardware timer drives it
+            if led:
+                led.step()
             
             time.sleep(0.05)
             
     except KeyboardInterrupt:
-        print("Shutting down...")
-        if led:
-            led.set_off()
-        if oled and oled.display:
-            oled.display.fill(0)
-            oled.display.show()
+        shutdown()
+
+def shutdown():
+    print("Shutting down...")
+    if advertiser:
+        s = advertiser.stats()
+        print(f"Advertising: {s['readvertises']} re-enables, {s['checks']} checks, "
+              f"off {s['off_ms']} of {s['uptime_ms']} ms")
+    if led:
+        led.set_off()
+    if oled and oled.display:
+        oled.display.fill(0)
+        oled.display.show()
+
+async def advertising_task():
+    """Run the advertising supervisor when it has a command due or the module spoke up"""
+    start_advertising()
+    while True:
+        advertiser.update()
+        if ble.command_queue:
+            runtime.command_event.set()
+        wait_ms = advertiser.time_to_next_ms()
+        if wait_ms < 0:
+            await adv_event.wait()
+            adv_event.clear()
+        elif wait_ms:
+            await wait_event(adv_event, wait_ms)
+        else:
+            await asyncio.sleep(0)
+
+async def main_async(reader=None, uart=None):
+    """Event-driven main loop"""
+    global runtime, adv_event
+    
+    print("BLE Key Fob Transmitter - Minimal Version (asyncio)")
+    
+    init_system(uart)
+    runtime = AsyncBLE(ble, reader)
+    adv_event = asyncio.Event()
+    advertiser.notify = adv_event.set
+    runtime.start()
+    await advertising_task()
+
+def run_async():
+    try:
+        asyncio.run(main_async())
+    except KeyboardInterrupt:
+        shutdown()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if USE_ASYNCIO:
+        run_async()
+    else:
+        main()
\ No newline at end of file
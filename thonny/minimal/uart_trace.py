@@ -0,0 +1,247 @@
+"""
+UART Trace - Record module traffic with timestamps and replay it
+
+Trace file: TRACE_MAGIC, then one record per UART chunk
+    varint(length << 2 | kind), varint(microseconds since the previous record), data
+with kind RX, TX or BAUD (data = new rate as ASCII digits). Varints are
+little-endian base 128, so a typical record header is 2-3 bytes.
+"""
+
+import time
+from micropython import const
+import ryb080i_simple
+from ryb080i_simple import TRACE_RX as RX, TRACE_TX as TX, TRACE_BAUD as BAUD
+
+TRACE_MAGIC = b"UTR2"
+MAX_HEADER = const(10)  # Two 5-byte varints
+TRACE_BUFFER = const(1024)  # RAM buffer, written to the file when full
+
+_recorders = []  # Open recorders, closed by close_all()
+
+class TraceRecorder:
+    """Appends timestamped UART chunks to a trace file through a RAM buffer"""
+
+    def __init__(self, path, buffer_size=TRACE_BUFFER):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(TRACE_MAGIC)
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._len = 0
+        self._head = bytearray(MAX_HEADER)  # Header of records too big for the buffer
+        self._last = time.ticks_us()
+        self.records = 0
+        self.bytes = 0
+        _recorders.append(self)
+
+    def record(self, kind, data, count=None):
+        """Add a chunk, count limits it to data[:count]"""
+        if self._file is None:
+            return
+        if count is None:
+            count = len(data)
+        now = time.ticks_us()
+        delta = max(time.ticks_diff(now, self._last), 0)
+        self._last = now
+
+        if self._len + MAX_HEADER + count > len(self._buf):
+            self.flush()
+        if MAX_HEADER + count > len(self._buf):
+            # Larger than the buffer: straight to the file
+            head = self._head
+            size = _put_varint(head, _put_varint(head, 0, count << 2 | kind), delta)
+            self._file.write(memoryview(head)[:size])
+            self._file.write(memoryview(data)[:count])
+            size += count
+        else:
+            start = self._len
+            pos = _put_varint(self._buf, _put_varint(self._buf, start, count << 2 | kind), delta)
+            self._view[pos:pos + count] = memoryview(data)[:count]
+            self._len = pos + count
+            size = self._len - start
+        self.records += 1
+        self.bytes += size
+
+    def flush(self):
+        if self._len and self._file is not None:
+            self._file.write(self._view[:self._len])
+            self._len = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        if self in _recorders:
+            _recorders.remove(self)
+
+def _put_varint(buf, pos, value):
+    while value > 0x7F:
+        buf[pos] = (value & 0x7F) | 0x80
+        value >>= 7
+        pos += 1
+    buf[pos] = value
+    return pos + 1
+
+def _get_varint(data, pos):
+    """(value, next position), or (None, pos) if data ends inside the varint"""
+    value = 0
+    shift = 0
+    while pos < len(data):
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+    return None, pos
+
+def close_all():
+    """Flush and close every open trace"""
+    for recorder in list(_recorders):
+        recorder.close()
+
+def read_trace(path):
+    """Yield (kind, time_us from trace start, data) for each record"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+        raise ValueError("not a UART trace")
+    pos = len(TRACE_MAGIC)
+    t = 0
+    while True:
+        head, pos = _get_varint(data, pos)
+        if head is None:
+            return
+        delta, pos = _get_varint(data, pos)
+        end = pos + (head >> 2)
+        if delta is None or end > len(data):
+            return  # Cut short by a reset while recording
+        t += delta
+        yield head & 3, t, data[pos:end]
+        pos = end
+
+class TraceClock:
+    """time stand-in for replays, moved along the trace timestamps"""
+
+    def __init__(self):
+        self.now_us = 0
+
+    def ticks_us(self):
+        return self.now_us
+
+    def ticks_ms(self):
+        return self.now_us // 1000
+
+    def ticks_diff(self, a, b):
+        return a - b
+
+    def ticks_add(self, a, b):
+        return a + b
+
+    def sleep(self, s):
+        self.now_us += int(s * 1000000)
+
+    def sleep_ms(self, ms):
+        self.now_us += ms * 1000
+
+    def sleep_us(self, us):
+        self.now_us += us
+
+    def advance_to(self, us):
+        if us > self.now_us:
+            self.now_us = us
+
+class ReplayUART:
+    """UART stand-in holding the replayed RX bytes"""
+
+    def __init__(self):
+        self._rx = bytearray()
+        self.baudrate = 0
+        self.tx_bytes = 0
+
+    def push(self, data):
+        self._rx += data
+
+    def init(self, baudrate=0, **kwargs):
+        self.baudrate = baudrate
+
+    def any(self):
+        return len(self._rx)
+
+    def read(self, nbytes=None):
+        if not self._rx:
+            return None
+        if nbytes is None or nbytes > len(self._rx):
+            nbytes = len(self._rx)
+        data = bytes(self._rx[:nbytes])
+        del self._rx[:nbytes]
+        return data
+
+    def readinto(self, buf, nbytes=None):
+        if not self._rx:
+            return None
+        count = min(len(buf) if nbytes is None else nbytes, len(self._rx))
+        buf[:count] = self._rx[:count]
+        del self._rx[:count]
+        return count
+
+    def write(self, data):
+        self.tx_bytes += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+def replay(path, setup=None, realtime=False, **ble_args):
+    """Feed a trace through SimpleBLE.process_uart_data, returns a stats dict
+
+    RX chunks arrive as recorded, so partial lines split the same way.
+    By default the replay runs as fast as possible on a clock that jumps
+    along the trace timestamps, which makes timing-dependent behaviour
+    (scan windows, timeouts) repeat exactly. realtime=True waits out the
+    recorded gaps on the real clock instead. setup(ble) can install
+    callbacks before the first chunk.
+    """
+    saved = ryb080i_simple.time
+    clock = None if realtime else TraceClock()
+    if clock:
+        ryb080i_simple.time = clock
+    stats = {'records': 0, 'rx_bytes': 0, 'tx_bytes': 0, 'baud_changes': 0, 'trace_us': 0}
+    start = time.ticks_us()
+    ble = None  # Unbound if SimpleBLE() raises
+    try:
+        uart = ReplayUART()
+        ble = ryb080i_simple.SimpleBLE(uart=uart, **ble_args)
+        if setup:
+            setup(ble)
+        base = clock.now_us if clock else time.ticks_us()
+
+        for kind, t, data in read_trace(path):
+            if clock:
+                clock.advance_to(base + t)
+            else:
+                wait = time.ticks_diff(time.ticks_add(base, t), time.ticks_us())
+                if wait > 0:
+                    time.sleep_us(wait)
+            stats['records'] += 1
+            stats['trace_us'] = t
+            if kind == RX:
+                stats['rx_bytes'] += len(data)
+                uart.push(data)
+                ble.process_uart_data()
+            elif kind == TX:
+                stats['tx_bytes'] += len(data)
+            elif kind == BAUD:
+                stats['baud_changes'] += 1
+    finally:
+        if ble is not None:
+            ble.flush_scan_batch()  # Scan window still open at the end, on the trace clock
+        ryb080i_simple.time = saved
+
+    stats['elapsed_us'] = time.ticks_diff(time.ticks_us(), start)
+    stats['rx_overflow'] = ble.rx_overflow
+    stats['rx_decode_errors'] = ble.rx_decode_errors
+    stats['ble'] = ble
+    return stats